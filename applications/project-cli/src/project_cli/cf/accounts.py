@@ -0,0 +1,66 @@
+from loguru import logger as log
+
+import settings
+from cfapi import inventory
+from cfapi.controllers import CloudflareController
+
+from cyclopts import App
+
+cf_accounts_app = App(name="accounts", help="CLI for Cloudflare account operations.")
+
+
+@cf_accounts_app.command(name="inventory")
+def inventory_cf_accounts(
+    email: str | None = None,
+    api_key: str | None = None,
+    api_token: str | None = None,
+    account: list[str] | None = None,
+    resource: list[str] | None = None,
+    output: str = ".data/inventory",
+    fmt: str = "parquet",
+    max_accounts: int = 4,
+    zone_workers: int = 4,
+    max_requests: int = 16,
+    processes: int = 0,
+):
+    """Inventory the zones & per-zone resources of every account visible to the token.
+
+    Params:
+        account: Only inventory these account IDs. Defaults to every account for the token.
+        resource: Per-zone resources to fetch, i.e. `zone_dns_records`. Defaults to DNS records, WAF filters & rulesets.
+        output: Directory for the account-partitioned dataset.
+        fmt: Output format, `parquet` or `ndjson`.
+        max_accounts: Maximum accounts swept at once.
+        zone_workers: Maximum per-zone fetches in flight per account.
+        max_requests: Maximum per-zone fetches in flight across all accounts.
+        processes: Spread accounts across this many worker processes. `0` uses threads only.
+    """
+    if not api_token or api_token == "":
+        api_token = settings.CLOUDFLARE_SETTINGS.get("CF_API_TOKEN")
+    if not email or email == "":
+        email = settings.CLOUDFLARE_SETTINGS.get("CF_API_EMAIL")
+    if not api_key or api_key == "":
+        api_key = settings.CLOUDFLARE_SETTINGS.get("CF_API_KEY")
+
+    try:
+        with CloudflareController(account_email=email, api_key=api_key, api_token=api_token) as cf_controller:
+            result = inventory.sweep_accounts(
+                cf_controller,
+                accounts=account or None,
+                output_dir=output,
+                fmt=fmt,
+                zone_resources=resource or inventory.DEFAULT_ZONE_RESOURCES,
+                max_accounts=max_accounts,
+                zone_workers=zone_workers,
+                max_requests=max_requests,
+                processes=processes,
+            )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error inventorying Cloudflare accounts. Details: {exc}"
+        log.error(msg)
+
+        return
+
+    print(f"Inventory: {result.summary()}")
+    for account_inventory in result.accounts:
+        print(f" - {account_inventory.summary()}")
@@ -0,0 +1,40 @@
+from loguru import logger as log
+
+from cfapi import diff
+
+from cyclopts import App
+
+cf_diff_app = App(name="diff", help="Diff two inventory snapshots into a change set.")
+
+
+@cf_diff_app.default
+def diff_cf_snapshots(
+    old: str,
+    new: str,
+    key: list[str] | None = None,
+    exclude: list[str] | None = None,
+    output: str | None = None,
+    fmt: str | None = None,
+):
+    """Diff two snapshots (NDJSON/Parquet files, or inventory directories) of the same resource.
+
+    Params:
+        old: The earlier snapshot.
+        new: The later snapshot.
+        key: Field(s) identifying a record across snapshots. Defaults to `id`.
+        exclude: Top-level fields to ignore, i.e. `modified_on`.
+        output: Write the change set to this file. Prints a summary only when omitted.
+        fmt: Change set format, `ndjson` or `parquet`. Defaults to the output file's extension.
+    """
+    try:
+        result = diff.diff_snapshots(old, new, key=key or "id", exclude=exclude)
+
+        if output:
+            result.write(output, fmt=fmt)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error diffing snapshots '{old}' & '{new}'. Details: {exc}"
+        log.error(msg)
+
+        return
+
+    print(f"Diff: {result.summary()}")
@@ -3,9 +3,14 @@ from loguru import logger as log
 import settings
 
 from cyclopts import App, Group, Parameter
+from .accounts import cf_accounts_app
+from .diff import cf_diff_app
 from .zones import cf_zones_app
 
 
-cf_app = App(name="cloudflare", help="CLI for Cloudflare operations.")
+## Also callable as `cf`
+cf_app = App(name=("cloudflare", "cf"), help="CLI for Cloudflare operations.")
 
+cf_app.command(cf_accounts_app)
 cf_app.command(cf_zones_app)
+cf_app.command(cf_diff_app)
@@ -1,15 +1,20 @@
 from loguru import logger as log
 
 import settings
+from cfapi import converters, reconcile
 from cfapi.controllers import CloudflareController
 
 from cyclopts import App, Group, Parameter
-import pandas as pd
 
 cf_zones_app = App(name="zones", help="CLI for Cloudflare zones operations.")
 
 @cf_zones_app.command(name="list")
-def list_cf_zones(email: str | None = None, api_key: str | None = None, api_token: str | None = None):
+def list_cf_zones(email: str | None = None, api_key: str | None = None, api_token: str | None = None, output: str | None = None):
+    """List Cloudflare zones for the token.
+
+    Params:
+        output: Optional path to a Parquet file to write the zones to, one row group per page.
+    """
     if not api_token or api_token == "":
         api_token = settings.CLOUDFLARE_SETTINGS.get("CF_API_TOKEN")
     if not email or email == "":
@@ -20,13 +25,57 @@ def list_cf_zones(email: str | None = None, api_key: str | None = None, api_toke
     cf_controller = CloudflareController(account_email=api_email, api_key=api_key, api_token=api_token)
     
     try:
-        zones = cf_controller.get_zones()
-        log.debug(f"Zones ([{len(zones)}] {type(zones)})")
+        if output:
+            converters.write_pages_parquet(cf_controller.iter_zone_pages(), output_file=output, flatten=True)
+            
+            return
+
+        zones_table = converters.pages_to_table(cf_controller.iter_zone_pages(), flatten=True)
+        log.debug(f"Zones ([{zones_table.num_rows}] {type(zones_table)})")
     except Exception as exc:
         msg = f"({type(exc)}) Error getting Cloudflare zones. Details: {exc}"
         log.error(msg)
         
         return
     
-    zones_df = pd.DataFrame(zones)
-    print(f"Zones:\n{zones_df}")
+    print(f"Zones:\n{zones_table.select(['id', 'name', 'status', 'account.name', 'plan.name'])}")
+
+
+@cf_zones_app.command(name="reconcile")
+def reconcile_cf_zones(
+    desired: str,
+    apply: bool = False,
+    email: str | None = None,
+    api_key: str | None = None,
+    api_token: str | None = None,
+    max_workers: int = 8,
+):
+    """Bring zone settings & firewall filters in line with a desired state file, sending only what changed.
+
+    Params:
+        desired: Path to a YAML or JSON desired state file.
+        apply: Send the planned writes. Without it, only the plan is shown.
+        max_workers: Maximum zones read, & write calls sent, at once.
+    """
+    if not api_token or api_token == "":
+        api_token = settings.CLOUDFLARE_SETTINGS.get("CF_API_TOKEN")
+    if not email or email == "":
+        email = settings.CLOUDFLARE_SETTINGS.get("CF_API_EMAIL")
+    if not api_key or api_key == "":
+        api_key = settings.CLOUDFLARE_SETTINGS.get("CF_API_KEY")
+
+    try:
+        with CloudflareController(account_email=email, api_key=api_key, api_token=api_token) as cf_controller:
+            report = reconcile.reconcile(cf_controller, desired, apply=apply, max_workers=max_workers)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error reconciling Cloudflare zones. Details: {exc}"
+        log.error(msg)
+
+        return
+
+    for zone_plan in report.plan.changed:
+        print(f"{zone_plan.zone_name or zone_plan.zone_id}:")
+        for change in zone_plan.changes:
+            print(f"  {change.kind}.{change.key}.{change.field}: {change.current!r} -> {change.desired!r}")
+
+    print(f"{'Applied' if apply else 'Plan'}: {report.summary()}")
@@ -2,14 +2,11 @@ from __future__ import annotations
 
 import typing as t
 
-import settings, setup
-from depends import db_depends
-
 from cyclopts import App, Group, Parameter
 from loguru import logger as log
-import sqlalchemy as sa
-import sqlalchemy.exc as sa_exc
-import sqlalchemy.sql as sa_sql
+
+## Database libraries are imported inside the commands, so CLI commands that don't use the database
+## start without importing SQLAlchemy
 
 db_app = App(name="db", help="CLI for managing the database.")
 
@@ -17,6 +14,8 @@ db_app = App(name="db", help="CLI for managing the database.")
 @db_app.command(name="init")
 def _init_db():
     """Initialize the database."""
+    import setup
+
     log.info("Initializing database.")
     
     try:
@@ -37,6 +36,10 @@ def show_db_info(option: t.Annotated[str, Parameter(name="option", show_default=
         option: The option to show information about. Options: ['tables']
     
     """
+    from depends import db_depends
+    import sqlalchemy as sa
+    import sqlalchemy.exc as sa_exc
+
     log.info(f"Showing database info: {option}")
     
     engine = db_depends.get_db_engine()
@@ -79,6 +82,11 @@ def count_db_rows(table: t.Annotated[str, Parameter(name="table", show_default=T
         int: The number of rows in the table.
 
     """
+    from depends import db_depends
+    import sqlalchemy as sa
+    import sqlalchemy.exc as sa_exc
+    import sqlalchemy.sql as sa_sql
+
     log.info(f"Counting rows in table: {table}")
     
     engine = db_depends.get_db_engine()
@@ -102,3 +110,72 @@ def count_db_rows(table: t.Annotated[str, Parameter(name="table", show_default=T
             log.error(f"Error querying table '{table}': {exc}")
         
         log.success(f"[{count}] row(s) in table '{table}'.")
+
+
+@db_app.command(name="stats")
+def show_db_stats(
+    probe: t.Annotated[int, Parameter(name="probe", show_default=True, help="Concurrent connections to check out before reporting. 0 reports without probing.")] = 1,
+):
+    """Show the database connection pool's configuration & usage stats.
+    
+    Description:
+        Stats are counted per process, so this command checks out `probe` connections at once (each running `SELECT 1`)
+        & reports the pool afterwards. Probing more connections than `db_pool_size` shows the overflow & wait times.
+    
+    Params:
+        probe: Number of connections to check out concurrently before reporting. `0` skips probing.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import json
+    import threading
+
+    from depends import db_depends
+    import sqlalchemy.exc as sa_exc
+    import sqlalchemy.sql as sa_sql
+
+    if probe < 0:
+        log.error(f"--probe must be 0 or more. Got: {probe}")
+        exit(1)
+
+    engine = db_depends.get_db_engine()
+
+    def _probe(_: int) -> None:
+        try:
+            conn = engine.connect()
+        except sa_exc.TimeoutError as exc:
+            ## An exhausted pool is a result to report, counted in the stats' `timeouts`
+            log.warning(f"Timed out waiting for a pooled connection. Details: {exc}")
+            barrier.abort()
+            return
+
+        with conn:
+            conn.execute(sa_sql.text("SELECT 1"))
+            try:
+                barrier.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass
+
+    if probe > 0:
+        log.info(f"Probing connection pool with [{probe}] concurrent connection(s)")
+
+        ## Hold every connection until all are checked out, so the pool has to supply `probe` at once
+        barrier = threading.Barrier(probe)
+
+        try:
+            with ThreadPoolExecutor(max_workers=probe) as executor:
+                list(executor.map(_probe, range(probe)))
+        except Exception as exc:
+            msg = f"({type(exc)}) Error probing database connection pool. Details: {exc}"
+            log.error(msg)
+            
+            raise exc
+
+    pool_stats: dict = db_depends.get_db_pool_stats()
+    if not pool_stats:
+        log.warning("Pool stats are disabled (db_pool_stats = false).")
+        return
+
+    print(json.dumps(pool_stats, indent=2))
+    
+    return pool_stats
@@ -1,3 +1,3 @@
 from __future__ import annotations
 
-from .methods import get_hash_from_str
\ No newline at end of file
+from .methods import canonical_json, get_hash_from_record, get_hash_from_str
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import typing as t
 
 from loguru import logger as log
 
@@ -51,6 +53,55 @@ def get_hash_from_str(input_str: str = None, encoding: str = "utf-8") -> str:
     return hash
 
 
+def canonical_json(obj: t.Any, exclude: t.Iterable[str] | None = None) -> str:
+    """Serialize an object to canonical JSON: sorted keys, no whitespace, non-JSON values as strings.
+
+    Description:
+        Two objects with the same content serialize to the same string regardless of key order, so the result can
+        be hashed to detect changes.
+
+    Params:
+        obj (Any): The object to serialize, usually a dict.
+        exclude (Iterable[str] | None): Top-level keys to leave out, i.e. volatile timestamps.
+
+    Returns:
+        (str): The canonical JSON string.
+
+    """
+    if exclude and isinstance(obj, dict):
+        excluded: set[str] = set(exclude)
+        obj = {key: value for key, value in obj.items() if key not in excluded}
+
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def get_hash_from_record(
+    record: t.Any,
+    exclude: t.Iterable[str] | None = None,
+    digest_size: int = 16,
+) -> str:
+    """Return a hash of a record's canonical content. See `canonical_json()`.
+
+    Params:
+        record (Any): The record to hash, usually a dict.
+        exclude (Iterable[str] | None): Top-level keys to leave out of the hash.
+        digest_size (int): (default: 16) Hash size in bytes. The hex digest is twice as long.
+
+    Returns:
+        (str): A hex digest that changes whenever the record's content changes.
+
+    """
+    try:
+        return hashlib.blake2b(
+            canonical_json(record, exclude=exclude).encode("utf-8"), digest_size=digest_size
+        ).hexdigest()
+    except Exception as exc:
+        msg = f"({type(exc)}) Error hashing record. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+
 if __name__ == "__main__":
     log.info(f"Hashlib demo start")
 
@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from . import annotated
+from . import annotated, async_db, history, parquet, pool, queries, sqlite
 from .__methods import (
     count_table_rows,
     create_base_metadata,
     get_db_uri,
     get_engine,
     get_session_pool,
+    instrument_engine,
     show_table_names,
 )
-from .base import Base
+from .async_db import (
+    create_base_metadata_async,
+    get_async_db_uri,
+    get_async_engine,
+    get_async_session_pool,
+)
+from .base import AsyncBaseRepository, Base, BaseRepository
+from .history import CompactionResult, HistoryPartition, HistoryStore, SnapshotResult
 from .mixins import TableNameMixin, TimestampMixin
+from .parquet import export_table_parquet, import_parquet_table
+from .pool import PoolStats, get_pool_options, get_pool_stats, instrument_pool
+from .queries import (
+    QueryStats,
+    get_query_stats,
+    instrument_queries,
+    write_query_report,
+    write_query_report_at_exit,
+)
+from .sqlite import SQLITE_PROFILES, apply_sqlite_pragmas, get_sqlite_pragmas
 from .utils import backup_sqlite_db, dump_sqlite_db_schema
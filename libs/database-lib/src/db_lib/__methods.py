@@ -7,6 +7,8 @@ log = logging.getLogger(__name__)
 
 from settings import DB_SETTINGS
 
+from . import pool as db_pool, queries, sqlite
+
 import sqlalchemy as sa
 import sqlalchemy.exc as sa_exc
 import sqlalchemy.orm as so
@@ -92,9 +94,54 @@ def get_engine(
     logging_name: str | None = None,
     execution_options: dict | None = None,
     hide_parameters: bool = False,
-    echo: bool = DB_SETTINGS.get("DB_ECHO", default=False),
+    echo: bool | None = None,
     query_cache_size: int = 500,
+    sqlite_profile: str | None = None,
+    sqlite_pragmas: dict | None = None,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+    pool_timeout: float | None = None,
+    pool_recycle: int | None = None,
+    pool_pre_ping: bool | None = None,
+    pool_stats: bool | None = None,
+    query_stats: bool | None = None,
 ) -> sa.Engine:
+    """Create a SQLAlchemy `Engine`.
+
+    Params:
+        pool (sqlalchemy.Pool | None): A pool to use instead of one built from the pool options below.
+        echo (bool | None): Echo SQL statements to the console. Defaults to the `DB_ECHO` setting.
+        sqlite_profile (str | None): For SQLite URLs, a named PRAGMA profile applied to every connection, i.e.
+            `"performance"` (see `db_lib.sqlite`). Defaults to the `DB_SQLITE_PROFILE` setting.
+        sqlite_pragmas (dict | None): For SQLite URLs, PRAGMAs overriding the profile's, i.e. `{"cache_size": -256000}`.
+        pool_size (int | None): Connections kept open in the pool. Defaults to the `DB_POOL_SIZE` setting.
+        max_overflow (int | None): Connections opened past `pool_size` under load. Defaults to `DB_MAX_OVERFLOW`.
+        pool_timeout (float | None): Seconds to wait for a free connection. Defaults to `DB_POOL_TIMEOUT`.
+        pool_recycle (int | None): Replace connections older than this many seconds. Defaults to `DB_POOL_RECYCLE`.
+        pool_pre_ping (bool | None): Test connections on checkout. Defaults to `DB_POOL_PRE_PING`.
+        pool_stats (bool | None): Count pool events, read them with `db_lib.pool.get_pool_stats(engine)`.
+            Defaults to the `DB_POOL_STATS` setting, or `True`.
+        query_stats (bool | None): Time statements & flag N+1 & slow queries (see `db_lib.queries`).
+            Defaults to the `DB_QUERY_STATS` setting, or `False`.
+
+    """
+    ## Settings are read per call, so importing db_lib doesn't resolve them
+    if echo is None:
+        echo = DB_SETTINGS.get("DB_ECHO", default=False)
+    if sqlite_profile is None:
+        sqlite_profile = DB_SETTINGS.get("DB_SQLITE_PROFILE", default=None)
+    pool_options: dict[str, t.Any] = {}
+    if pool is None:
+        pool_options = db_pool.get_pool_options(
+            url,
+            settings=DB_SETTINGS,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+
     engine = sa.create_engine(
         pool=pool,
         logging_name=logging_name,
@@ -103,8 +150,51 @@ def get_engine(
         echo=echo,
         hide_parameters=hide_parameters,
         query_cache_size=query_cache_size,
+        **pool_options,
     )
 
+    instrument_engine(engine, pool_stats=pool_stats, query_stats=query_stats)
+
+    if engine.dialect.name == "sqlite" and (sqlite_profile or sqlite_pragmas):
+        sqlite.apply_sqlite_pragmas(
+            engine, sqlite.get_sqlite_pragmas(sqlite_profile or None, **(sqlite_pragmas or {}))
+        )
+
+    return engine
+
+
+def instrument_engine(engine: sa.Engine, pool_stats: bool | None = None, query_stats: bool | None = None) -> sa.Engine:
+    """Attach pool & query instrumentation to an engine, as enabled by the params or the `DB_*` settings.
+
+    Params:
+        engine (sqlalchemy.Engine): The engine to instrument. For an `AsyncEngine`, pass its `sync_engine`.
+        pool_stats (bool | None): Count pool events. Defaults to the `DB_POOL_STATS` setting, or `True`.
+        query_stats (bool | None): Time statements. Defaults to the `DB_QUERY_STATS` setting, or `False`. The
+            `DB_QUERY_SLOW_SECONDS`, `DB_QUERY_N_PLUS_ONE` & `DB_QUERY_REPORT` settings configure it.
+
+    Returns:
+        (sqlalchemy.Engine): The same engine.
+
+    """
+    if pool_stats is None:
+        pool_stats = DB_SETTINGS.get("DB_POOL_STATS", default=True)
+    if query_stats is None:
+        query_stats = DB_SETTINGS.get("DB_QUERY_STATS", default=False)
+
+    if pool_stats:
+        db_pool.instrument_pool(engine)
+
+    if query_stats:
+        queries.instrument_queries(
+            engine,
+            slow_query_seconds=float(DB_SETTINGS.get("DB_QUERY_SLOW_SECONDS", default=0.5)),
+            n_plus_one_threshold=int(DB_SETTINGS.get("DB_QUERY_N_PLUS_ONE", default=200)),
+        )
+
+        report_path: str | None = DB_SETTINGS.get("DB_QUERY_REPORT", default=None)
+        if report_path:
+            queries.write_query_report_at_exit(report_path)
+
     return engine
 
 
@@ -0,0 +1,160 @@
+"""Asyncio siblings of the `db_lib` engine & session factories.
+
+An `AsyncEngine` runs the same SQLAlchemy core & ORM over an asyncio driver: `aiosqlite` for SQLite, `asyncpg`
+for Postgres (install the `database-lib[async]` extra). Sync URLs are switched to their async driver, so one
+`DB_SETTINGS` config serves both engines.
+"""
+
+from __future__ import annotations
+
+import logging
+import typing as t
+
+log = logging.getLogger(__name__)
+
+from settings import DB_SETTINGS
+
+from . import pool as db_pool, sqlite
+from .__methods import instrument_engine
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+## Dialect -> asyncio driver name
+ASYNC_DRIVERNAMES: dict[str, str] = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_db_uri(url: t.Union[str, sa.URL]) -> sa.URL:
+    """Return a database URL switched to its dialect's asyncio driver, i.e. `sqlite+pysqlite` -> `sqlite+aiosqlite`.
+
+    Params:
+        url (str | sqlalchemy.URL): A sync or async database URL.
+
+    Returns:
+        (sqlalchemy.URL): The URL with an asyncio driver. URLs already using an async driver are returned as-is.
+
+    Raises:
+        ValueError: When there is no known asyncio driver for the URL's dialect.
+
+    """
+    url = sa.make_url(url)
+
+    if url.drivername in ASYNC_DRIVERNAMES.values():
+        return url
+
+    dialect: str = url.get_backend_name()
+    if dialect not in ASYNC_DRIVERNAMES:
+        raise ValueError(f"No asyncio driver for dialect '{dialect}'. Supported: {list(ASYNC_DRIVERNAMES)}")
+
+    return url.set(drivername=ASYNC_DRIVERNAMES[dialect])
+
+
+def get_async_engine(
+    url: t.Union[str, sa.URL] = None,
+    echo: bool | None = None,
+    hide_parameters: bool = False,
+    execution_options: dict | None = None,
+    query_cache_size: int = 500,
+    sqlite_profile: str | None = None,
+    sqlite_pragmas: dict | None = None,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+    pool_timeout: float | None = None,
+    pool_recycle: int | None = None,
+    pool_pre_ping: bool | None = None,
+    pool_stats: bool | None = None,
+    query_stats: bool | None = None,
+) -> AsyncEngine:
+    """Create a SQLAlchemy `AsyncEngine`. The async sibling of `get_engine()`.
+
+    Params:
+        url (str | sqlalchemy.URL): A database URL. Sync drivers are switched to their asyncio driver.
+        echo (bool | None): Echo SQL statements to the console. Defaults to the `DB_ECHO` setting.
+        sqlite_profile (str | None): For SQLite, a named PRAGMA profile (see `db_lib.sqlite`). Defaults to the
+            `DB_SQLITE_PROFILE` setting.
+        sqlite_pragmas (dict | None): For SQLite, PRAGMAs overriding the profile's.
+        pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping, pool_stats, query_stats: As for
+            `get_engine()`, defaulting to the `DB_POOL_*` & `DB_QUERY_*` settings.
+
+    Returns:
+        (sqlalchemy.ext.asyncio.AsyncEngine): An asyncio engine.
+
+    """
+    if url is None:
+        raise ValueError("url cannot be None")
+
+    if echo is None:
+        echo = DB_SETTINGS.get("DB_ECHO", default=False)
+    if sqlite_profile is None:
+        sqlite_profile = DB_SETTINGS.get("DB_SQLITE_PROFILE", default=None)
+    async_url: sa.URL = get_async_db_uri(url)
+    pool_options: dict[str, t.Any] = db_pool.get_pool_options(
+        async_url,
+        settings=DB_SETTINGS,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+
+    engine: AsyncEngine = create_async_engine(
+        async_url,
+        echo=echo,
+        hide_parameters=hide_parameters,
+        execution_options=execution_options,
+        query_cache_size=query_cache_size,
+        **pool_options,
+    )
+
+    instrument_engine(engine.sync_engine, pool_stats=pool_stats, query_stats=query_stats)
+
+    if engine.dialect.name == "sqlite" and (sqlite_profile or sqlite_pragmas):
+        ## Connection events are registered on the sync engine the async engine proxies
+        sqlite.apply_sqlite_pragmas(
+            engine.sync_engine, sqlite.get_sqlite_pragmas(sqlite_profile or None, **(sqlite_pragmas or {}))
+        )
+
+    return engine
+
+
+def get_async_session_pool(engine: AsyncEngine = None) -> async_sessionmaker[AsyncSession]:
+    """Return an `AsyncSession` pool. The async sibling of `get_session_pool()`.
+
+    Description:
+        Sessions keep their objects' loaded attributes after a commit (`expire_on_commit=False`), because
+        re-loading an expired attribute is implicit I/O that an `AsyncSession` cannot do outside an `await`.
+
+    Params:
+        engine (sqlalchemy.ext.asyncio.AsyncEngine): The engine to use for database connections.
+
+    Returns:
+        (sqlalchemy.ext.asyncio.async_sessionmaker): An `AsyncSession` pool.
+
+    """
+    assert engine is not None, ValueError("engine cannot be None")
+    assert isinstance(engine, AsyncEngine), TypeError(
+        f"engine must be of type sqlalchemy.ext.asyncio.AsyncEngine. Got type: ({type(engine)})"
+    )
+
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+async def create_base_metadata_async(base: t.Type[sa.orm.DeclarativeBase] = None, engine: AsyncEngine = None) -> None:
+    """Create a SQLAlchemy base object's tables through an `AsyncEngine`. The async sibling of `create_base_metadata()`."""
+    if base is None:
+        raise ValueError("base cannot be None")
+    if engine is None:
+        raise ValueError("engine cannot be None")
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(base.metadata.create_all)
+    except Exception as exc:
+        msg = f"({type(exc)}) Unhandled exception creating Base metadata. Details: {exc}"
+        log.error(msg)
+
+        raise exc
@@ -3,18 +3,190 @@ from __future__ import annotations
 import typing as t
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as sa_postgresql, sqlite as sa_sqlite
 import sqlalchemy.exc as sa_exc
 import sqlalchemy.orm as so
 
+if t.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 ## Generic type representing an instance of a class
 T = t.TypeVar("T")
 
+## Dialect-specific INSERT constructs supporting `ON CONFLICT ... DO UPDATE`
+UPSERT_INSERTS: dict[str, t.Callable[..., t.Any]] = {
+    "sqlite": sa_sqlite.insert,
+    "postgresql": sa_postgresql.insert,
+}
+
 
 class Base(so.DeclarativeBase):
     pass
 
 
-class BaseRepository(t.Generic[T]):
+class _RepositoryStatements(t.Generic[T]):
+    """Statement builders shared by `BaseRepository` & `AsyncBaseRepository`, which only differ in how they execute."""
+
+    model: t.Type[T]
+
+    def _row_dict(self, row: t.Union[dict, T]) -> dict:
+        """Return a row's column values as a dict. Dicts are passed through as-is."""
+        if isinstance(row, dict):
+            return row
+
+        return {
+            attr.columns[0].name: getattr(row, attr.key)
+            for attr in sa.inspect(self.model).column_attrs
+            if attr.key in row.__dict__
+        }
+
+    @property
+    def _pk_cols(self) -> list[sa.Column]:
+        return list(self.model.__table__.primary_key.columns)
+
+    def _pk_value(self, row: t.Sequence[t.Any]) -> t.Any:
+        """A primary key from a row of primary key columns: a scalar, or a tuple for composite keys."""
+        return row[0] if len(row) == 1 else tuple(row)
+
+    def _upsert_batches(
+        self,
+        rows: t.Iterable[t.Union[dict, T]],
+        dialect: str,
+        conflict_cols: t.Sequence[str] | None = None,
+        update_cols: t.Sequence[str] | None = None,
+        chunk_size: int = 1000,
+        returning: bool = True,
+    ) -> t.Generator[tuple[t.Any | None, list[dict]], None, None]:
+        """Yield `(statement, rows)` executemany batches for `bulk_upsert()`.
+
+        The statement is `None` on dialects without `ON CONFLICT`, where the rows are merged one at a time instead.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer. Got: {chunk_size}")
+
+        table: sa.Table = self.model.__table__
+        conflict_cols = list(conflict_cols or [col.name for col in self._pk_cols])
+        insert: t.Callable[..., t.Any] | None = UPSERT_INSERTS.get(dialect)
+
+        rows_iter: t.Iterator = iter(rows)
+        while True:
+            chunk: dict[tuple, dict] = {}
+            for row in rows_iter:
+                values: dict = self._row_dict(row)
+                key: tuple = tuple(values.get(col) for col in conflict_cols)
+                if any(value is None for value in key):
+                    ## A row without its conflict key (i.e. an autoincrement primary key) can't conflict with
+                    #  another row in the chunk; give it a key of its own so it is never collapsed
+                    key = (object(),)
+                chunk[key] = values
+
+                if len(chunk) >= chunk_size:
+                    break
+
+            if not chunk:
+                return
+
+            if insert is None:
+                yield None, list(chunk.values())
+
+                continue
+
+            ## executemany needs the same columns in every row; group the chunk by its rows' column sets
+            by_columns: dict[frozenset, list[dict]] = {}
+            for values in chunk.values():
+                by_columns.setdefault(frozenset(values), []).append(values)
+
+            for columns, batch in by_columns.items():
+                set_cols: list[str] = (
+                    [col for col in columns if col not in conflict_cols] if update_cols is None else list(update_cols)
+                )
+
+                stmt = insert(table)
+                if set_cols:
+                    set_: dict[str, t.Any] = {col: stmt.excluded[col] for col in set_cols}
+                    for col in table.columns:
+                        if (
+                            col.onupdate is not None
+                            and not col.onupdate.is_callable
+                            and col.name not in set_
+                            and col.name not in columns
+                        ):
+                            set_[col.name] = col.onupdate.arg
+
+                    stmt = stmt.on_conflict_do_update(index_elements=conflict_cols, set_=set_)
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+
+                if returning:
+                    stmt = stmt.returning(*self._pk_cols, sort_by_parameter_order=True)
+
+                yield stmt, batch
+
+    def _keyset_columns(self, order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None) -> list[sa.ColumnElement]:
+        """Resolve `order_by` to columns, ending with the primary key so the ordering is unique."""
+        table: sa.Table = self.model.__table__
+        cols: list[sa.ColumnElement] = [table.columns[col] if isinstance(col, str) else col for col in order_by or []]
+
+        for pk_col in table.primary_key.columns:
+            if not any(col is pk_col for col in cols):
+                cols.append(pk_col)
+
+        return cols
+
+    def _keyset_select(
+        self,
+        key_cols: list[sa.ColumnElement],
+        after_key: tuple | None,
+        limit: int,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> sa.Select:
+        """Select the `limit` rows ordered after `after_key`, with the key columns appended to each row."""
+        stmt = sa.select(*(list(columns) if columns else [self.model]), *key_cols)
+
+        if where is not None:
+            stmt = stmt.where(where)
+        if after_key is not None:
+            stmt = stmt.where(self._keyset_after(key_cols, after_key))
+
+        ## NULLs sort first on every dialect (Postgres sorts them last by default), which `_keyset_after()` relies on
+        return stmt.order_by(
+            *(col.asc().nulls_first() if getattr(col, "nullable", False) else col for col in key_cols)
+        ).limit(limit)
+
+    def _keyset_after(self, key_cols: list[sa.ColumnElement], after_key: tuple) -> sa.ColumnElement[bool]:
+        """A predicate for the rows ordered after `after_key`, with NULLs ordered first."""
+        if not any(value is None for value in after_key):
+            ## Row value comparison: (a, b) > (x, y). Supported by Postgres & SQLite >= 3.15. NULL columns compare
+            #  as NULL, which correctly excludes them: they are ordered before any value.
+            return sa.tuple_(*key_cols) > sa.tuple_(*after_key)
+
+        ## `(a, b) > (NULL, y)` is NULL for every row, so expand it by hand:
+        #  (a > x) OR (a = x AND b > y), where "> NULL" is IS NOT NULL & "= NULL" is IS NULL
+        clauses: list[sa.ColumnElement[bool]] = []
+        for i, (col, value) in enumerate(zip(key_cols, after_key)):
+            equal: list[sa.ColumnElement[bool]] = [
+                prev_col.is_(None) if prev_value is None else prev_col == prev_value
+                for prev_col, prev_value in zip(key_cols[:i], after_key[:i])
+            ]
+            clauses.append(sa.and_(*equal, col.is_not(None) if value is None else col > value))
+
+        return sa.or_(*clauses)
+
+    def _keyset_rows(
+        self, result: list[sa.Row], columns: t.Sequence[sa.ColumnElement] | None = None
+    ) -> tuple[list[t.Any], tuple | None]:
+        """Split a `_keyset_select()` result into its rows & the key of the last row."""
+        if not result:
+            return [], None
+
+        n: int = len(columns) if columns else 1
+        rows: list[t.Any] = [row[0] if not columns else tuple(row[:n]) for row in result]
+
+        return rows, tuple(result[-1][n:])
+
+
+class BaseRepository(_RepositoryStatements[T]):
     """Base class for a SQLAlchemy database repository.
 
     Usage:
@@ -59,6 +231,76 @@ class BaseRepository(t.Generic[T]):
             self.session.rollback()
             raise RuntimeError(f"Failed to create objects: {exc}")
 
+    def bulk_upsert(
+        self,
+        rows: t.Iterable[t.Union[dict, T]],
+        conflict_cols: t.Sequence[str] | None = None,
+        update_cols: t.Sequence[str] | None = None,
+        chunk_size: int = 1000,
+        returning: bool = True,
+        commit: bool = True,
+    ) -> list[t.Any]:
+        """Insert rows, updating the existing row on a conflict, in batches & without loading ORM objects.
+
+        Description:
+            Uses the dialect's native `INSERT ... ON CONFLICT (...) DO UPDATE` on SQLite & Postgres. Each chunk is
+            sent as one executemany batch, & primary keys come back through `RETURNING`, instead of the per-row
+            `refresh()` round trips of `create_all()`. Plain dicts (keyed by column name) are sent as they are;
+            model instances are read into dicts first. Other dialects fall back to `Session.merge()` per row.
+
+            Rows sharing a conflict key within one chunk are collapsed to the last one, because Postgres refuses
+            to update the same row twice in one statement. Rows missing a conflict column (i.e. new rows of a
+            table with an autoincrement primary key) are always inserted. Columns with an `onupdate` (i.e.
+            `updated_at`) are refreshed on conflict unless the rows set them.
+
+        Params:
+            rows (Iterable[dict | T]): The rows to upsert, as dicts or model instances.
+            conflict_cols (Sequence[str] | None): Columns of the unique constraint to upsert on. Defaults to the
+                primary key.
+            update_cols (Sequence[str] | None): Columns to overwrite on a conflict. Defaults to every column given
+                in a row, except the conflict columns. An empty list leaves existing rows untouched (`DO NOTHING`).
+            chunk_size (int): (default: 1000) Rows per executemany batch.
+            returning (bool): (default: True) Return the primary keys of the upserted rows.
+            commit (bool): (default: True) Commit once every chunk is written. With `False`, the caller owns the
+                transaction, i.e. to upsert several tables atomically.
+
+        Returns:
+            (list): Primary key values (tuples for composite keys) of inserted & updated rows. With `DO NOTHING`,
+                only inserted rows are returned. Empty when `returning=False`.
+
+        """
+        keys: list[t.Any] = []
+
+        try:
+            for stmt, batch in self._upsert_batches(
+                rows,
+                self.session.get_bind().dialect.name,
+                conflict_cols=conflict_cols,
+                update_cols=update_cols,
+                chunk_size=chunk_size,
+                returning=returning,
+            ):
+                if stmt is None:
+                    for values in batch:
+                        obj = self.session.merge(self.model(**values))
+                        if returning:
+                            self.session.flush()
+                            keys.append(self._pk_value([getattr(obj, col.key) for col in self._pk_cols]))
+
+                    continue
+
+                result = self.session.execute(stmt, batch)
+                if returning:
+                    keys.extend(self._pk_value(row) for row in result)
+
+            if commit:
+                self.session.commit()
+
+            return keys
+        except Exception as exc:
+            self.session.rollback()
+            raise RuntimeError(f"Failed to upsert rows: {exc}") from exc
+
     def get(self, id: int) -> t.Optional[T]:
         return self.session.get(self.model, id)
 
@@ -78,6 +320,296 @@ class BaseRepository(t.Generic[T]):
     def list(self) -> list[T]:
         return self.session.execute(sa.select(self.model)).scalars().all()
 
+    def _keyset_page(
+        self,
+        key_cols: list[sa.ColumnElement],
+        after_key: tuple | None,
+        limit: int,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> tuple[list[t.Any], tuple | None]:
+        """Select the `limit` rows after `after_key`, returning the rows & the key of the last row."""
+        stmt = self._keyset_select(key_cols, after_key, limit, where=where, columns=columns)
+
+        return self._keyset_rows(self.session.execute(stmt).all(), columns=columns)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1000,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> t.Generator[list[t.Any], None, None]:
+        """Yield every matching row in lists of up to `batch_size`, using keyset pagination. See `iter()`."""
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer. Got: {batch_size}")
+
+        key_cols: list[sa.ColumnElement] = self._keyset_columns(order_by)
+        after_key: tuple | None = None
+
+        while True:
+            rows, after_key = self._keyset_page(key_cols, after_key, batch_size, where=where, columns=columns)
+            if not rows:
+                return
+
+            yield rows
+
+            if len(rows) < batch_size:
+                return
+
+    def iter(
+        self,
+        batch_size: int = 1000,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> t.Generator[t.Any, None, None]:
+        """Stream every matching row, in constant memory, instead of loading the table like `list()`.
+
+        Description:
+            Rows are read in batches with keyset pagination: each batch selects the rows ordered after the last
+            row of the previous batch (`WHERE (cols) > (last) ORDER BY cols LIMIT batch_size`), so every batch is
+            an index range scan & no cursor is held open between batches. The primary key is appended to
+            `order_by` to make the ordering unique. Ordering is ascending, with NULLs first in nullable columns.
+
+            Objects the caller does not keep are released between batches (the session's identity map holds
+            weak references). Selecting `columns` instead of whole objects skips ORM object construction.
+
+        Params:
+            batch_size (int): (default: 1000) Rows per query.
+            order_by (Sequence[str | ColumnElement] | None): Column names or columns to page over, i.e. an
+                indexed timestamp. Defaults to the primary key.
+            where (ColumnElement | None): A filter, i.e. `Zone.status == "active"`.
+            columns (Sequence[ColumnElement] | None): Yield tuples of these columns instead of model instances.
+
+        Returns:
+            (Generator): Model instances, or column tuples when `columns` is given.
+
+        """
+        for batch in self.iter_batches(batch_size=batch_size, order_by=order_by, where=where, columns=columns):
+            yield from batch
+
+    def list_page(
+        self,
+        after_key: t.Any | None = None,
+        limit: int = 100,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> tuple[list[t.Any], t.Any | None]:
+        """Return one page of rows & the key to request the next page with, for API-style paging.
+
+        Params:
+            after_key (Any | None): The `next_key` returned with the previous page. `None` for the first page.
+            limit (int): (default: 100) Maximum rows in the page.
+
+            See `iter()` for the other params.
+
+        Returns:
+            (tuple[list, Any | None]): The page's rows, & the key of its last row (a scalar when ordering by the
+                primary key alone, else a tuple). The key is `None` once there are no more rows.
+
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be a positive integer. Got: {limit}")
+
+        key_cols: list[sa.ColumnElement] = self._keyset_columns(order_by)
+        if after_key is not None and not isinstance(after_key, (tuple, list)):
+            after_key = (after_key,)
+
+        rows, last_key = self._keyset_page(
+            key_cols, tuple(after_key) if after_key is not None else None, limit, where=where, columns=columns
+        )
+
+        if len(rows) < limit or last_key is None:
+            return rows, None
+
+        return rows, last_key[0] if len(key_cols) == 1 else last_key
+
     def count(self) -> int:
         """Return the count of entities in the table."""
-        return self.session.query(self.model).count()
\ No newline at end of file
+        return self.session.query(self.model).count()
+
+class AsyncBaseRepository(_RepositoryStatements[T]):
+    """Base class for an asyncio SQLAlchemy database repository; the `AsyncSession` sibling of `BaseRepository`.
+
+    Usage:
+        Inherit from this class like `BaseRepository`, & `await` its methods. `iter()` & `iter_batches()` are
+        async generators:
+
+        ``` py linenums=1
+        async with async_session_pool() as session:
+            repo = AsyncBaseRepository(session, Zone)
+
+            await repo.bulk_upsert(zone_rows, conflict_cols=["id"])
+            async for zone in repo.iter(batch_size=5000):
+                ...
+        ```
+    """
+
+    def __init__(self, session: "AsyncSession", model: t.Type[T]):
+        self.session = session
+        self.model = model
+
+    async def create(self, obj: T) -> T:
+        self.session.add(obj)
+
+        await self.session.commit()
+        await self.session.refresh(obj)
+
+        return obj
+
+    async def create_all(self, objs: list[T]) -> list[T]:
+        """Create and commit a list of objects in a single transaction. See `BaseRepository.create_all()`."""
+        try:
+            self.session.add_all(objs)
+            ## Ensure objects are flushed to the database
+            await self.session.flush()
+
+            for obj in objs:
+                await self.session.refresh(obj)
+
+            await self.session.commit()
+
+            return objs
+        except Exception as exc:
+            await self.session.rollback()
+            raise RuntimeError(f"Failed to create objects: {exc}")
+
+    async def bulk_upsert(
+        self,
+        rows: t.Iterable[t.Union[dict, T]],
+        conflict_cols: t.Sequence[str] | None = None,
+        update_cols: t.Sequence[str] | None = None,
+        chunk_size: int = 1000,
+        returning: bool = True,
+        commit: bool = True,
+    ) -> list[t.Any]:
+        """Insert rows, updating the existing row on a conflict, in executemany batches. See `BaseRepository.bulk_upsert()`."""
+        keys: list[t.Any] = []
+
+        try:
+            for stmt, batch in self._upsert_batches(
+                rows,
+                self.session.get_bind().dialect.name,
+                conflict_cols=conflict_cols,
+                update_cols=update_cols,
+                chunk_size=chunk_size,
+                returning=returning,
+            ):
+                if stmt is None:
+                    for values in batch:
+                        obj = await self.session.merge(self.model(**values))
+                        if returning:
+                            await self.session.flush()
+                            keys.append(self._pk_value([getattr(obj, col.key) for col in self._pk_cols]))
+
+                    continue
+
+                result = await self.session.execute(stmt, batch)
+                if returning:
+                    keys.extend(self._pk_value(row) for row in result)
+
+            if commit:
+                await self.session.commit()
+
+            return keys
+        except Exception as exc:
+            await self.session.rollback()
+            raise RuntimeError(f"Failed to upsert rows: {exc}") from exc
+
+    async def get(self, id: int) -> t.Optional[T]:
+        return await self.session.get(self.model, id)
+
+    async def update(self, obj: T, data: dict) -> T:
+        for key, value in data.items():
+            setattr(obj, key, value)
+
+        await self.session.commit()
+
+        return obj
+
+    async def delete(self, obj: T) -> None:
+        await self.session.delete(obj)
+
+        await self.session.commit()
+
+    async def list(self) -> list[T]:
+        return (await self.session.execute(sa.select(self.model))).scalars().all()
+
+    async def _keyset_page(
+        self,
+        key_cols: list[sa.ColumnElement],
+        after_key: tuple | None,
+        limit: int,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> tuple[list[t.Any], tuple | None]:
+        stmt = self._keyset_select(key_cols, after_key, limit, where=where, columns=columns)
+
+        return self._keyset_rows((await self.session.execute(stmt)).all(), columns=columns)
+
+    async def iter_batches(
+        self,
+        batch_size: int = 1000,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> t.AsyncGenerator[list[t.Any], None]:
+        """Yield every matching row in lists of up to `batch_size`, using keyset pagination. See `BaseRepository.iter()`."""
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer. Got: {batch_size}")
+
+        key_cols: list[sa.ColumnElement] = self._keyset_columns(order_by)
+        after_key: tuple | None = None
+
+        while True:
+            rows, after_key = await self._keyset_page(key_cols, after_key, batch_size, where=where, columns=columns)
+            if not rows:
+                return
+
+            yield rows
+
+            if len(rows) < batch_size:
+                return
+
+    async def iter(
+        self,
+        batch_size: int = 1000,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> t.AsyncGenerator[t.Any, None]:
+        """Stream every matching row in constant memory. See `BaseRepository.iter()`."""
+        async for batch in self.iter_batches(batch_size=batch_size, order_by=order_by, where=where, columns=columns):
+            for row in batch:
+                yield row
+
+    async def list_page(
+        self,
+        after_key: t.Any | None = None,
+        limit: int = 100,
+        order_by: t.Sequence[t.Union[str, sa.ColumnElement]] | None = None,
+        where: t.Any | None = None,
+        columns: t.Sequence[sa.ColumnElement] | None = None,
+    ) -> tuple[list[t.Any], t.Any | None]:
+        """Return one page of rows & the key to request the next page with. See `BaseRepository.list_page()`."""
+        if limit < 1:
+            raise ValueError(f"limit must be a positive integer. Got: {limit}")
+
+        key_cols: list[sa.ColumnElement] = self._keyset_columns(order_by)
+        if after_key is not None and not isinstance(after_key, (tuple, list)):
+            after_key = (after_key,)
+
+        rows, last_key = await self._keyset_page(
+            key_cols, tuple(after_key) if after_key is not None else None, limit, where=where, columns=columns
+        )
+
+        if len(rows) < limit or last_key is None:
+            return rows, None
+
+        return rows, last_key[0] if len(key_cols) == 1 else last_key
+
+    async def count(self) -> int:
+        """Return the count of entities in the table."""
+        return (await self.session.execute(sa.select(sa.func.count()).select_from(self.model))).scalar_one()
@@ -0,0 +1,471 @@
+"""Snapshot history with row versions (SCD type 2), partitioned by month.
+
+`HistoryStore.record_snapshot()` takes a full snapshot of records, i.e. an hourly zone inventory, & keeps only what
+changed: each record's canonical JSON is hashed, & a new version is written only when the hash differs from the
+record's current version. Unchanged records cost a hash & a dict lookup, so an hourly snapshot of a mostly stable
+inventory adds a handful of rows, not a full copy.
+
+Every version has a `[valid_from, valid_to)` range. Tables for a store named `zones`:
+
+| table                      | contents                                                                           |
+| -------------------------- | ---------------------------------------------------------------------------------- |
+| `zones_current`            | The open version of every record (`valid_to` is unset), one row per key.          |
+| `zones_history_YYYYMM`     | Versions superseded (or deleted) during that month, with their `valid_to`.        |
+| `zones_history_YYYY`       | Monthly partitions of that year, merged by `compact()`.                           |
+
+Because versions are partitioned by the month they were closed in, a version that was valid at time `T` is either
+still current or in a partition of `T`'s month or later. Point-in-time queries (`as_of()`) only read those
+partitions, through a `(valid_from, valid_to)` index, & lookups of one record's history (`versions()`) use a
+`(key, valid_from)` index. `compact()` merges old monthly partitions into yearly ones & drops partitions past a
+retention period, with `DROP TABLE` instead of row-by-row deletes.
+
+Usage:
+
+``` py linenums=1
+history = HistoryStore(engine, "zones", key="id", exclude=["modified_on"])
+history.record_snapshot(zones)
+
+history.field_changes(zone_id, "plan")  ## When did this zone's plan change?
+history.compact(merge_after_months=3, retain_months=24)
+```
+
+Naive datetimes are taken as UTC.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import datetime as dt
+import hashlib
+import json
+import logging
+import re
+import time
+import typing as t
+
+log = logging.getLogger(__name__)
+
+from core_utils.hash_utils import canonical_json, get_hash_from_record
+
+import sqlalchemy as sa
+
+## Keys per `IN (...)` batch
+_IN_BATCH_SIZE: int = 500
+
+
+@dataclass
+class HistoryPartition:
+    """A history table & the months (`YYYYMM`) of the versions it holds."""
+
+    table: str
+    label: str
+    first_month: int
+    last_month: int
+
+    @property
+    def merged(self) -> bool:
+        return len(self.label) == 4
+
+
+@dataclass
+class SnapshotResult:
+    """Changes a snapshot recorded."""
+
+    at: dt.datetime
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "at": self.at.isoformat(),
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+@dataclass
+class CompactionResult:
+    """Partitions a `compact()` run merged & dropped."""
+
+    ## Yearly partition -> the monthly partitions merged into it
+    merged: dict[str, list[str]] = field(default_factory=dict)
+    dropped: list[str] = field(default_factory=list)
+    rows_dropped: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "merged": {table: len(tables) for table, tables in self.merged.items()},
+            "dropped": len(self.dropped),
+            "rows_dropped": self.rows_dropped,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def _utc(at: dt.datetime | None) -> dt.datetime:
+    """Return a naive UTC datetime, the form timestamps are stored in."""
+    if at is None:
+        return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+    if at.tzinfo is not None:
+        return at.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+    return at
+
+
+def _month(at: dt.datetime) -> int:
+    return at.year * 100 + at.month
+
+
+def _month_index(month: int) -> int:
+    """A `YYYYMM` month as a count of months, for month arithmetic."""
+    return (month // 100) * 12 + (month % 100) - 1
+
+
+def _batches(items: list, size: int = _IN_BATCH_SIZE) -> t.Generator[list, None, None]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class HistoryStore:
+    """Versioned history of one kind of record. See the module docstring.
+
+    Params:
+        engine (sqlalchemy.Engine): The database to store history in.
+        name (str): Prefix of the store's tables, i.e. `"zones"`.
+        key (str): (default: "id") The record field identifying a record across snapshots.
+        exclude (Iterable[str] | None): Record fields left out of the content hash, i.e. volatile timestamps.
+            They are still stored.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        name: str,
+        key: str = "id",
+        exclude: t.Iterable[str] | None = None,
+    ) -> None:
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            raise ValueError(f"History store name must be a valid table name prefix. Got: '{name}'")
+
+        self.engine: sa.Engine = engine
+        self.name: str = name
+        self.key: str = key
+        self.exclude: list[str] = list(exclude or [])
+
+        self.metadata: sa.MetaData = sa.MetaData()
+        self.current: sa.Table = sa.Table(
+            f"{name}_current",
+            self.metadata,
+            sa.Column("key", sa.String(255), primary_key=True),
+            sa.Column("content_hash", sa.String(32), nullable=False),
+            sa.Column("valid_from", sa.DateTime, nullable=False, index=True),
+            sa.Column("data", sa.Text, nullable=False),
+        )
+        self._partition_pattern: re.Pattern = re.compile(rf"^{re.escape(name)}_history_(\d{{6}}|\d{{4}})$")
+        self._created: bool = False
+
+    def __repr__(self) -> str:
+        return f"HistoryStore(name={self.name!r}, key={self.key!r}, exclude={self.exclude})"
+
+    def _partition_table(self, label: str) -> sa.Table:
+        """Return the table definition of a partition (`YYYYMM` or `YYYY`), defining it on first use."""
+        table_name: str = f"{self.name}_history_{label}"
+        table: sa.Table | None = self.metadata.tables.get(table_name)
+        if table is not None:
+            return table
+
+        return sa.Table(
+            table_name,
+            self.metadata,
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("key", sa.String(255), nullable=False),
+            sa.Column("content_hash", sa.String(32), nullable=False),
+            sa.Column("valid_from", sa.DateTime, nullable=False),
+            sa.Column("valid_to", sa.DateTime, nullable=False),
+            sa.Column("data", sa.Text, nullable=False),
+            sa.Index(f"ix_{table_name}_key", "key", "valid_from"),
+            sa.Index(f"ix_{table_name}_valid", "valid_from", "valid_to"),
+        )
+
+    def create(self) -> None:
+        """Create the current-versions table if it doesn't exist. Partitions are created as they are needed."""
+        self.current.create(self.engine, checkfirst=True)
+        self._created = True
+
+    def partitions(self, conn: sa.Connection | None = None) -> list[HistoryPartition]:
+        """Return the store's history partitions, oldest first."""
+        if conn is None:
+            with self.engine.connect() as conn:
+                return self.partitions(conn)
+
+        partitions: list[HistoryPartition] = []
+        for table_name in sa.inspect(conn).get_table_names():
+            match: re.Match | None = self._partition_pattern.match(table_name)
+            if match is None:
+                continue
+
+            label: str = match.group(1)
+            if len(label) == 4:
+                first_month, last_month = int(label) * 100 + 1, int(label) * 100 + 12
+            else:
+                first_month = last_month = int(label)
+
+            partitions.append(HistoryPartition(table_name, label, first_month, last_month))
+
+        return sorted(partitions, key=lambda p: (p.first_month, p.last_month))
+
+    def _encode(self, record: dict) -> tuple[str, str]:
+        """Return a record's `(content hash, canonical JSON)`."""
+        data: str = canonical_json(record)
+        if self.exclude:
+            return get_hash_from_record(record, exclude=self.exclude), data
+
+        ## Without exclusions the hash is of the same canonical JSON, which is already built
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest(), data
+
+    def record_snapshot(
+        self,
+        records: t.Iterable[dict],
+        at: dt.datetime | None = None,
+        complete: bool = True,
+    ) -> SnapshotResult:
+        """Record a snapshot, writing new versions only for records whose content changed.
+
+        Params:
+            records (Iterable[dict]): The records, each with the store's `key` field.
+            at (datetime | None): When the snapshot was taken. Defaults to now. Snapshots must be recorded in order.
+            complete (bool): (default: True) The snapshot holds every record, so current records missing from it
+                were deleted & are closed. With `False` (a partial snapshot), missing records are left as they are.
+
+        Returns:
+            (SnapshotResult): The keys added, changed & removed.
+
+        Raises:
+            ValueError: When `at` is older than the latest recorded version.
+
+        """
+        start: float = time.perf_counter()
+        at = _utc(at)
+        result: SnapshotResult = SnapshotResult(at=at)
+
+        incoming: dict[str, tuple[str, str]] = {}
+        for record in records:
+            incoming[str(record[self.key])] = self._encode(record)
+
+        if not self._created:
+            self.create()
+
+        try:
+            with self.engine.begin() as conn:
+                latest: dt.datetime | None = conn.execute(sa.select(sa.func.max(self.current.c.valid_from))).scalar()
+                if latest is not None and latest > at:
+                    raise ValueError(f"Snapshot at {at} is older than the latest recorded version ({latest})")
+
+                current: dict[str, str] = dict(
+                    conn.execute(sa.select(self.current.c.key, self.current.c.content_hash)).all()
+                )
+
+                for key, (content_hash, _) in incoming.items():
+                    old_hash: str | None = current.get(key)
+                    if old_hash is None:
+                        result.added.append(key)
+                    elif old_hash != content_hash:
+                        result.changed.append(key)
+                    else:
+                        result.unchanged += 1
+
+                if complete:
+                    result.removed = [key for key in current if key not in incoming]
+
+                self._close_versions(conn, result.changed + result.removed, at)
+                self._open_versions(conn, result.added + result.changed, incoming, at)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error recording '{self.name}' history snapshot. Details: {exc}"
+            log.error(msg)
+
+            raise exc
+
+        result.elapsed = time.perf_counter() - start
+        log.info(f"Recorded '{self.name}' history snapshot: {result.summary()}")
+
+        return result
+
+    def _close_versions(self, conn: sa.Connection, keys: list[str], at: dt.datetime) -> None:
+        """Move the current versions of `keys` into the partition of `at`'s month, ending at `at`."""
+        if not keys:
+            return
+
+        partition: sa.Table = self._partition_table(f"{_month(at)}")
+        partition.create(conn, checkfirst=True)
+
+        for batch in _batches(keys):
+            rows: list[dict] = [
+                {**row, "valid_to": at}
+                for row in conn.execute(sa.select(self.current).where(self.current.c.key.in_(batch))).mappings()
+            ]
+            conn.execute(sa.insert(partition), rows)
+            conn.execute(sa.delete(self.current).where(self.current.c.key.in_(batch)))
+
+    def _open_versions(
+        self, conn: sa.Connection, keys: list[str], incoming: dict[str, tuple[str, str]], at: dt.datetime
+    ) -> None:
+        for batch in _batches(keys, 1000):
+            conn.execute(
+                sa.insert(self.current),
+                [
+                    {"key": key, "content_hash": incoming[key][0], "valid_from": at, "data": incoming[key][1]}
+                    for key in batch
+                ],
+            )
+
+    def _versions_select(self, table: sa.Table, current: bool) -> sa.Select:
+        valid_to: sa.ColumnElement = sa.null().label("valid_to") if current else table.c.valid_to
+
+        return sa.select(table.c.key, table.c.content_hash, table.c.valid_from, valid_to, table.c.data)
+
+    def _query(self, selects: list[sa.Select], order_by: t.Sequence[str]) -> list[dict]:
+        if not self._created:
+            self.create()
+
+        stmt = sa.union_all(*selects).subquery()
+        with self.engine.connect() as conn:
+            rows = conn.execute(sa.select(stmt).order_by(*(stmt.c[col] for col in order_by))).mappings()
+
+            return [{**row, "data": json.loads(row["data"])} for row in rows]
+
+    def as_of(self, at: dt.datetime, keys: t.Iterable[t.Any] | None = None) -> list[dict]:
+        """Return the versions that were valid at a point in time.
+
+        Params:
+            at (datetime): The point in time.
+            keys (Iterable | None): Only return these records.
+
+        Returns:
+            (list[dict]): One `{"key", "content_hash", "valid_from", "valid_to", "data"}` dict per record valid at
+                `at`, sorted by key. `valid_to` is `None` for current versions.
+
+        """
+        at = _utc(at)
+        key_list: list[str] | None = [str(key) for key in keys] if keys is not None else None
+
+        selects: list[sa.Select] = []
+        for table, is_current in [(self.current, True)] + [
+            (self._partition_table(p.label), False) for p in self.partitions() if p.last_month >= _month(at)
+        ]:
+            stmt: sa.Select = self._versions_select(table, is_current).where(table.c.valid_from <= at)
+            if not is_current:
+                stmt = stmt.where(table.c.valid_to > at)
+            if key_list is not None:
+                stmt = stmt.where(table.c.key.in_(key_list))
+            selects.append(stmt)
+
+        return self._query(selects, order_by=["key"])
+
+    def versions(self, key: t.Any) -> list[dict]:
+        """Return every stored version of one record, oldest first. See `as_of()` for the dict layout."""
+        selects: list[sa.Select] = [
+            self._versions_select(table, is_current).where(table.c.key == str(key))
+            for table, is_current in [(self.current, True)]
+            + [(self._partition_table(p.label), False) for p in self.partitions()]
+        ]
+
+        return self._query(selects, order_by=["valid_from"])
+
+    def field_changes(self, key: t.Any, field_name: str) -> list[dict]:
+        """Return when a field of one record changed, i.e. "when did this zone's plan change?".
+
+        Returns:
+            (list[dict]): `{"at", "old", "new"}` for each version where the field's value differs from the previous
+                version's, oldest first. The first version is reported with `old=None`.
+
+        """
+        changes: list[dict] = []
+        previous: t.Any = None
+
+        for i, version in enumerate(self.versions(key)):
+            value: t.Any = version["data"].get(field_name)
+            if i == 0 or value != previous:
+                changes.append({"at": version["valid_from"], "old": previous, "new": value})
+            previous = value
+
+        return changes
+
+    def compact(
+        self,
+        merge_after_months: int | None = None,
+        retain_months: int | None = None,
+        now: dt.datetime | None = None,
+        vacuum: bool = False,
+    ) -> CompactionResult:
+        """Merge old monthly partitions into yearly ones & drop partitions past the retention period.
+
+        Params:
+            merge_after_months (int | None): Merge monthly partitions older than this many months into one
+                partition per year. `None` merges nothing.
+            retain_months (int | None): Drop partitions whose newest versions were closed more than this many months
+                ago. Current versions are never dropped. `None` drops nothing.
+            now (datetime | None): The reference time. Defaults to now.
+            vacuum (bool): (default: False) On SQLite, `VACUUM` afterwards to return dropped pages to the filesystem.
+
+        Returns:
+            (CompactionResult): The partitions merged & dropped.
+
+        """
+        start: float = time.perf_counter()
+        now_index: int = _month_index(_month(_utc(now)))
+        result: CompactionResult = CompactionResult()
+
+        try:
+            with self.engine.begin() as conn:
+                partitions: list[HistoryPartition] = self.partitions(conn)
+
+                if retain_months is not None:
+                    for partition in partitions:
+                        if now_index - _month_index(partition.last_month) > retain_months:
+                            table: sa.Table = self._partition_table(partition.label)
+                            result.rows_dropped += conn.execute(sa.select(sa.func.count()).select_from(table)).scalar()
+                            table.drop(conn)
+                            self.metadata.remove(table)
+                            result.dropped.append(partition.table)
+
+                if merge_after_months is not None:
+                    for partition in partitions:
+                        if (
+                            partition.merged
+                            or partition.table in result.dropped
+                            or now_index - _month_index(partition.last_month) <= merge_after_months
+                        ):
+                            continue
+
+                        monthly: sa.Table = self._partition_table(partition.label)
+                        yearly: sa.Table = self._partition_table(partition.label[:4])
+                        yearly.create(conn, checkfirst=True)
+
+                        columns: list[str] = ["key", "content_hash", "valid_from", "valid_to", "data"]
+                        conn.execute(
+                            sa.insert(yearly).from_select(columns, sa.select(*(monthly.c[col] for col in columns)))
+                        )
+                        monthly.drop(conn)
+                        self.metadata.remove(monthly)
+                        result.merged.setdefault(yearly.name, []).append(partition.table)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error compacting '{self.name}' history. Details: {exc}"
+            log.error(msg)
+
+            raise exc
+
+        if vacuum and self.engine.dialect.name == "sqlite":
+            ## VACUUM can't run inside a transaction
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(sa.text("VACUUM"))
+
+        result.elapsed = time.perf_counter() - start
+        log.info(f"Compacted '{self.name}' history: {result.summary()}")
+
+        return result
@@ -0,0 +1,278 @@
+"""Stream database tables to Parquet files & load them back.
+
+`export_table_parquet()` reads a table through a server-side cursor (`yield_per`; on Postgres a named cursor, on
+SQLite rows are stepped from the statement as they are fetched), converts each chunk of rows to an Arrow record
+batch & writes it as its own row group. Memory use is bounded by `chunk_size`, not by the size of the table.
+
+`import_parquet_table()` is the reverse: it reads a Parquet file one batch at a time & inserts each batch with one
+executemany, all in one transaction.
+
+Column types map to Arrow types (see `arrow_type()`); JSON columns are written as JSON strings, marked in the field
+metadata, & decoded again on import. Requires `pyarrow` (install the `database-lib[parquet]` extra).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+from pathlib import Path
+import time
+import typing as t
+
+log = logging.getLogger(__name__)
+
+import sqlalchemy as sa
+
+## Parquet field metadata marking columns exported from JSON columns, so a created table gets JSON columns again
+JSON_FIELD_METADATA: dict[bytes, bytes] = {b"db_lib.type": b"json"}
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def _require_pyarrow() -> t.Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        msg = f"({type(exc)}) Parquet export & import require pyarrow. Install the 'database-lib[parquet]' extra. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    return pyarrow
+
+
+def arrow_type(column_type: sa.types.TypeEngine) -> tuple[pa.DataType, t.Callable[[t.Any], t.Any] | None]:
+    """Return the Arrow type a column is exported as, & a converter for its values (`None` when not needed).
+
+    Params:
+        column_type (sqlalchemy.types.TypeEngine): A column's SQLAlchemy type.
+
+    Returns:
+        (tuple[pyarrow.DataType, Callable | None]): The Arrow type, & a function converting each non-null value.
+
+    """
+    pa = _require_pyarrow()
+
+    if isinstance(column_type, sa.JSON):
+        return pa.string(), lambda value: json.dumps(value, default=str)
+    if isinstance(column_type, sa.Boolean):
+        return pa.bool_(), None
+    if isinstance(column_type, sa.SmallInteger):
+        return pa.int16(), None
+    if isinstance(column_type, sa.Integer):
+        return pa.int64(), None
+    if isinstance(column_type, sa.Numeric):
+        ## Float & Numeric; decimals are exported as doubles
+        return pa.float64(), float
+    if isinstance(column_type, sa.DateTime):
+        if column_type.timezone:
+            ## SQLite returns naive datetimes for timezone-aware columns; they are stored as UTC
+            return pa.timestamp("us", tz="UTC"), lambda value: value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+
+        return pa.timestamp("us"), None
+    if isinstance(column_type, sa.Date):
+        return pa.date32(), None
+    if isinstance(column_type, sa.Time):
+        return pa.time64("us"), None
+    if isinstance(column_type, sa.LargeBinary):
+        return pa.binary(), None
+    if isinstance(column_type, sa.Enum):
+        ## A subclass of String that returns enum members. `export_table_parquet()` selects the stored strings
+        #  instead (member names by default, see `values_callable`), which import back as they are.
+        return pa.string(), str
+    if isinstance(column_type, sa.String):
+        return pa.string(), None
+
+    ## Anything else (UUID, intervals, enums, ...) is exported as text
+    return pa.string(), str
+
+
+def sqla_type(arrow_field: pa.Field) -> sa.types.TypeEngine:
+    """Return the SQLAlchemy column type a Parquet field is imported as, when `import_parquet_table()` creates a table."""
+    pa = _require_pyarrow()
+    arrow_dtype: pa.DataType = arrow_field.type
+
+    if (arrow_field.metadata or {}).get(b"db_lib.type") == JSON_FIELD_METADATA[b"db_lib.type"]:
+        return sa.JSON()
+    if pa.types.is_boolean(arrow_dtype):
+        return sa.Boolean()
+    if pa.types.is_integer(arrow_dtype):
+        return sa.BigInteger()
+    if pa.types.is_floating(arrow_dtype) or pa.types.is_decimal(arrow_dtype):
+        return sa.Float()
+    if pa.types.is_timestamp(arrow_dtype):
+        return sa.DateTime(timezone=arrow_dtype.tz is not None)
+    if pa.types.is_date(arrow_dtype):
+        return sa.Date()
+    if pa.types.is_time(arrow_dtype):
+        return sa.Time()
+    if pa.types.is_binary(arrow_dtype) or pa.types.is_large_binary(arrow_dtype):
+        return sa.LargeBinary()
+    if pa.types.is_string(arrow_dtype) or pa.types.is_large_string(arrow_dtype):
+        return sa.Text()
+
+    return sa.JSON()
+
+
+def _get_table(engine: sa.Engine, table: t.Union[str, sa.Table, t.Any]) -> sa.Table:
+    """Return a `Table` for a table name (reflected from the database), a `Table`, or an ORM model."""
+    if isinstance(table, sa.Table):
+        return table
+    if hasattr(table, "__table__"):
+        return table.__table__
+
+    return sa.Table(table, sa.MetaData(), autoload_with=engine)
+
+
+def export_table_parquet(
+    engine: sa.Engine,
+    table: t.Union[str, sa.Table, t.Any],
+    output_file: t.Union[str, Path],
+    chunk_size: int = 10_000,
+    where: sa.ColumnElement[bool] | None = None,
+    compression: str = "zstd",
+) -> int:
+    """Stream a table to a Parquet file, one row group per `chunk_size` rows.
+
+    Params:
+        engine (sqlalchemy.Engine): The database to read from.
+        table (str | sqlalchemy.Table | model): The table name, `Table`, or ORM model to export.
+        output_file (str | Path): The Parquet file to write. Parent directories are created.
+        chunk_size (int): (default: 10_000) Rows fetched per round trip & written per row group.
+        where (ColumnElement[bool] | None): Only export rows matching this filter.
+        compression (str): (default: "zstd") Parquet compression codec.
+
+    Returns:
+        (int): The number of rows written.
+
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer. Got: {chunk_size}")
+
+    start: float = time.perf_counter()
+    sa_table: sa.Table = _get_table(engine, table)
+    columns: list[sa.Column] = list(sa_table.columns)
+
+    types: list[tuple[pa.DataType, t.Callable | None]] = [arrow_type(col.type) for col in columns]
+    schema: pa.Schema = pa.schema(
+        [
+            pa.field(
+                col.name,
+                dtype,
+                nullable=col.nullable,
+                metadata=JSON_FIELD_METADATA if isinstance(col.type, sa.JSON) else None,
+            )
+            for col, (dtype, _) in zip(columns, types)
+        ]
+    )
+
+    stmt: sa.Select = sa.select(
+        *(sa.type_coerce(col, sa.String()).label(col.name) if isinstance(col.type, sa.Enum) else col for col in columns)
+    )
+    if where is not None:
+        stmt = stmt.where(where)
+    ## Primary key order keeps repeated exports of an unchanged table identical
+    stmt = stmt.order_by(*sa_table.primary_key.columns)
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    written: int = 0
+
+    try:
+        with engine.connect() as conn, pq.ParquetWriter(output_file, schema, compression=compression) as writer:
+            result = conn.execution_options(yield_per=chunk_size).execute(stmt)
+
+            for rows in result.partitions(chunk_size):
+                arrays: list[pa.Array] = []
+                for i, (dtype, convert) in enumerate(types):
+                    values: list = [row[i] for row in rows]
+                    if convert is not None:
+                        values = [None if value is None else convert(value) for value in values]
+                    arrays.append(pa.array(values, type=dtype))
+
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                written += len(rows)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error exporting table '{sa_table.name}' to '{output_file}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    log.info(f"Exported [{written}] row(s) from table '{sa_table.name}' to '{output_file}' in {time.perf_counter() - start:.3f}s")
+
+    return written
+
+
+def import_parquet_table(
+    engine: sa.Engine,
+    input_file: t.Union[str, Path],
+    table: t.Union[str, sa.Table, t.Any],
+    batch_size: int = 10_000,
+    create: bool = False,
+) -> int:
+    """Insert the rows of a Parquet file into a table, one executemany per batch, in one transaction.
+
+    Params:
+        engine (sqlalchemy.Engine): The database to write to.
+        input_file (str | Path): The Parquet file to read.
+        table (str | sqlalchemy.Table | model): The table name, `Table`, or ORM model to insert into.
+        batch_size (int): (default: 10_000) Rows read & inserted per batch.
+        create (bool): (default: False) When `table` is a name that doesn't exist, create it from the file's
+            schema (see `sqla_type()`). The new table has no primary key or indexes.
+
+    Returns:
+        (int): The number of rows inserted.
+
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer. Got: {batch_size}")
+
+    start: float = time.perf_counter()
+    parquet_file = pq.ParquetFile(input_file)
+
+    if create and isinstance(table, str) and not sa.inspect(engine).has_table(table):
+        sa_table: sa.Table = sa.Table(
+            table,
+            sa.MetaData(),
+            *(sa.Column(f.name, sqla_type(f), nullable=f.nullable) for f in parquet_file.schema_arrow),
+        )
+        sa_table.create(engine)
+        log.info(f"Created table '{table}' from the schema of '{input_file}'")
+    else:
+        sa_table = _get_table(engine, table)
+
+    ## Columns in both the file & the table; the file's other columns are ignored
+    names: list[str] = [name for name in parquet_file.schema_arrow.names if name in sa_table.columns]
+    json_columns: list[str] = [name for name in names if isinstance(sa_table.columns[name].type, sa.JSON)]
+    inserted: int = 0
+
+    try:
+        with engine.begin() as conn:
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=names):
+                rows: list[dict] = batch.to_pylist()
+                for row in rows:
+                    for name in json_columns:
+                        if isinstance(row[name], str):
+                            row[name] = json.loads(row[name])
+
+                if rows:
+                    conn.execute(sa.insert(sa_table), rows)
+                    inserted += len(rows)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error importing '{input_file}' into table '{sa_table.name}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    log.info(f"Imported [{inserted}] row(s) from '{input_file}' into table '{sa_table.name}' in {time.perf_counter() - start:.3f}s")
+
+    return inserted
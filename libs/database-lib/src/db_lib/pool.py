@@ -0,0 +1,220 @@
+"""Connection pool options & pool usage metrics.
+
+`get_engine()` sizes its pool from the `DB_POOL_*` settings (see `config/database/settings.toml`):
+
+| setting              | effect                                                                                  |
+| -------------------- | --------------------------------------------------------------------------------------- |
+| `db_pool_size`       | Connections kept open in the pool (SQLAlchemy default: 5).                              |
+| `db_max_overflow`    | Extra connections opened past `db_pool_size` under load & closed on checkin (default 10). |
+| `db_pool_timeout`    | Seconds to wait for a free connection before raising `TimeoutError` (default 30).        |
+| `db_pool_recycle`    | Replace connections older than this many seconds, i.e. below a server's idle timeout.     |
+| `db_pool_pre_ping`   | Test each connection on checkout & transparently replace dead ones.                     |
+
+Size, overflow & timeout only apply to queue pools (any file or server database); SQLite `:memory:` engines use
+a single connection per thread & ignore them.
+
+`instrument_pool()` counts pool events into a `PoolStats`: checkouts, time spent acquiring connections, overflow,
+timeouts & invalidations. A pool that is often at its overflow limit, or with a large `wait_max`, is undersized
+for the number of parallel writers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+import logging
+import threading
+import time
+import typing as t
+import weakref
+
+log = logging.getLogger(__name__)
+
+import sqlalchemy as sa
+import sqlalchemy.exc as sa_exc
+import sqlalchemy.pool as sa_pool
+
+## `create_engine()` pool option -> `DB_SETTINGS` key
+POOL_SETTINGS: dict[str, str] = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_recycle": "DB_POOL_RECYCLE",
+    "pool_pre_ping": "DB_POOL_PRE_PING",
+}
+## Options only a `QueuePool` accepts
+QUEUE_POOL_OPTIONS: tuple[str, ...] = ("pool_size", "max_overflow", "pool_timeout")
+
+## Engine -> its pool stats, dropped with the engine
+_POOL_STATS: weakref.WeakKeyDictionary[sa.Engine, PoolStats] = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class PoolStats:
+    """Counters of a connection pool's events, from `instrument_pool()`.
+
+    Timings are in seconds. `wait_*` is the time callers spent acquiring a connection, either waiting for a free
+    one or opening a new one.
+    """
+
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    soft_invalidations: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    checked_out_peak: int = 0
+    overflow_peak: int = 0
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_checkout(self, pool: sa.Pool) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+            if isinstance(pool, sa_pool.QueuePool):
+                self.checked_out_peak = max(self.checked_out_peak, pool.checkedout())
+                self.overflow_peak = max(self.overflow_peak, pool.overflow())
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.checkouts if self.checkouts else 0.0
+
+    def summary(self, pool: sa.Pool | None = None) -> dict[str, t.Any]:
+        """Return the counters as a dict; with a pool, add its current size & usage."""
+        with self._lock:
+            stats: dict[str, t.Any] = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+        stats["wait_total"] = round(stats["wait_total"], 6)
+        stats["wait_max"] = round(stats["wait_max"], 6)
+        stats["wait_avg"] = round(self.wait_avg, 6)
+
+        if pool is not None:
+            stats["pool"] = type(pool).__name__
+            if isinstance(pool, sa_pool.QueuePool):
+                stats.update(
+                    {
+                        "size": pool.size(),
+                        "checked_in": pool.checkedin(),
+                        "checked_out": pool.checkedout(),
+                        ## Negative while the pool is below its size
+                        "overflow": max(pool.overflow(), 0),
+                        "timeout": pool.timeout(),
+                    }
+                )
+
+        return stats
+
+
+def get_pool_options(
+    url: t.Union[str, sa.URL],
+    settings: t.Mapping | None = None,
+    **options: t.Any,
+) -> dict[str, t.Any]:
+    """Return the `create_engine()` pool options for a URL.
+
+    Params:
+        url (str | sqlalchemy.URL): The database URL the engine will connect to.
+        settings (Mapping | None): Fallback values by `POOL_SETTINGS` key, i.e. `DB_SETTINGS`.
+        **options: Pool options, i.e. `pool_size=20`. `None` values fall back to `settings`.
+
+    Returns:
+        (dict[str, Any]): The options that are set & that the URL's default pool class accepts.
+
+    """
+    resolved: dict[str, t.Any] = {}
+    for name, key in POOL_SETTINGS.items():
+        value = options.get(name)
+        if value is None and settings is not None:
+            value = settings.get(key, None)
+        ## Unset values in the settings file are empty strings
+        if value is not None and value != "":
+            resolved[name] = value
+
+    if any(name in resolved for name in QUEUE_POOL_OPTIONS):
+        url = sa.make_url(url)
+        pool_class: type[sa.Pool] = url.get_dialect().get_pool_class(url)
+
+        if not issubclass(pool_class, sa_pool.QueuePool):
+            dropped: list[str] = [name for name in QUEUE_POOL_OPTIONS if resolved.pop(name, None) is not None]
+            log.debug(f"{pool_class.__name__} does not take {dropped}, ignoring them for {url.get_backend_name()}")
+
+    return resolved
+
+
+def instrument_pool(engine: sa.Engine) -> PoolStats:
+    """Count an engine's pool events into a `PoolStats`. Calling it again returns the existing stats.
+
+    Params:
+        engine (sqlalchemy.Engine): The engine whose pool to instrument. For an `AsyncEngine`, pass its `sync_engine`.
+
+    Returns:
+        (PoolStats): The stats, updated live as the pool is used.
+
+    """
+    if engine in _POOL_STATS:
+        return _POOL_STATS[engine]
+
+    stats: PoolStats = PoolStats()
+    _POOL_STATS[engine] = stats
+
+    @sa.event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        stats.count("connects")
+
+    @sa.event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        stats.record_checkout(engine.pool)
+
+    @sa.event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        stats.count("checkins")
+
+    @sa.event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        stats.count("invalidations")
+
+    @sa.event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception) -> None:
+        stats.count("soft_invalidations")
+
+    ## Pool events have no hook before a checkout starts, so acquisition is timed around `Pool.connect()`.
+    #  `Engine.dispose()` swaps in a new pool, which is timed again.
+    @sa.event.listens_for(engine, "engine_disposed")
+    def _on_disposed(engine: sa.Engine) -> None:
+        _time_connect(engine.pool, stats)
+
+    _time_connect(engine.pool, stats)
+
+    return stats
+
+
+def get_pool_stats(engine: t.Any) -> PoolStats | None:
+    """Return the `PoolStats` of an instrumented `Engine` or `AsyncEngine`, or `None` if it is not instrumented."""
+    return _POOL_STATS.get(getattr(engine, "sync_engine", engine))
+
+
+def _time_connect(pool: sa.Pool, stats: PoolStats) -> None:
+    connect: t.Callable[[], t.Any] = pool.connect
+
+    def _timed_connect() -> t.Any:
+        start: float = time.perf_counter()
+        try:
+            return connect()
+        except sa_exc.TimeoutError:
+            stats.count("timeouts")
+            raise
+        finally:
+            stats.record_wait(time.perf_counter() - start)
+
+    pool.connect = _timed_connect
@@ -0,0 +1,326 @@
+"""Opt-in SQL timing, N+1 detection & slow query logging from cursor events.
+
+`echo=True` prints every statement, which is unreadable under load. `instrument_queries()` instead times each
+statement between SQLAlchemy's `before_cursor_execute` & `after_cursor_execute` events & aggregates by statement
+template (the SQL with its bound parameters, so one template covers every call of a query):
+
+- count, total, mean, p99 & max time, rows fetched (counted as the caller reads them from each `execute()` result,
+  since drivers like SQLite report a `rowcount` of `-1` for `SELECT`s; `exec_driver_sql()` results are not
+  counted), & rows affected (the driver's `rowcount` for `INSERT`, `UPDATE` & `DELETE` statements).
+- N+1 patterns: one template run `n_plus_one_threshold` or more times within one session's connection, i.e. a
+  lazy-loaded relationship read in a loop. Load those rows in one query instead (`selectinload()`, `IN (...)`).
+- slow queries: statements over `slow_query_seconds`, logged as warnings & kept in the report.
+
+Enable it for engines from `get_engine()` with the `DB_QUERY_STATS` setting (see `config/database/settings.toml`);
+with `DB_QUERY_REPORT` set, a JSON report of every instrumented engine is written to that path at process exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
+import logging
+import math
+from pathlib import Path
+import random
+import re
+import threading
+import time
+import typing as t
+import weakref
+
+log = logging.getLogger(__name__)
+
+import sqlalchemy as sa
+
+## Timing samples kept per template for the p99; past this, samples are replaced at random (reservoir sampling)
+MAX_SAMPLES: int = 10_000
+## Slow queries kept in the report (the most recent)
+MAX_SLOW_QUERIES: int = 100
+
+## Expanded `IN (?, ?, ...)` lists, collapsed so every list length shares a template
+_EXPANDED_PARAMS = re.compile(r"\((?:\s*(?:\?|%s|\$\d+|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|\$\d+|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+## Engine -> its query stats, dropped with the engine
+_QUERY_STATS: weakref.WeakKeyDictionary[sa.Engine, QueryStats] = weakref.WeakKeyDictionary()
+_REPORT_PATHS: set[Path] = set()
+
+
+## Compiled statements repeat, so their templates are cached
+@lru_cache(maxsize=4096)
+def get_statement_template(statement: str) -> str:
+    """Normalize a SQL statement to its template: whitespace collapsed & `IN (...)` lists of any length merged."""
+    return _EXPANDED_PARAMS.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class TemplateStats:
+    """Timings of one statement template. Times are in seconds."""
+
+    template: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    rows: int = 0
+    rows_affected: int = 0
+    samples: list[float] = field(default_factory=list, repr=False)
+
+    def record(self, seconds: float, rows_affected: int) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if rows_affected > 0:
+            self.rows_affected += rows_affected
+
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot: int = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p99(self) -> float:
+        if not self.samples:
+            return 0.0
+
+        ordered: list[float] = sorted(self.samples)
+
+        return ordered[max(math.ceil(len(ordered) * 0.99) - 1, 0)]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "template": self.template,
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.mean, 6),
+            "p99": round(self.p99, 6),
+            "max": round(self.max, 6),
+            "rows": self.rows,
+            "rows_affected": self.rows_affected,
+        }
+
+
+class _CountingFetchStrategy:
+    """Wrap a `CursorResult`'s fetch strategy, adding the rows it hands to the caller to a template's stats."""
+
+    def __init__(self, strategy: t.Any, stats: QueryStats, template: str) -> None:
+        self._strategy = strategy
+        self._stats = stats
+        self._template = template
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._strategy, name)
+
+    def fetchone(self, result, dbapi_cursor, hard_close=False):
+        row = self._strategy.fetchone(result, dbapi_cursor, hard_close)
+        if row is not None:
+            self._stats.add_rows(self._template, 1)
+
+        return row
+
+    def fetchmany(self, result, dbapi_cursor, size=None):
+        rows = self._strategy.fetchmany(result, dbapi_cursor, size)
+        self._stats.add_rows(self._template, len(rows))
+
+        return rows
+
+    def fetchall(self, result, dbapi_cursor):
+        rows = self._strategy.fetchall(result, dbapi_cursor)
+        self._stats.add_rows(self._template, len(rows))
+
+        return rows
+
+    def yield_per(self, result, dbapi_cursor, num):
+        self._strategy.yield_per(result, dbapi_cursor, num)
+
+        ## `yield_per()` switches the result to a buffered strategy; keep counting through it
+        if result.cursor_strategy is not self:
+            result.cursor_strategy = _CountingFetchStrategy(result.cursor_strategy, self._stats, self._template)
+
+
+class QueryStats:
+    """Per-template query timings, N+1 patterns & slow queries of one engine, from `instrument_queries()`."""
+
+    def __init__(self, slow_query_seconds: float = 0.5, n_plus_one_threshold: int = 200) -> None:
+        self.slow_query_seconds: float = slow_query_seconds
+        self.n_plus_one_threshold: int = n_plus_one_threshold
+
+        self.templates: dict[str, TemplateStats] = {}
+        ## Template -> {"max_count": most runs in one connection, "connections": connections over the threshold}
+        self.n_plus_one: dict[str, dict[str, int]] = {}
+        self.slow: list[dict[str, t.Any]] = []
+
+        ## Connection -> template -> runs on that connection
+        self._per_connection: weakref.WeakKeyDictionary[sa.Connection, dict[str, int]] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"QueryStats(templates={len(self.templates)}, n_plus_one={len(self.n_plus_one)}, slow={len(self.slow)})"
+
+    def record(self, conn: sa.Connection, statement: str, seconds: float, rows_affected: int) -> str:
+        """Record one run of a statement & return its template."""
+        template: str = get_statement_template(statement)
+
+        with self._lock:
+            stats: TemplateStats | None = self.templates.get(template)
+            if stats is None:
+                stats = self.templates[template] = TemplateStats(template)
+            stats.record(seconds, rows_affected)
+
+            runs: dict[str, int] = self._per_connection.setdefault(conn, {})
+            runs[template] = count = runs.get(template, 0) + 1
+
+            if count >= self.n_plus_one_threshold:
+                pattern: dict[str, int] = self.n_plus_one.setdefault(template, {"max_count": 0, "connections": 0})
+                pattern["max_count"] = max(pattern["max_count"], count)
+                if count == self.n_plus_one_threshold:
+                    pattern["connections"] += 1
+                    log.warning(f"Possible N+1 query: ran {count} times in one session: {template}")
+
+            if seconds >= self.slow_query_seconds:
+                self.slow.append({"template": template, "seconds": round(seconds, 6), "at": time.time()})
+                del self.slow[:-MAX_SLOW_QUERIES]
+
+        if seconds >= self.slow_query_seconds:
+            log.warning(f"Slow query ({seconds:.3f}s): {template}")
+
+        return template
+
+    def add_rows(self, template: str, rows: int) -> None:
+        """Add rows fetched from a result of a template's statement."""
+        with self._lock:
+            stats: TemplateStats | None = self.templates.get(template)
+            if stats is not None:
+                stats.rows += rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self.templates.clear()
+            self.n_plus_one.clear()
+            self.slow.clear()
+            self._per_connection.clear()
+
+    def report(self, top: int | None = None) -> dict[str, t.Any]:
+        """Return the stats as a JSON-serializable dict, templates sorted by total time.
+
+        Params:
+            top (int | None): Only include this many templates.
+
+        """
+        with self._lock:
+            templates: list[dict[str, t.Any]] = [
+                stats.summary() for stats in sorted(self.templates.values(), key=lambda s: s.total, reverse=True)
+            ]
+            n_plus_one: list[dict[str, t.Any]] = [
+                {"template": template, **pattern}
+                for template, pattern in sorted(self.n_plus_one.items(), key=lambda item: -item[1]["max_count"])
+            ]
+            slow: list[dict[str, t.Any]] = list(self.slow)
+
+        return {
+            "queries": sum(stats["count"] for stats in templates),
+            "total": round(sum(stats["total"] for stats in templates), 6),
+            "slow_query_seconds": self.slow_query_seconds,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "templates": templates[:top] if top else templates,
+            "n_plus_one": n_plus_one,
+            "slow": slow,
+        }
+
+
+def instrument_queries(
+    engine: sa.Engine,
+    slow_query_seconds: float = 0.5,
+    n_plus_one_threshold: int = 200,
+) -> QueryStats:
+    """Time every statement an engine runs. Calling it again returns the existing stats.
+
+    Params:
+        engine (sqlalchemy.Engine): The engine to instrument. For an `AsyncEngine`, pass its `sync_engine`.
+        slow_query_seconds (float): Log & keep statements taking at least this long.
+        n_plus_one_threshold (int): Flag templates run at least this many times on one connection.
+
+    Returns:
+        (QueryStats): The stats, updated live as the engine runs statements.
+
+    """
+    if engine in _QUERY_STATS:
+        return _QUERY_STATS[engine]
+
+    stats: QueryStats = QueryStats(slow_query_seconds=slow_query_seconds, n_plus_one_threshold=n_plus_one_threshold)
+    _QUERY_STATS[engine] = stats
+
+    @sa.event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("db_lib.query_start", []).append(time.perf_counter())
+
+    @sa.event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        seconds: float = time.perf_counter() - conn.info["db_lib.query_start"].pop()
+        is_dml: bool = context is not None and (context.isinsert or context.isupdate or context.isdelete)
+        template: str = stats.record(conn, statement, seconds, cursor.rowcount if is_dml else 0)
+
+        if context is not None:
+            ## Read back in `after_execute`, once the statement's result exists
+            context._db_lib_query_template = template
+
+    @sa.event.listens_for(engine, "after_execute")
+    def _after_execute(conn, clauseelement, multiparams, params, execution_options, result) -> None:
+        template: str | None = getattr(result.context, "_db_lib_query_template", None)
+
+        if template is not None and isinstance(result, sa.CursorResult) and result.returns_rows:
+            result.cursor_strategy = _CountingFetchStrategy(result.cursor_strategy, stats, template)
+
+    @sa.event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context) -> None:
+        ## A failed statement never reaches `after_cursor_execute`; drop its start time
+        conn: sa.Connection | None = exception_context.connection
+        if conn is not None and conn.info.get("db_lib.query_start"):
+            conn.info["db_lib.query_start"].pop()
+
+    return stats
+
+
+def get_query_stats(engine: t.Any) -> QueryStats | None:
+    """Return the `QueryStats` of an instrumented `Engine` or `AsyncEngine`, or `None` if it is not instrumented."""
+    return _QUERY_STATS.get(getattr(engine, "sync_engine", engine))
+
+
+def write_query_report(path: t.Union[str, Path]) -> Path:
+    """Write the query stats of every instrumented engine to a JSON file, keyed by database URL (password hidden)."""
+    path = Path(path)
+    report: dict[str, dict[str, t.Any]] = {
+        engine.url.render_as_string(hide_password=True): stats.report() for engine, stats in list(_QUERY_STATS.items())
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    log.info(f"Wrote query stats of [{len(report)}] engine(s) to {path}")
+
+    return path
+
+
+def write_query_report_at_exit(path: t.Union[str, Path]) -> None:
+    """Write `write_query_report(path)` when the process exits. Registering the same path again is a no-op."""
+    path = Path(path)
+    if path in _REPORT_PATHS:
+        return
+
+    _REPORT_PATHS.add(path)
+    atexit.register(_write_query_report_at_exit, path)
+
+
+def _write_query_report_at_exit(path: Path) -> None:
+    try:
+        write_query_report(path)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error writing query stats report to '{path}'. Details: {exc}"
+        log.error(msg)
@@ -0,0 +1,99 @@
+"""Named SQLite connection profiles, applied as `PRAGMA`s on every new connection.
+
+SQLite's defaults favor safety on any filesystem over speed: a rollback journal, `synchronous=FULL` (an fsync
+per commit), a ~2 MB page cache, no memory-mapped I/O, & no busy timeout, so a reader waiting on a writer fails
+with `database is locked` right away. PRAGMAs like these are per connection, so a profile is applied from the
+engine's `connect` event, to every connection the pool opens.
+
+Profiles:
+
+| profile       | effect                                                                                       |
+| ------------- | -------------------------------------------------------------------------------------------- |
+| `default`     | No PRAGMAs; SQLite's own defaults.                                                           |
+| `performance` | WAL journal (readers don't block the writer & vice versa), `synchronous=NORMAL` (fsync at   |
+|               | checkpoints instead of every commit; a power loss can lose the last commits but never        |
+|               | corrupts the database), a 64 MB page cache, 256 MB of memory-mapped I/O, temp tables in      |
+|               | memory, & a 5 second busy timeout.                                                           |
+
+WAL needs shared memory, so keep `performance` off network filesystems. Select a profile with the
+`DB_SQLITE_PROFILE` setting (see `config/database/settings.toml`) or pass `sqlite_profile` to `get_engine()`.
+"""
+
+from __future__ import annotations
+
+import logging
+import typing as t
+
+log = logging.getLogger(__name__)
+
+import sqlalchemy as sa
+
+## Profile name -> PRAGMA name -> value
+SQLITE_PROFILES: dict[str, dict[str, t.Any]] = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        ## Negative values are KiB: 64 MB
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+}
+
+
+def get_sqlite_pragmas(profile: str | None = "performance", **overrides: t.Any) -> dict[str, t.Any]:
+    """Return the PRAGMAs of a named profile, with individual PRAGMAs overridden.
+
+    Params:
+        profile (str | None): (default: "performance") One of `SQLITE_PROFILES`. `None` starts from no PRAGMAs.
+        **overrides: PRAGMA values replacing the profile's, i.e. `cache_size=-256_000`. `None` values are ignored.
+
+    Returns:
+        (dict[str, Any]): PRAGMA name -> value.
+
+    Raises:
+        ValueError: When the profile is unknown.
+
+    """
+    if profile is not None and profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: '{profile}'. Must be one of {list(SQLITE_PROFILES)}")
+
+    pragmas: dict[str, t.Any] = dict(SQLITE_PROFILES.get(profile) or {})
+    pragmas.update({name: value for name, value in overrides.items() if value is not None})
+
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: sa.Engine, pragmas: dict[str, t.Any]) -> sa.Engine:
+    """Run `PRAGMA name=value` for each pragma on every connection the engine opens.
+
+    Params:
+        engine (sqlalchemy.Engine): A SQLite engine.
+        pragmas (dict[str, Any]): PRAGMA name -> value, i.e. from `get_sqlite_pragmas()`.
+
+    Returns:
+        (sqlalchemy.Engine): The same engine.
+
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"SQLite PRAGMAs can only be applied to a SQLite engine. Got dialect: {engine.dialect.name}")
+
+    if not pragmas:
+        return engine
+
+    statements: list[str] = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @sa.event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    log.debug(f"Applying SQLite PRAGMAs on connect: {pragmas}")
+
+    return engine
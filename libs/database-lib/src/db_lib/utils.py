@@ -51,6 +51,10 @@ def backup_sqlite_db(source: str, target: str) -> None:
 
 def dump_sqlite_db_schema(source: str, output_dir: str = "db_schema/sqlite"):
     """Dump the schema of a SQLite database.
+
+    Description:
+        Reads the `CREATE` statements straight from `sqlite_master`, without reading any table data. Tables come
+        first, then indexes, triggers & views, as in `sqlite3.Connection.iterdump()`.
     
     Params:
         source (str): The path to the source database.
@@ -67,7 +71,25 @@ def dump_sqlite_db_schema(source: str, output_dir: str = "db_schema/sqlite"):
 
         raise exc
 
+    try:
+        statements: list[str] = [
+            sql
+            for (sql,) in connection.execute(
+                """
+                SELECT sql FROM sqlite_master
+                WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+                ORDER BY type != 'table', name
+                """
+            )
+        ]
+    except Exception as exc:
+        msg = f"({type(exc)}) Unhandled exception reading schema of '{source}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+    finally:
+        connection.close()
+
     with open(f"{output_dir}/CREATE_schema.sql", "w+") as f:
-        for line in connection.iterdump():
-            if line.startswith("CREATE"):
-                f.write(line + f"\n")
\ No newline at end of file
+        for sql in statements:
+            f.write(f"{sql};\n")
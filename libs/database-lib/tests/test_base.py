@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from db_lib.base import Base, BaseRepository
+
+import pytest
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+
+class _Base(Base):
+    __abstract__ = True
+    metadata = sa.MetaData()
+
+
+class ItemModel(_Base):
+    __tablename__ = "items"
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True, autoincrement=True)
+    name: so.Mapped[str] = so.mapped_column(sa.String(32))
+    rank: so.Mapped[int | None]
+
+
+@pytest.fixture
+def session():
+    engine: sa.Engine = sa.create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+
+    with so.Session(engine) as session:
+        yield session
+
+    engine.dispose()
+
+
+def test_bulk_upsert_inserts_rows_without_autoincrement_pk(session: so.Session):
+    repo: BaseRepository = BaseRepository(session, ItemModel)
+
+    keys = repo.bulk_upsert([{"name": f"item-{i}"} for i in range(10)], chunk_size=4)
+
+    assert keys == list(range(1, 11))
+    assert repo.count() == 10
+
+
+def test_bulk_upsert_collapses_rows_sharing_a_key(session: so.Session):
+    repo: BaseRepository = BaseRepository(session, ItemModel)
+
+    repo.bulk_upsert([{"id": 1, "name": "a"}, {"id": 1, "name": "b"}, {"name": "c"}])
+
+    assert session.execute(sa.select(ItemModel.id, ItemModel.name).order_by(ItemModel.id)).all() == [
+        (1, "b"),
+        (2, "c"),
+    ]
+
+
+def test_iter_pages_over_nullable_order_by(session: so.Session):
+    repo: BaseRepository = BaseRepository(session, ItemModel)
+    repo.bulk_upsert([{"name": f"item-{i}", "rank": None if i % 3 else i % 2} for i in range(10)])
+
+    rows: list[ItemModel] = list(repo.iter(batch_size=2, order_by=["rank"]))
+
+    assert len(rows) == 10
+    assert [row.rank for row in rows] == [None] * 6 + [0, 0, 1, 1]
+
+
+def test_list_page_pages_over_nullable_order_by(session: so.Session):
+    repo: BaseRepository = BaseRepository(session, ItemModel)
+    repo.bulk_upsert([{"name": f"item-{i}", "rank": None if i < 3 else i} for i in range(6)])
+
+    seen: list[int] = []
+    next_key = None
+    while True:
+        rows, next_key = repo.list_page(after_key=next_key, limit=2, order_by=["rank"], columns=[ItemModel.id])
+        seen.extend(row[0] for row in rows)
+        if next_key is None:
+            break
+
+    assert seen == [1, 2, 3, 4, 5, 6]
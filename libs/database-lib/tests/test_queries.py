@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from db_lib.queries import QueryStats, get_statement_template, instrument_queries
+
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture
+def engine():
+    engine: sa.Engine = sa.create_engine("sqlite://")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    yield engine
+
+    engine.dispose()
+
+
+def _template_stats(stats: QueryStats, prefix: str) -> dict:
+    return next(summary for summary in stats.report()["templates"] if summary["template"].startswith(prefix))
+
+
+def test_get_statement_template_merges_in_lists():
+    assert get_statement_template("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (...)"
+
+
+def test_rows_counts_fetched_rows_and_affected_rows(engine: sa.Engine):
+    stats: QueryStats = instrument_queries(engine)
+    items = sa.table("items", sa.column("id"), sa.column("name"))
+
+    with engine.begin() as conn:
+        conn.execute(sa.insert(items), [{"name": f"item-{i}"} for i in range(10)])
+        conn.execute(sa.update(items).where(items.c.id <= 4).values(name="x"))
+
+    with engine.connect() as conn:
+        for _ in range(2):
+            conn.execute(sa.select(items)).all()
+        assert len(conn.execute(sa.select(items.c.id)).fetchmany(3)) == 3
+        assert sum(len(rows) for rows in conn.execute(sa.select(items.c.name)).yield_per(4).partitions()) == 10
+
+    assert _template_stats(stats, "INSERT")["rows_affected"] == 10
+    assert _template_stats(stats, "UPDATE")["rows_affected"] == 4
+    assert _template_stats(stats, "SELECT items.id, items.name")["rows"] == 20
+    assert _template_stats(stats, "SELECT items.id FROM")["rows"] == 3
+    assert _template_stats(stats, "SELECT items.name")["rows"] == 10
+
+
+def test_n_plus_one_is_flagged_per_connection(engine: sa.Engine):
+    stats: QueryStats = instrument_queries(engine, n_plus_one_threshold=5)
+
+    with engine.connect() as conn:
+        for i in range(6):
+            conn.execute(sa.text("SELECT name FROM items WHERE id = :id"), {"id": i}).all()
+
+    assert stats.report()["n_plus_one"] == [
+        {"template": "SELECT name FROM items WHERE id = ?", "max_count": 6, "connections": 1}
+    ]
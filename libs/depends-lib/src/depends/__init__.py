@@ -1,3 +1,12 @@
 from __future__ import annotations
 
-from .db_depends import get_db_engine, get_db_uri, get_session_pool
+from .db_depends import (
+    dispose_db_engines,
+    get_async_db_engine,
+    get_async_session_pool,
+    get_db_engine,
+    get_db_pool_stats,
+    get_db_uri,
+    get_session_pool,
+    get_sqlite_pragma_settings,
+)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 import typing as t
 
 log = logging.getLogger(__name__)
@@ -10,31 +11,45 @@ from settings import DB_SETTINGS
 
 import sqlalchemy as sa
 import sqlalchemy.orm as so
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+## Engines & session pools created by `get_db_engine()` & `get_session_pool()`, by URL
+_ENGINES: dict[str, sa.Engine] = {}
+_SESSION_POOLS: dict[str, so.sessionmaker[so.Session]] = {}
+_ENGINES_LOCK = threading.Lock()
+
 
 def get_db_uri(
-    drivername: str = DB_SETTINGS.get("DB_DRIVERNAME", default="sqlite+pysqlite"),
-    username: str | None = DB_SETTINGS.get("DB_USERNAME", default=None),
-    password: str | None = DB_SETTINGS.get("DB_PASSWORD", default=None),
-    host: str | None = DB_SETTINGS.get("DB_HOST", default=None),
-    port: int | None = DB_SETTINGS.get("DB_PORT", default=None),
-    database: str = DB_SETTINGS.get("DB_DATABASE", default="demo.sqlite"),
+    drivername: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    database: str | None = None,
     as_str: bool = False,
 ) -> sa.URL:
     """Construct a SQLAlchemy `URL` for a database connection.
+
+    Description:
+        Params left as `None` are read from `DB_SETTINGS` when called, not when the module is imported.
     
     Params:
-        drivername (str): The SQLAlchemy drivername value, i.e. `sqlite+pysqlite`.
-        username (str|None): The username for database auth.
-        password (str|None): The password for database auth.
-        host (str|None): The database server host address.
-        port (int|None): The database server port.
+        drivername (str): The SQLAlchemy drivername value, i.e. `sqlite+pysqlite`. Defaults to `DB_DRIVERNAME`.
+        username (str|None): The username for database auth. Defaults to `DB_USERNAME`.
+        password (str|None): The password for database auth. Defaults to `DB_PASSWORD`.
+        host (str|None): The database server host address. Defaults to `DB_HOST`.
+        port (int|None): The database server port. Defaults to `DB_PORT`.
         database (str): The database to connect to. For SQLite, use a file path, i.e. `path/to/app.sqlite`.
+            Defaults to `DB_DATABASE`.
         as_str (bool): Return the SQLAlchemy `URL` as a string.
         
     Returns:
         (sa.URL): A SQLAlchemy `URL`
 
     """
+    drivername = drivername or DB_SETTINGS.get("DB_DRIVERNAME", default="sqlite+pysqlite")
+    database = database or DB_SETTINGS.get("DB_DATABASE", default="demo.sqlite")
+
     if DB_SETTINGS.get("DB_TYPE") == "sqlite":
         db_uri: sa.URL = db.get_db_uri(drivername=drivername, database=database, username=None, password=None, host=None, port=None)
         
@@ -45,10 +60,10 @@ def get_db_uri(
 
     db_uri: sa.URL = db.get_db_uri(
         drivername=drivername,
-        username=username,
-        password=password,
-        host=host,
-        port=port,
+        username=username if username is not None else DB_SETTINGS.get("DB_USERNAME", default=None),
+        password=password if password is not None else DB_SETTINGS.get("DB_PASSWORD", default=None),
+        host=host if host is not None else DB_SETTINGS.get("DB_HOST", default=None),
+        port=port if port is not None else DB_SETTINGS.get("DB_PORT", default=None),
         database=database,
     )
 
@@ -58,34 +73,182 @@ def get_db_uri(
         return db_uri
 
 
-def get_db_engine(db_uri: sa.URL = get_db_uri(), echo: bool = False) -> sa.Engine:
-    """Construct a SQLAlchemy `Engine` for a database connection.
+def get_sqlite_pragma_settings() -> dict:
+    """Return the SQLite PRAGMA overrides set in `DB_SETTINGS` (`DB_SQLITE_CACHE_SIZE`, `DB_SQLITE_MMAP_SIZE`, `DB_SQLITE_BUSY_TIMEOUT`)."""
+    return {
+        "cache_size": DB_SETTINGS.get("DB_SQLITE_CACHE_SIZE", default=None),
+        "mmap_size": DB_SETTINGS.get("DB_SQLITE_MMAP_SIZE", default=None),
+        "busy_timeout": DB_SETTINGS.get("DB_SQLITE_BUSY_TIMEOUT", default=None),
+    }
+
+
+def _url_key(db_uri: t.Union[str, sa.URL]) -> str:
+    return sa.make_url(db_uri).render_as_string(hide_password=False)
+
+
+def get_db_engine(
+    db_uri: sa.URL | None = None,
+    echo: bool = False,
+    sqlite_profile: str | None = None,
+    sqlite_pragmas: dict | None = None,
+) -> sa.Engine:
+    """Return the SQLAlchemy `Engine` for a database URL, creating it on first use.
+
+    Description:
+        One engine (& connection pool) is created per URL & cached for the life of the process, so every caller
+        shares it. Creation is thread-safe. The options only apply when the URL's engine is first created; call
+        `dispose_db_engines()` to close cached engines, i.e. before forking worker processes or at shutdown.
     
     Params:
-        db_uri (sa.URL): A SQLAlchemy `URL` for a database connection.
+        db_uri (sa.URL | None): A SQLAlchemy `URL` for a database connection. Defaults to `get_db_uri()`.
         echo (bool): Echo SQL statements to the console.
+        sqlite_profile (str | None): SQLite PRAGMA profile, i.e. `"performance"`. Defaults to `DB_SQLITE_PROFILE`.
+        sqlite_pragmas (dict | None): PRAGMAs overriding the profile's. Defaults to the `DB_SQLITE_*` settings.
         
     Returns:
         (sa.Engine): A SQLAlchemy `Engine`
 
     """
-    engine: sa.Engine = db.get_engine(url=db_uri, echo=echo)
+    db_uri = db_uri or get_db_uri()
+    key: str = _url_key(db_uri)
+
+    engine: sa.Engine | None = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        ## Another thread may have created the engine while this one waited for the lock
+        if key in _ENGINES:
+            return _ENGINES[key]
+
+        if sqlite_profile is None:
+            sqlite_profile = DB_SETTINGS.get("DB_SQLITE_PROFILE", default=None)
+        if sqlite_pragmas is None:
+            sqlite_pragmas = get_sqlite_pragma_settings()
+
+        engine = db.get_engine(
+            url=sa.make_url(db_uri), echo=echo, sqlite_profile=sqlite_profile, sqlite_pragmas=sqlite_pragmas
+        )
+        _ENGINES[key] = engine
+
+    log.debug(f"Created database engine for {sa.make_url(db_uri).render_as_string(hide_password=True)}")
 
     return engine
 
 
 def get_session_pool(
-    engine: sa.Engine = get_db_engine(),
+    engine: sa.Engine | None = None,
 ) -> so.sessionmaker[so.Session]:
-    """Construct a SQLAlchemy `Session` pool for a database connection.
+    """Return the SQLAlchemy `Session` pool for an engine, creating it on first use.
     
     Params:
-        engine (sa.Engine): A SQLAlchemy `Engine` for a database connection.
+        engine (sa.Engine | None): A SQLAlchemy `Engine` for a database connection. Defaults to `get_db_engine()`.
         
     Returns:
         (so.sessionmaker[so.Session]): A SQLAlchemy `Session` pool
 
     """
-    session: so.sessionmaker[so.Session] = db.get_session_pool(engine=engine)
+    engine = engine or get_db_engine()
+    key: str = _url_key(engine.url)
+
+    session_pool: so.sessionmaker[so.Session] | None = _SESSION_POOLS.get(key)
+    if session_pool is not None and session_pool.kw.get("bind") is engine:
+        return session_pool
+
+    with _ENGINES_LOCK:
+        session_pool = _SESSION_POOLS.get(key)
+        if session_pool is None or session_pool.kw.get("bind") is not engine:
+            session_pool = db.get_session_pool(engine=engine)
+            _SESSION_POOLS[key] = session_pool
+
+    return session_pool
+
+
+def get_db_pool_stats() -> dict[str, dict[str, t.Any]]:
+    """Return the pool stats & current pool usage of every engine created by `get_db_engine()`.
+
+    Returns:
+        (dict[str, dict]): Database URL (password hidden) -> `db_lib.PoolStats.summary()`.
+
+    """
+    with _ENGINES_LOCK:
+        engines: list[sa.Engine] = list(_ENGINES.values())
+
+    pool_stats: dict[str, dict[str, t.Any]] = {}
+    for engine in engines:
+        stats: db.PoolStats | None = db.get_pool_stats(engine)
+        if stats is not None:
+            pool_stats[engine.url.render_as_string(hide_password=True)] = stats.summary(engine.pool)
+
+    return pool_stats
+
+
+def dispose_db_engines() -> int:
+    """Close the connection pools of every cached engine & forget them. The next `get_db_engine()` creates a new one.
+
+    Returns:
+        (int): The number of engines disposed.
+
+    """
+    with _ENGINES_LOCK:
+        engines: list[sa.Engine] = list(_ENGINES.values())
+        _ENGINES.clear()
+        _SESSION_POOLS.clear()
+
+    for engine in engines:
+        engine.dispose()
+
+    if engines:
+        log.debug(f"Disposed [{len(engines)}] database engine(s)")
+
+    return len(engines)
 
-    return session
\ No newline at end of file
+
+def get_async_db_engine(
+    db_uri: sa.URL | None = None,
+    echo: bool = False,
+    sqlite_profile: str | None = None,
+    sqlite_pragmas: dict | None = None,
+) -> AsyncEngine:
+    """Construct a SQLAlchemy `AsyncEngine` for a database connection. The async sibling of `get_db_engine()`.
+
+    Description:
+        Async engines are not cached: their connection pools belong to the event loop they were first used in.
+
+    Params:
+        db_uri (sa.URL | None): A SQLAlchemy `URL`; sync drivers are switched to aiosqlite/asyncpg. Defaults to
+            `get_db_uri()`.
+        echo (bool): Echo SQL statements to the console.
+        sqlite_profile (str | None): SQLite PRAGMA profile, i.e. `"performance"`. Defaults to `DB_SQLITE_PROFILE`.
+        sqlite_pragmas (dict | None): PRAGMAs overriding the profile's. Defaults to the `DB_SQLITE_*` settings.
+
+    Returns:
+        (AsyncEngine): A SQLAlchemy `AsyncEngine`
+
+    """
+    if sqlite_profile is None:
+        sqlite_profile = DB_SETTINGS.get("DB_SQLITE_PROFILE", default=None)
+    if sqlite_pragmas is None:
+        sqlite_pragmas = get_sqlite_pragma_settings()
+
+    engine: AsyncEngine = db.get_async_engine(
+        url=db_uri or get_db_uri(),
+        echo=echo,
+        sqlite_profile=sqlite_profile,
+        sqlite_pragmas=sqlite_pragmas,
+    )
+
+    return engine
+
+
+def get_async_session_pool(engine: AsyncEngine | None = None) -> async_sessionmaker[AsyncSession]:
+    """Construct a SQLAlchemy `AsyncSession` pool. The async sibling of `get_session_pool()`.
+
+    Params:
+        engine (AsyncEngine | None): A SQLAlchemy `AsyncEngine`. Defaults to `get_async_db_engine()`.
+
+    Returns:
+        (async_sessionmaker[AsyncSession]): A SQLAlchemy `AsyncSession` pool
+
+    """
+    return db.get_async_session_pool(engine=engine or get_async_db_engine())
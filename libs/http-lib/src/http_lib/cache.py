@@ -29,8 +29,11 @@ def get_sqlite_cache_storage(
     if not cache_dir.exists():
         cache_dir.mkdir(parents=True, exist_ok=True)
 
-    ## Get sqlite3 connection to cache database
-    conn: sqlite3.Connection = sqlite3.connect(database=cache_db_path)
+    ## Get sqlite3 connection to cache database. hishel.SQLiteStorage serializes access with its own lock,
+    #  so the connection can be shared by a client sending requests from several threads.
+    conn: sqlite3.Connection = sqlite3.connect(
+        database=cache_db_path, check_same_thread=False
+    )
     ## Create SQLiteStorage object using sqlite3 connection
     storage: hishel.SQLiteStorage = hishel.SQLiteStorage(connection=conn, ttl=ttl)
 
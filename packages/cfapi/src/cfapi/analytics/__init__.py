@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from .client import AnalyticsClient, split_time_range
+from .datasets import (
+    ANALYTICS_DATASETS,
+    FIREWALL_EVENTS,
+    HTTP_REQUESTS,
+    AnalyticsDataset,
+    flatten_group,
+    get_dataset,
+)
@@ -0,0 +1,133 @@
+"""GraphQL Analytics datasets that can be queried for many zones at once.
+
+Each dataset describes one node under `viewer.zones` in the Cloudflare GraphQL Analytics API: the fields to
+select, the widest time range a single query may cover, the row limit per zone, & the Arrow schema rows are
+written with. Group nodes return `{count, dimensions: {...}, sum: {...}}`; rows are flattened so dimensions
+become top-level columns & other nested metrics are prefixed, i.e. `sum.edgeResponseBytes` -> `sum_edgeResponseBytes`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+import typing as t
+
+import pyarrow as pa
+
+
+@dataclass(frozen=True)
+class AnalyticsDataset:
+    """A zone-scoped GraphQL Analytics node & how to query it.
+
+    Params:
+        name (str): Short name used to select the dataset, i.e. `"http_requests"`.
+        node (str): The GraphQL node under `viewer.zones`, i.e. `"httpRequestsAdaptiveGroups"`.
+        selection (str): The GraphQL selection set for the node, without the outer braces.
+        schema (pyarrow.Schema): The Arrow schema for flattened rows, including `zone_tag`.
+        max_window (timedelta): The widest time range Cloudflare accepts in one query for the node.
+        limit (int): Maximum number of rows returned per zone in one query.
+        time_filter (tuple[str, str]): Names of the inclusive start & exclusive end filter fields.
+        order_by (str | None): Optional `orderBy` value for the node.
+
+    """
+
+    name: str
+    node: str
+    selection: str
+    schema: pa.Schema
+    max_window: dt.timedelta = dt.timedelta(days=1)
+    limit: int = 10_000
+    time_filter: tuple[str, str] = ("datetime_geq", "datetime_lt")
+    order_by: str | None = None
+
+    def build_query(self) -> str:
+        """Return a query selecting this node for every zone in `$zoneTags` between `$since` & `$until`."""
+        order_by: str = f", orderBy: [{self.order_by}]" if self.order_by else ""
+        since_field, until_field = self.time_filter
+
+        return f"""query ($zoneTags: [string!], $since: Time!, $until: Time!, $limit: uint64!) {{
+  viewer {{
+    zones(filter: {{zoneTag_in: $zoneTags}}) {{
+      zoneTag
+      {self.node}(limit: $limit, filter: {{{since_field}: $since, {until_field}: $until}}{order_by}) {{
+        {self.selection}
+      }}
+    }}
+  }}
+}}"""
+
+
+def flatten_group(group: dict) -> dict:
+    """Flatten one analytics group: `dimensions` keys become columns, other nested dicts are prefixed."""
+    row: dict = {}
+
+    for key, value in group.items():
+        if key == "dimensions" and isinstance(value, dict):
+            row.update(value)
+        elif isinstance(value, dict):
+            row.update({f"{key}_{sub_key}": sub_value for sub_key, sub_value in value.items()})
+        else:
+            row[key] = value
+
+    return row
+
+
+HTTP_REQUESTS: AnalyticsDataset = AnalyticsDataset(
+    name="http_requests",
+    node="httpRequestsAdaptiveGroups",
+    selection="""count
+        dimensions { datetimeHour clientRequestHTTPHost clientCountryName edgeResponseStatus cacheStatus }
+        sum { edgeResponseBytes visits }""",
+    schema=pa.schema(
+        [
+            pa.field("zone_tag", pa.string()),
+            pa.field("datetimeHour", pa.string()),
+            pa.field("clientRequestHTTPHost", pa.string()),
+            pa.field("clientCountryName", pa.string()),
+            pa.field("edgeResponseStatus", pa.int64()),
+            pa.field("cacheStatus", pa.string()),
+            pa.field("count", pa.int64()),
+            pa.field("sum_edgeResponseBytes", pa.int64()),
+            pa.field("sum_visits", pa.int64()),
+        ]
+    ),
+    max_window=dt.timedelta(days=1),
+)
+
+FIREWALL_EVENTS: AnalyticsDataset = AnalyticsDataset(
+    name="firewall_events",
+    node="firewallEventsAdaptiveGroups",
+    selection="""count
+        dimensions { datetimeHour action source ruleId clientCountryName clientRequestHTTPHost }""",
+    schema=pa.schema(
+        [
+            pa.field("zone_tag", pa.string()),
+            pa.field("datetimeHour", pa.string()),
+            pa.field("action", pa.string()),
+            pa.field("source", pa.string()),
+            pa.field("ruleId", pa.string()),
+            pa.field("clientCountryName", pa.string()),
+            pa.field("clientRequestHTTPHost", pa.string()),
+            pa.field("count", pa.int64()),
+        ]
+    ),
+    max_window=dt.timedelta(days=1),
+)
+
+## Datasets by name
+ANALYTICS_DATASETS: dict[str, AnalyticsDataset] = {
+    dataset.name: dataset for dataset in (HTTP_REQUESTS, FIREWALL_EVENTS)
+}
+
+
+def get_dataset(dataset: t.Union[str, AnalyticsDataset]) -> AnalyticsDataset:
+    """Return a dataset by name, or the dataset itself if one is passed."""
+    if isinstance(dataset, AnalyticsDataset):
+        return dataset
+
+    try:
+        return ANALYTICS_DATASETS[dataset]
+    except KeyError:
+        raise ValueError(
+            f"Unknown analytics dataset: '{dataset}'. Must be one of {list(ANALYTICS_DATASETS)}"
+        )
@@ -0,0 +1,246 @@
+"""Bounded, thread-based concurrency helpers for cfapi.
+
+`CloudflareController` sends requests through a single `httpx.Client`, which is safe to share between threads.
+These helpers fan work out over a `ThreadPoolExecutor` while keeping at most `max_workers` calls in flight,
+so large iterables (every zone in an account, every page of a listing) are never submitted all at once.
+`RateLimiter` paces calls shared between workers, & `retry()` retries transient errors with backoff.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import itertools
+import threading
+import time
+import typing as t
+
+import httpx
+from loguru import logger as log
+
+## Generic types for mapped inputs & outputs
+T = t.TypeVar("T")
+R = t.TypeVar("R")
+
+
+def chunked(iterable: t.Iterable[T], size: int) -> t.Generator[list[T], None, None]:
+    """Yield lists of up to `size` items from an iterable, without materializing the iterable.
+
+    Params:
+        iterable (Iterable): The items to chunk.
+        size (int): Maximum number of items per chunk.
+
+    Returns:
+        (Generator[list]): A generator of item lists.
+
+    """
+    if size < 1:
+        raise ValueError(f"size must be a positive integer. Got: {size}")
+
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def bounded_map(
+    fn: t.Callable[[T], R],
+    items: t.Iterable[T],
+    max_workers: int = 8,
+    ordered: bool = True,
+    return_exceptions: bool = False,
+) -> t.Generator[tuple[T, R], None, None]:
+    """Call `fn` on each item from a thread pool, yielding `(item, result)` pairs.
+
+    Description:
+        At most `max_workers` calls are in flight at once; the next item is only pulled from `items` when a
+        call finishes. With `ordered=True`, results are yielded in input order (a slow item holds back later
+        results, but not later requests). With `ordered=False`, results are yielded as they complete.
+
+    Params:
+        fn (Callable): The function to call with each item.
+        items (Iterable): The inputs to map over. Consumed lazily.
+        max_workers (int): (default: 8) Maximum number of concurrent calls.
+        ordered (bool): (default: True) Yield results in input order.
+        return_exceptions (bool): (default: False) When `True`, an exception raised by `fn` is yielded as the
+            result for its item instead of being raised.
+
+    Returns:
+        (Generator[tuple[item, result]]): A generator of `(item, result)` pairs.
+
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be a positive integer. Got: {max_workers}")
+
+    iterator = iter(items)
+
+    def _result(future: Future) -> t.Any:
+        if return_exceptions and future.exception() is not None:
+            return future.exception()
+
+        return future.result()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if ordered:
+            pending: deque[tuple[T, Future]] = deque()
+
+            for item in itertools.islice(iterator, max_workers):
+                pending.append((item, pool.submit(fn, item)))
+
+            while pending:
+                item, future = pending.popleft()
+                result = _result(future)
+
+                ## Refill the window before handing the result back to the caller
+                for next_item in itertools.islice(iterator, 1):
+                    pending.append((next_item, pool.submit(fn, next_item)))
+
+                yield item, result
+        else:
+            in_flight: dict[Future, T] = {
+                pool.submit(fn, item): item
+                for item in itertools.islice(iterator, max_workers)
+            }
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    item = in_flight.pop(future)
+
+                    for next_item in itertools.islice(iterator, 1):
+                        in_flight[pool.submit(fn, next_item)] = next_item
+
+                    yield item, _result(future)
+
+
+class RateLimiter:
+    """Thread-safe token bucket, allowing `rate` calls per second with bursts of up to `burst` calls.
+
+    Params:
+        rate (float): Calls allowed per second, on average.
+        burst (int | None): Maximum calls allowed at once after an idle period. Defaults to `max(1, int(rate))`.
+
+    Usage:
+
+    ``` py linenums=1
+    limiter = RateLimiter(rate=5)
+
+    for item in items:
+        limiter.acquire()
+        send(item)
+    ```
+    """
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive. Got: {rate}")
+
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+
+        self._tokens: float = float(self.burst)
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(rate={self.rate}, burst={self.burst})"
+
+    def acquire(self) -> float:
+        """Block until a call is allowed.
+
+        Returns:
+            (float): Seconds spent waiting.
+
+        """
+        waited: float = 0.0
+
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+
+                if now < self._paused_until:
+                    delay: float = self._paused_until - now
+                else:
+                    self._tokens = min(
+                        self.burst, self._tokens + (max(now, self._updated) - self._updated) * self.rate
+                    )
+                    self._updated = max(now, self._updated)
+
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+
+                        return waited
+
+                    delay: float = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds`, i.e. after a `429` response, & restart with an empty bucket."""
+        with self._lock:
+            resume_at: float = time.monotonic() + seconds
+
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                self._tokens = 0.0
+                self._updated = resume_at
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """`True` for errors worth retrying: connection errors, timeouts, `429` & `5xx` responses."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+
+    return False
+
+
+def retry(
+    fn: t.Callable[[], R],
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 30.0,
+    retry_if: t.Callable[[BaseException], bool] = is_retryable,
+) -> tuple[R, int]:
+    """Call `fn`, retrying retryable errors with exponential backoff.
+
+    Description:
+        A `429` response's `Retry-After` header overrides the backoff delay.
+
+    Params:
+        fn (Callable): The function to call, with no arguments.
+        max_retries (int): (default: 3) Retries after the first attempt.
+        backoff (float): (default: 0.5) Delay before the first retry, doubled for each retry after it.
+        max_backoff (float): (default: 30.0) Longest delay between attempts.
+        retry_if (Callable): (default: `is_retryable`) Returns `True` for exceptions that should be retried.
+
+    Returns:
+        (tuple[result, int]): The result of `fn` & the number of attempts it took.
+
+    """
+    attempt: int = 0
+
+    while True:
+        attempt += 1
+
+        try:
+            return fn(), attempt
+        except Exception as exc:
+            if attempt > max_retries or not retry_if(exc):
+                raise exc
+
+            delay: float = min(backoff * 2 ** (attempt - 1), max_backoff)
+            if isinstance(exc, httpx.HTTPStatusError):
+                try:
+                    delay = float(exc.response.headers.get("Retry-After"))
+                except (TypeError, ValueError):
+                    pass
+
+            log.warning(
+                f"({type(exc)}) Attempt {attempt}/{max_retries + 1} failed, retrying in {delay:.1f}s. Details: {exc}"
+            )
+            time.sleep(delay)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from contextlib import AbstractContextManager, contextmanager
+from datetime import datetime, timezone
 import typing as t
 
+from cfapi import concurrency, memo, purge, resources
+from cfapi.dns import bind
+from cfapi.pagination import Paginator
+from domain import cloudflare as cf_domain
 import http_lib
 
 import httpx
@@ -71,6 +76,7 @@ class CloudflareController(AbstractContextManager):
         cache_ttl: int | None = 900,
         check_ttl_every: float | None = 60,
         headers: dict | None = None,
+        use_memo: bool = True,
     ) -> None:
         self.base_url = api_base_url
         self.debug_secrets = debug_secrets
@@ -87,17 +93,33 @@ class CloudflareController(AbstractContextManager):
         self.cache_ttl = cache_ttl
         self.check_ttl_every = check_ttl_every
         self.headers = headers
+        self.use_memo = use_memo
 
         self.http_controller: http_lib.HttpxController | None = None
+        ## Parsed results of rarely-changing lookups; see `cfapi.memo`
+        self.memo: memo.MemoCache = memo.MemoCache()
 
     def __enter__(self) -> t.Self:
         self.http_controller = self._get_controller()
+        ## Open one client for the whole block, so requests (including concurrent ones) share a connection pool
+        self.http_controller.__enter__()
 
         return self
 
     def __exit__(self, exc_type, exc_val, traceback) -> t.Literal[False] | None:
+        if self.http_controller:
+            self.http_controller.__exit__(exc_type, exc_val, traceback)
+
         return False
 
+    @property
+    def client_open(self) -> bool:
+        """`True` when the controller's httpx client is open & can be shared between requests."""
+        if not self.http_controller or not self.http_controller.client:
+            return False
+
+        return not self.http_controller.client.is_closed
+
     @property
     def use_token(self) -> bool:
         if self.api_token:
@@ -119,12 +141,34 @@ class CloudflareController(AbstractContextManager):
             f"cache_ttl={self.cache_ttl}",
             f"check_ttl_every={self.check_ttl_every}",
             f"headers={self.headers}",
+            f"use_memo={self.use_memo}",
             f"use_token={self.use_token}",
         ]
         vals_str: str = ", ".join(vals)
         # return f"CloudflareController(account_id={self.account_id}, account_email={self.account_email}, api_key=<Redacted>, api_token=<Redacted>, use_cache={self.use_cache}, force_cache={self.force_cache}, follow_redirects={self.follow_redirects}, cache_type={self.cache_type}, cache_file_dir={self.cache_file_dir}, cache_db_file={self.cache_db_file}, cache_ttl={self.cache_ttl}, check_ttl_every={self.check_ttl_every}, headers={self.headers})"
         return f"CloudflareController({vals_str})"
 
+    def init_kwargs(self) -> dict[str, t.Any]:
+        """Return the params this controller was created with, i.e. to build an equivalent controller in a worker process."""
+        return {
+            "api_base_url": self.base_url,
+            "debug_secrets": self.debug_secrets,
+            "account_id": self.account_id,
+            "account_email": self.account_email,
+            "api_key": self.api_key,
+            "api_token": self.api_token,
+            "use_cache": self.use_cache,
+            "force_cache": self.force_cache,
+            "follow_redirects": self.follow_redirects,
+            "cache_type": self.cache_type,
+            "cache_file_dir": self.cache_file_dir,
+            "cache_db_file": self.cache_db_file,
+            "cache_ttl": self.cache_ttl,
+            "check_ttl_every": self.check_ttl_every,
+            "headers": self.headers,
+            "use_memo": self.use_memo,
+        }
+
     def merge_headers(self, headers: dict | None) -> dict | None:
         if not self.headers:
             return headers
@@ -175,8 +219,29 @@ class CloudflareController(AbstractContextManager):
 
         return headers
     
+    @contextmanager
+    def _open_client(self) -> t.Generator[http_lib.HttpxController, None, None]:
+        """Yield an open HTTP controller, opening (& afterwards closing) one if the controller is not already open."""
+        if self.client_open:
+            yield self.http_controller
+
+            return
+
+        if not self.http_controller:
+            self.http_controller = self._get_controller()
+
+        with self.http_controller as http_ctl:
+            yield http_ctl
+
     def _send_request(self, request: httpx.Request) -> httpx.Response:
         try:
+            if self.client_open:
+                ## Re-use the client opened by __enter__()
+                http_res = self.http_controller.send_request(request=request)
+                http_res.raise_for_status()
+
+                return http_res
+
             with self.http_controller as http_ctl:
                 http_res = http_ctl.send_request(request=request)
                 http_res.raise_for_status()
@@ -193,7 +258,470 @@ class CloudflareController(AbstractContextManager):
         token: str | None = None,
         headers: dict | None = None,
         refresh: bool = False,
+    ) -> list[dict]:
+        """Return every account the credentials can access. See the `accounts` resource."""
+        log.info("Requesting accounts for token")
+
+        return self.fetch("accounts", token=token, headers=headers, refresh=refresh)
+
+    def get_zones(
+        self,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Return every zone the credentials can access. See the `zones` resource."""
+        log.info("Requesting zones for token")
+
+        return self.fetch("zones", token=token, headers=headers, refresh=refresh)
+
+    def get_zone(self, zone_id: str, parse: bool = False, refresh: bool = False) -> t.Any:
+        """Return one zone's details. Memoized per token; see the `zone` resource."""
+        return self.fetch("zone", parse=parse, refresh=refresh, zone_id=zone_id)
+
+    def verify_token(self, token: str | None = None, refresh: bool = False) -> dict:
+        """Verify the API token, returning its `id`, `status` & expiry. Memoized per token; see the `token_verify` resource."""
+        return self.fetch("token_verify", token=token, refresh=refresh)
+
+    def iter_zone_pages(
+        self,
+        per_page: int = 50,
+        params: dict | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> t.Generator[list[dict], None, None]:
+        """Request every page of zones for the token, yielding the list of zone dicts on each page.
+
+        Description:
+            Pages after the first are prefetched in parallel & yielded in order. See `paginate()`.
+
+        Params:
+            per_page (int): (default: 50) Number of zones per page. Cloudflare allows at most 50 for `/zones`.
+            params (dict | None): Extra URL params, i.e. `{"account.id": "..."}`.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (Generator[list[dict]]): A generator yielding one list of zone dicts per page.
+
+        """
+        log.info("Requesting zones for token")
+        yield from self.iter_resource_pages(
+            "zones", params=params, per_page=per_page, token=token, headers=headers
+        )
+
+    def get_zone_records(
+        self,
+        token: str | None = None,
+        headers: dict | None = None,
+        interner: cf_domain.RecordInterner | None = None,
+        intern: bool = True,
+        params: dict | None = None,
+        per_page: int | None = None,
+    ) -> list[cf_domain.CloudflareZoneRecord]:
+        """Request every page of zones for the token & decode them into compact zone records.
+
+        Description:
+            Pages are requested like `iter_zone_pages()` (prefetched, retried & cached per the `zones` resource)
+            & each page is decoded into records as it arrives. One interner is shared by every page, so nested
+            values are held once across the whole listing.
+
+        Params:
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            interner (RecordInterner | None): An interner to share nested values with, i.e. across several listings.
+            intern (bool): (default: True) Canonicalize repeated `account`/`plan`/`owner`/`tenant` values &
+                `name_servers`/`permissions` tuples, so each distinct value is held once.
+            params (dict | None): Extra URL params, i.e. `{"account.id": "..."}`.
+            per_page (int | None): Override the `zones` resource's page size.
+
+        Returns:
+            (list[CloudflareZoneRecord]): Decoded zone records, from every page.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response, after retries.
+
+        """
+        if intern and interner is None:
+            interner = cf_domain.RecordInterner()
+
+        records: list[cf_domain.CloudflareZoneRecord] = []
+
+        log.info("Requesting zone records for token")
+        for page in self.iter_resource_pages("zones", params=params, per_page=per_page, token=token, headers=headers):
+            page_records: list[cf_domain.CloudflareZoneRecord] = cf_domain.decode_zone_records(page)
+            if intern:
+                page_records = cf_domain.intern_zone_records(page_records, interner=interner)
+
+            records.extend(page_records)
+
+        return records
+
+    def get_zone_waf_filters(
+        self,
+        zone_id: str,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Return every WAF filter for a zone. See the `zone_waf_filters` resource, & `fetch_many()` for many zones."""
+        log.info(f"Requesting zone WAF filters for zone '{zone_id}'")
+
+        return self.fetch("zone_waf_filters", token=token, headers=headers, refresh=refresh, zone_id=zone_id)
+
+    def iter_dns_record_pages(
+        self,
+        zone_id: str,
+        per_page: int = 5000,
+        max_workers: int = 4,
+        params: dict | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> t.Generator[list[dict], None, None]:
+        """Request every page of DNS records for a zone, yielding the list of record dicts on each page.
+
+        Description:
+            The first page is requested alone to read `result_info.total_pages`. The remaining pages are then
+            requested concurrently, at most `max_workers` at a time, & yielded in page order. See `paginate()`.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            per_page (int): (default: 5000) Number of records per page. Large pages cut the number of requests.
+            max_workers (int): (default: 4) Maximum number of pages requested at once.
+            params (dict | None): Extra URL params, i.e. `{"type": "A"}`.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (Generator[list[dict]]): A generator yielding one list of DNS record dicts per page.
+
+        """
+        log.info(f"Requesting DNS records for zone '{zone_id}'")
+        yield from self.iter_resource_pages(
+            "zone_dns_records",
+            params=params,
+            per_page=per_page,
+            max_workers=max_workers,
+            token=token,
+            headers=headers,
+            zone_id=zone_id,
+        )
+
+    def iter_dns_records(
+        self,
+        zone_id: str,
+        per_page: int = 5000,
+        max_workers: int = 4,
+        params: dict | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> t.Generator[dict, None, None]:
+        """Yield every DNS record dict for a zone. See `iter_dns_record_pages()` for params."""
+        for page in self.iter_dns_record_pages(
+            zone_id=zone_id,
+            per_page=per_page,
+            max_workers=max_workers,
+            params=params,
+            token=token,
+            headers=headers,
+        ):
+            yield from page
+
+    def iter_dns_records_bind(
+        self,
+        zone_id: str,
+        zone_name: str | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> t.Generator[dict, None, None]:
+        """Stream a zone's BIND-format DNS export, yielding one parsed DNS record dict at a time.
+
+        Description:
+            Uses `/zones/{zone_id}/dns_records/export`, which returns every record for the zone in a single
+            response. The response body is read line by line & never held in memory. Records from an export
+            have no `id`.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            zone_name (str | None): The zone name, used to resolve relative record names.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (Generator[dict]): A generator of DNS record dicts.
+
+        """
+        headers = self._request_auth(token=token, headers=headers)
+        ## Streamed bodies can't be written to the response cache, & a forced cache would replay a stale export
+        req: httpx.Request = self._build_api_request(
+            "GET", f"/zones/{zone_id}/dns_records/export", headers=headers, bypass_cache=True
+        )
+
+        with self._open_client() as http_ctl:
+            log.info(f"Requesting BIND export of DNS records for zone '{zone_id}'")
+            http_res: httpx.Response = http_ctl.send_request(request=req, stream=True)
+
+            try:
+                http_res.raise_for_status()
+
+                yield from bind.parse_bind_lines(
+                    http_res.iter_lines(),
+                    origin=f"{zone_name}." if zone_name else None,
+                )
+            finally:
+                http_res.close()
+
+    def graphql_query(
+        self,
+        query: str,
+        variables: dict | None = None,
+        max_retries: int = 3,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> dict:
+        """Send a query to the Cloudflare GraphQL Analytics API & return the response's `data` dict.
+
+        Description:
+            Queries are never cached. A rate-limited (`429`) query is retried with backoff, waiting for the
+            response's `Retry-After` when it is set.
+
+        Params:
+            query (str): The GraphQL query document.
+            variables (dict | None): Values for the query's variables.
+            max_retries (int): (default: 3) Retries for a query that hits a transient error.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (dict): The `data` object of the GraphQL response.
+
+        Raises:
+            RuntimeError: When the response contains GraphQL `errors`.
+
+        """
+        headers = self._request_auth(token=token, headers=headers)
+        res_dict, _attempts = concurrency.retry(
+            lambda: self._api_request(
+                "POST", "/graphql", headers=headers, json={"query": query, "variables": variables or {}}
+            ),
+            max_retries=max_retries,
+        )
+
+        ## GraphQL reports query errors in the body of a 200 response
+        if res_dict.get("errors"):
+            messages: list[str] = [err.get("message", str(err)) for err in res_dict["errors"]]
+            msg = f"GraphQL query returned [{len(messages)}] error(s): {messages}"
+            log.error(msg)
+
+            raise RuntimeError(msg)
+
+        return res_dict.get("data") or {}
+
+    def list_zone_rulesets(
+        self,
+        zone_id: str,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """List a zone's rulesets. Listed rulesets include their `phase`, `kind` & `version`, but not their rules.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            refresh (bool): (default: False) Bypass the response cache, i.e. to see new ruleset versions.
+
+        Returns:
+            (list[dict]): Ruleset dicts.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response.
+
+        """
+        log.debug(f"Requesting rulesets for zone '{zone_id}'")
+
+        return self.fetch("zone_rulesets", token=token, headers=headers, refresh=refresh, zone_id=zone_id)
+
+    def get_zone_ruleset(
+        self,
+        zone_id: str,
+        ruleset_id: str | None = None,
+        phase: str | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+    ) -> dict:
+        """Get one of a zone's rulesets, including its rules.
+
+        Description:
+            Pass `phase` to get the zone's entrypoint ruleset for that phase, or `ruleset_id` for any other ruleset.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            ruleset_id (str | None): The ruleset ID.
+            phase (str | None): A ruleset phase, i.e. `"http_request_firewall_custom"`.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            refresh (bool): (default: False) Bypass the response cache.
+
+        Returns:
+            (dict): The ruleset dict.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response.
+
+        """
+        if not ruleset_id and not phase:
+            raise ValueError("Either ruleset_id or phase is required")
+
+        log.debug(f"Requesting ruleset '{phase or ruleset_id}' for zone '{zone_id}'")
+
+        if phase:
+            return self.fetch(
+                "zone_phase_entrypoint", token=token, headers=headers, refresh=refresh, zone_id=zone_id, phase=phase
+            )
+
+        return self.fetch(
+            "zone_ruleset", token=token, headers=headers, refresh=refresh, zone_id=zone_id, ruleset_id=ruleset_id
+        )
+
+    def get_zone_waf_packages(
+        self,
+        zone_id: str,
+        token: str | None = None,
+        headers: dict | None = None,
+    ) -> list[dict]:
+        """Get a zone's legacy WAF packages.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (list[dict]): WAF package dicts, from every page.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response.
+
+        """
+        log.debug(f"Requesting WAF packages for zone '{zone_id}'")
+
+        return self.fetch("zone_waf_packages", token=token, headers=headers, zone_id=zone_id)
+
+    def get_zone_name_index(self, params: dict | None = None) -> purge.ZoneNameIndex:
+        """Build an index resolving hostnames to the token's zones, from every page of `/zones`."""
+        zone_index: purge.ZoneNameIndex = purge.ZoneNameIndex()
+
+        for page in self.iter_zone_pages(params=params):
+            for zone in page:
+                zone_index.add(zone)
+
+        log.debug(f"Indexed [{len(zone_index)}] zone name(s)")
+
+        return zone_index
+
+    def purge_cache(
+        self,
+        zone_id: str,
+        files: list[str] | None = None,
+        tags: list[str] | None = None,
+        prefixes: list[str] | None = None,
+        hosts: list[str] | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
     ) -> dict | None:
+        """Purge cached content from a zone by URL, cache tag, prefix or hostname, in one call.
+
+        Params:
+            zone_id (str): The Cloudflare zone ID.
+            files (list[str] | None): URLs to purge.
+            tags (list[str] | None): Cache tags to purge.
+            prefixes (list[str] | None): URL prefixes to purge, without a scheme.
+            hosts (list[str] | None): Hostnames to purge.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+
+        Returns:
+            (dict | None): The purge result, i.e. `{"id": "..."}`.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response, i.e. `429` when rate limited.
+
+        """
+        payload: dict = {
+            key: value
+            for key, value in {"files": files, "tags": tags, "prefixes": prefixes, "hosts": hosts}.items()
+            if value
+        }
+        if not payload:
+            raise ValueError("Nothing to purge: pass files, tags, prefixes or hosts")
+
+        headers = self._request_auth(token=token, headers=headers)
+        res_dict: dict = self._api_request("POST", f"/zones/{zone_id}/purge_cache", headers=headers, json=payload)
+
+        return res_dict.get("result")
+
+    def bulk_purge_cache(
+        self,
+        items: t.Iterable[str],
+        kind: str = "files",
+        zone_id: str | None = None,
+        zone_index: purge.ZoneNameIndex | None = None,
+        batch_size: int = purge.DEFAULT_PURGE_BATCH_SIZE,
+        max_workers: int = 4,
+        requests_per_second: float = purge.DEFAULT_PURGE_RATE,
+        max_retries: int = 3,
+        dry_run: bool = False,
+    ) -> purge.PurgeReport:
+        """Purge many URLs, tags, prefixes or hostnames, batched per zone & sent concurrently within a rate limit.
+
+        Description:
+            Items are normalized & deduplicated, then grouped by the zone serving their host. Without a
+            `zone_index`, one is built from the token's zones. Pass `zone_id` to purge every item from one zone,
+            which is required for cache tags.
+
+        Params:
+            items (Iterable[str]): URLs, tags, prefixes or hostnames.
+            kind (str): (default: "files") One of `"files"`, `"tags"`, `"prefixes"`, `"hosts"`.
+            zone_id (str | None): Purge every item from this zone.
+            zone_index (ZoneNameIndex | None): Index resolving hosts to zones. Re-use one across purges.
+            batch_size (int): (default: 30) Maximum items per purge call. Enterprise zones allow 100.
+            max_workers (int): (default: 4) Maximum number of purge calls in flight at once.
+            requests_per_second (float): (default: 5.0) Purge calls allowed per second.
+            max_retries (int): (default: 3) Retries for a rate-limited batch.
+            dry_run (bool): (default: False) Plan the batches without sending them.
+
+        Returns:
+            (PurgeReport): The plan, per-batch results & timing.
+
+        """
+        if zone_id is None and zone_index is None and kind != "tags":
+            zone_index = self.get_zone_name_index()
+
+        plan: purge.PurgePlan = purge.plan_purge(
+            items, kind=kind, zone_index=zone_index, zone_id=zone_id, batch_size=batch_size
+        )
+
+        if dry_run:
+            log.info(f"Dry run, not sending [{len(plan.batches)}] purge batch(es)")
+
+            return purge.PurgeReport(plan=plan)
+
+        return purge.send_purge_batches(
+            self,
+            plan,
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries,
+        )
+
+    def _request_auth(self, token: str | None = None, headers: dict | None = None) -> dict:
+        """Validate credentials & return the request headers, once per call instead of once per request.
+
+        Also creates the HTTP controller if the controller has none yet.
+        """
         if not headers:
             headers: dict = self._get_auth_headers()
 
@@ -204,97 +732,460 @@ class CloudflareController(AbstractContextManager):
         if not self.http_controller:
             self.http_controller = self._get_controller()
 
-        url: str = f"{self.base_url}/accounts"
-        req: httpx.Request = http_lib.build_request(url=url, headers=headers)
+        return headers
+
+    def _cached_age(self, http_res: httpx.Response) -> float | None:
+        """Return the age in seconds of a response served from the cache, or `None` for a fresh response."""
+        if not http_res.extensions.get("from_cache"):
+            return None
+
+        created_at: datetime | None = (http_res.extensions.get("cache_metadata") or {}).get("created_at")
+        if created_at is None:
+            return None
+
+        ## The cache serializer stores a naive GMT timestamp
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        return (datetime.now(timezone.utc) - created_at).total_seconds()
+
+    def _build_api_request(
+        self,
+        method: str,
+        path: str,
+        headers: dict,
+        params: dict | None = None,
+        json: t.Any | None = None,
+        bypass_cache: bool = False,
+    ) -> httpx.Request:
+        """Build a request for an API path. With `bypass_cache`, the response is neither read from nor written to the cache."""
+        return http_lib.build_request(
+            method=method,
+            url=f"{self.base_url}/{path.lstrip('/')}",
+            params=params,
+            headers=headers,
+            json=json,
+            extensions={"cache_disabled": True, "force_cache": False} if bypass_cache else None,
+        )
+
+    def _api_request(
+        self,
+        method: str,
+        path: str,
+        headers: dict,
+        params: dict | None = None,
+        json: t.Any | None = None,
+        refresh: bool = False,
+        max_age: float | None = None,
+    ) -> dict:
+        """Send one request with already resolved headers. The execution path behind `api_request()` & `fetch()`."""
+        bypass_cache: bool = refresh or method.upper() not in ("GET", "HEAD")
+        req: httpx.Request = self._build_api_request(
+            method, path, headers=headers, params=params, json=json, bypass_cache=bypass_cache
+        )
 
-        log.info("Requesting accounts for token")
         http_res = self._send_request(request=req)
 
-        if not http_res.status_code == 200:
-            log.warning(
-                f"Non-200 status code requesting accounts for token: [{http_res.status_code}: {http_res.reason_phrase}]: {http_res.text}"
+        if max_age is not None and not bypass_cache:
+            age: float | None = self._cached_age(http_res)
+
+            if age is not None and age > max_age and self.http_controller.cache is not None:
+                ## Drop the stale entry & request again, so the fresh response replaces it in the cache
+                log.debug(f"Cached response for '{path}' is {age:.0f}s old (max {max_age}s), requesting it again")
+                self.http_controller.cache.remove(http_res.extensions["cache_metadata"]["cache_key"])
+                http_res = self._send_request(request=req)
+
+        return http_lib.decode_response(response=http_res)
+
+    def api_request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json: t.Any | None = None,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+        max_age: float | None = None,
+    ) -> dict:
+        """Send a request to an API path & return the decoded response envelope.
+
+        Description:
+            Non-GET requests & `refresh=True` bypass the response cache.
+
+        Params:
+            method (str): The HTTP method, i.e. `"GET"`, `"PUT"`.
+            path (str): The path below the API base URL, i.e. `"/accounts/{account_id}/storage/kv/namespaces"`.
+            params (dict | None): URL params.
+            json (Any | None): A JSON request body.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            refresh (bool): (default: False) Bypass the response cache for a GET request.
+            max_age (float | None): Oldest cached response to accept, in seconds. Older responses are requested again.
+
+        Returns:
+            (dict): The decoded response, i.e. `{"result": ..., "result_info": ..., "success": True}`.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response.
+
+        """
+        headers = self._request_auth(token=token, headers=headers)
+
+        return self._api_request(
+            method, path, headers=headers, params=params, json=json, refresh=refresh, max_age=max_age
+        )
+
+    def list_kv_namespaces(
+        self, account_id: str | None = None, per_page: int = 100
+    ) -> list[dict]:
+        """List the Workers KV namespaces of an account. Defaults to the controller's account ID."""
+        account_id = account_id or self.account_id
+        if not account_id:
+            raise ValueError("An account_id is required to list KV namespaces")
+
+        return self.fetch("kv_namespaces", per_page=per_page, account_id=account_id)
+
+    def list_rules_lists(self, account_id: str | None = None) -> list[dict]:
+        """List the Rules Lists of an account. Defaults to the controller's account ID."""
+        account_id = account_id or self.account_id
+        if not account_id:
+            raise ValueError("An account_id is required to list Rules Lists")
+
+        return self.fetch("rules_lists", account_id=account_id)
+
+    def _list_items_operation(
+        self, method: str, list_id: str, items: t.Iterable[dict], account_id: str | None = None
+    ) -> str:
+        account_id = account_id or self.account_id
+        if not account_id:
+            raise ValueError("An account_id is required to write Rules List items")
+
+        items = list(items)
+
+        try:
+            res: dict = self.api_request(
+                method, f"/accounts/{account_id}/rules/lists/{list_id}/items", json=items
             )
-            return
+        except Exception as exc:
+            msg = f"({type(exc)}) Error writing [{len(items)}] item(s) to Rules List '{list_id}'. Details: {exc}"
+            log.error(msg)
 
-        # log.debug(f"Request accounts response: [{http_res.status_code}: {http_res.reason_phrase}]")
-        res_dict = http_lib.decode_response(response=http_res)
-        log.debug(f"Response ({type(res_dict)}): {res_dict}")
-        res = res_dict["result"]
+            raise exc
 
-        return res
+        return res["result"]["operation_id"]
 
-    def get_zones(
+    def replace_list_items(self, list_id: str, items: t.Iterable[dict], account_id: str | None = None) -> str:
+        """Replace every item of a Rules List. The list is updated asynchronously.
+
+        Params:
+            list_id (str): The Rules List to replace the items of.
+            items (Iterable[dict]): The new items, i.e. `{"ip": "192.0.2.1", "comment": "..."}`.
+            account_id (str | None): The list's account. Defaults to the controller's account ID.
+
+        Returns:
+            (str): The bulk operation ID, to poll with `get_bulk_operation()` or an `OperationTracker`.
+
+        """
+        return self._list_items_operation("PUT", list_id, items, account_id=account_id)
+
+    def append_list_items(self, list_id: str, items: t.Iterable[dict], account_id: str | None = None) -> str:
+        """Append items to a Rules List. Like `replace_list_items()`, returns a bulk operation ID to poll."""
+        return self._list_items_operation("POST", list_id, items, account_id=account_id)
+
+    def get_bulk_operation(self, operation_id: str, account_id: str | None = None) -> dict:
+        """Return the status of an asynchronous bulk operation, i.e. `{"id": ..., "status": "running"}`.
+
+        Description:
+            `status` is one of `"pending"`, `"running"`, `"completed"` or `"failed"`; a failed operation has an
+            `error` message. Never served from the response cache.
+
+        """
+        account_id = account_id or self.account_id
+        if not account_id:
+            raise ValueError("An account_id is required to check a bulk operation")
+
+        return self.fetch("list_bulk_operation", account_id=account_id, operation_id=operation_id)
+
+    def paginate(
         self,
+        path: str,
+        params: dict | None = None,
+        per_page: int | None = None,
+        per_page_param: str = "per_page",
+        style: str | None = None,
+        max_workers: int = 4,
+        max_retries: int = 3,
         token: str | None = None,
         headers: dict | None = None,
         refresh: bool = False,
-    ) -> dict | None:
-        if not headers:
-            headers: dict = self._get_auth_headers()
+        max_age: float | None = None,
+    ) -> Paginator:
+        """Return a paginator over every page of a listing.
 
-        token = self._validate_token_auth(token)
-        if not token:
-            raise ValueError("No API token provided")
+        Description:
+            The paging style (`page` or `cursor`) is detected from the first response's `result_info`. Pages
+            are prefetched while the current one is consumed; see `cfapi.pagination`. Each page request is
+            retried on transient errors. Iterate the paginator inside the controller's `with` block, so every
+            page request shares one connection pool.
 
-        if not self.http_controller:
-            self.http_controller = self._get_controller()
+        Params:
+            path (str): The listing path below the API base URL, i.e. `"/zones"`.
+            params (dict | None): Params sent with every page request, i.e. filters.
+            per_page (int | None): Page size.
+            per_page_param (str): (default: "per_page") Name of the page size param, i.e. `"limit"`.
+            style (str | None): Force `"page"` or `"cursor"` paging instead of detecting it.
+            max_workers (int): (default: 4) Maximum pages requested at once when the page count is known.
+            max_retries (int): (default: 3) Retries for a page request that hits a transient error.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            refresh (bool): (default: False) Bypass the response cache.
+            max_age (float | None): Oldest cached page to accept, in seconds.
 
-        url: str = f"{self.base_url}/zones"
-        req: httpx.Request = http_lib.build_request(url=url, headers=headers)
+        Returns:
+            (Paginator): A paginator, iterated with `for`/`async for`, or page by page with `.pages()`/`.apages()`.
 
-        log.info("Requesting zones for token")
-        http_res = self._send_request(request=req)
+        """
+        headers = self._request_auth(token=token, headers=headers)
 
-        if not http_res.status_code == 200:
-            log.warning(
-                f"Non-200 status code requesting zones for token: [{http_res.status_code}: {http_res.reason_phrase}]: {http_res.text}"
+        def _fetch(page_params: dict) -> dict:
+            res_dict, _attempts = concurrency.retry(
+                lambda: self._api_request(
+                    "GET", path, headers=headers, params=page_params, refresh=refresh, max_age=max_age
+                ),
+                max_retries=max_retries,
             )
-            return
 
-        log.debug(
-            f"Request zones response: [{http_res.status_code}: {http_res.reason_phrase}]"
+            return res_dict
+
+        return Paginator(
+            _fetch,
+            params=params,
+            per_page=per_page,
+            per_page_param=per_page_param,
+            style=style,
+            max_workers=max_workers,
         )
-        res_dict = http_lib.decode_response(response=http_res)
-        # log.debug(f"Response ({type(res_dict)}): {res_dict}")
-        res = res_dict["result"]
 
-        return res
+    def iter_resource_pages(
+        self,
+        resource: t.Union[str, resources.Resource],
+        params: dict | None = None,
+        per_page: int | None = None,
+        max_workers: int | None = None,
+        max_retries: int = 3,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+        **path_params: t.Any,
+    ) -> t.Generator[list, None, None]:
+        """Yield the results of a registered resource page by page. An unpaged resource yields its result once.
+
+        Params:
+            resource (str | Resource): A registered resource name, i.e. `"zones"`, or a `Resource`.
+            params (dict | None): URL params, i.e. filters.
+            per_page (int | None): Override the resource's page size.
+            max_workers (int | None): Override the resource's concurrency class.
+            max_retries (int): (default: 3) Retries for a request that hits a transient error.
+            token (str | None): Cloudflare API token. Defaults to the controller's token.
+            headers (dict | None): Request headers. Defaults to the controller's auth headers.
+            refresh (bool): (default: False) Bypass the response cache.
+            **path_params: Values for the resource's path template, i.e. `zone_id="..."`.
 
-    def get_zone_waf_filters(
+        Returns:
+            (Generator[list]): A generator of result pages.
+
+        """
+        resource = resources.get_resource(resource)
+        path: str = resource.format_path(**path_params)
+        refresh = refresh or resource.refresh
+
+        with self._open_client():
+            if resource.paging is None:
+                headers = self._request_auth(token=token, headers=headers)
+                res_dict, _attempts = concurrency.retry(
+                    lambda: self._api_request(
+                        "GET", path, headers=headers, params=params, refresh=refresh, max_age=resource.cache_ttl
+                    ),
+                    max_retries=max_retries,
+                )
+
+                yield res_dict.get("result")
+
+                return
+
+            yield from self.paginate(
+                path,
+                params=params,
+                per_page=per_page or resource.per_page,
+                per_page_param=resource.per_page_param,
+                style=resource.paging,
+                max_workers=max_workers or resource.max_workers,
+                max_retries=max_retries,
+                token=token,
+                headers=headers,
+                refresh=refresh,
+                max_age=resource.cache_ttl,
+            ).pages()
+
+    def fetch(
         self,
-        zone_id: str,
+        resource: t.Union[str, resources.Resource],
+        params: dict | None = None,
+        parse: bool = False,
+        per_page: int | None = None,
+        max_workers: int | None = None,
+        max_retries: int = 3,
         token: str | None = None,
         headers: dict | None = None,
         refresh: bool = False,
-    ):
-        if not headers:
-            headers: dict = self._get_auth_headers()
+        **path_params: t.Any,
+    ) -> t.Any:
+        """Fetch a registered resource. Paged resources are fetched in full & returned as one list.
 
-        token = self._validate_token_auth(token)
-        if not token:
-            raise ValueError("No API token provided")
+        Description:
+            Results of resources with a `memo_ttl` are memoized per token (see `cfapi.memo`): a repeat fetch
+            within the TTL returns the same result object without a request. `refresh=True` fetches again &
+            replaces the memoized result; `invalidate()` drops memoized results.
 
-        if not self.http_controller:
-            self.http_controller = self._get_controller()
+        Params:
+            resource (str | Resource): A registered resource name, i.e. `"zones"`, or a `Resource`.
+            parse (bool): (default: False) Validate results into the resource's schema.
+            **path_params: Values for the resource's path template, i.e. `zone_id="..."`.
 
-        url: str = f"{self.base_url}/zones/{zone_id}/filters"
-        req: httpx.Request = http_lib.build_request(url=url, headers=headers)
+            See `iter_resource_pages()` for the other params.
 
-        log.info(f"Requesting zone WAF filters for zone '{zone_id}'")
-        http_res = self._send_request(request=req)
+        Returns:
+            (Any): The resource's result: a list for paged resources, usually a dict otherwise.
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response, after retries.
 
-        if not http_res.status_code == 200:
-            log.warning(
-                f"Non-200 status code requesting WAF filters for zone '{zone_id}': [{http_res.status_code}: {http_res.reason_phrase}]: {http_res.text}"
+        """
+        resource = resources.get_resource(resource)
+
+        memo_key: memo.MemoKey | None = None
+        if self.use_memo and resource.memo_ttl is not None:
+            memo_key = self.memo.key(
+                self._credentials_fingerprint(token=token, headers=headers),
+                resource.name,
+                path_params={name: path_params.get(name) for name in resource.path_params},
+                params=params,
+                options=(per_page, parse),
             )
-            return
 
-        log.debug(
-            f"Request WAF filters for zone '{zone_id}' response: [{http_res.status_code}: {http_res.reason_phrase}]"
+            if not refresh:
+                memoized: t.Any = self.memo.get(memo_key)
+                if memoized is not self.memo.MISSING:
+                    return memoized
+
+        pages: t.Generator[list, None, None] = self.iter_resource_pages(
+            resource,
+            params=params,
+            per_page=per_page,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            token=token,
+            headers=headers,
+            refresh=refresh,
+            **path_params,
         )
-        # log.debug(f"HTTP response text: {http_res.text}")
-        res_dict = http_lib.decode_response(response=http_res)
-        # log.debug(f"Response ({type(res_dict)}): {res_dict}")
-        res = res_dict["result"]
 
-        return res
+        if resource.paging is None:
+            result: t.Any = list(pages)[0]
+        else:
+            result = [item for page in pages for item in page]
+
+        if parse:
+            result = resource.parse(result)
+
+        if memo_key is not None:
+            self.memo.set(memo_key, result, ttl=resource.memo_ttl)
+
+        return result
+
+    def _credentials_fingerprint(self, token: str | None = None, headers: dict | None = None) -> str:
+        """Fingerprint the credentials a request would be sent with, for memo keys."""
+        if headers:
+            return memo.token_fingerprint(
+                headers.get("Authorization"), headers.get("X-Auth-Email"), headers.get("X-Auth-Key")
+            )
+
+        return memo.token_fingerprint(token or self.api_token, self.account_email, self.api_key)
+
+    def invalidate(
+        self,
+        resource: t.Union[str, resources.Resource, None] = None,
+        token: str | None = None,
+        **path_params: t.Any,
+    ) -> int:
+        """Drop memoized results, i.e. after changing the account or zone they describe.
+
+        Params:
+            resource (str | Resource | None): Only drop this resource's results. Defaults to every resource.
+            token (str | None): Only drop results fetched with this token. Defaults to every token.
+            **path_params: Only drop results with these path params, i.e. `zone_id="..."`.
+
+        Returns:
+            (int): The number of results dropped.
+
+        """
+        return self.memo.invalidate(
+            resource=resources.get_resource(resource).name if resource is not None else None,
+            fingerprint=self._credentials_fingerprint(token=token) if token else None,
+            path_params=path_params or None,
+        )
+
+    def fetch_many(
+        self,
+        resource: t.Union[str, resources.Resource],
+        path_params: t.Iterable[dict],
+        params: dict | None = None,
+        parse: bool = False,
+        max_workers: int | None = None,
+        max_retries: int = 3,
+        token: str | None = None,
+        headers: dict | None = None,
+        refresh: bool = False,
+    ) -> t.Generator[tuple[dict, t.Any], None, None]:
+        """Fetch a resource once per set of path params, concurrently, i.e. WAF filters for every zone.
+
+        Description:
+            At most `max_workers` fetches (default: the resource's concurrency class) run at once, over the
+            controller's shared connection pool. Results are yielded as they complete. A failed fetch yields
+            its exception instead of a result, so one zone can't stop the others.
+
+        Params:
+            resource (str | Resource): A registered resource name, or a `Resource`.
+            path_params (Iterable[dict]): One dict of path params per fetch, i.e. `[{"zone_id": "..."}, ...]`.
+
+            See `fetch()` for the other params.
+
+        Returns:
+            (Generator[tuple[dict, Any]]): `(path_params, result or exception)` pairs, in completion order.
+
+        """
+        resource = resources.get_resource(resource)
+        headers = self._request_auth(token=token, headers=headers)
+
+        def _fetch(item_params: dict) -> t.Any:
+            ## Pages of each fetch are requested one at a time; the fetches themselves run concurrently
+            return self.fetch(
+                resource,
+                params=params,
+                parse=parse,
+                max_workers=1,
+                max_retries=max_retries,
+                headers=headers,
+                refresh=refresh,
+                **item_params,
+            )
+
+        with self._open_client():
+            yield from concurrency.bounded_map(
+                _fetch,
+                path_params,
+                max_workers=max_workers or resource.max_workers,
+                ordered=False,
+                return_exceptions=True,
+            )
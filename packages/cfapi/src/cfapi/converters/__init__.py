@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from .arrow_converters import (
+    DNS_RECORD_ARROW_SCHEMA,
+    ZONE_ARROW_SCHEMA,
+    arrow_schema_from_model,
+    arrow_type_from_annotation,
+    flatten_schema,
+    page_to_record_batch,
+    pages_to_record_batches,
+    pages_to_table,
+    write_pages_ndjson,
+    write_pages_parquet,
+)
@@ -0,0 +1,275 @@
+"""Convert paginated Cloudflare API results directly into Arrow record batches & tables.
+
+Building a `pandas.DataFrame` from a list of nested result dicts produces `object` columns full of dicts.
+The converters here derive a fixed Arrow schema from a pydantic schema (i.e. `CloudflareZoneBase`), where nested
+models become struct columns & list fields become list columns. Each page of results is converted into one
+`pyarrow.RecordBatch` as it arrives, so a listing never has to be held as Python dicts all at once.
+
+Usage:
+
+``` py linenums=1
+zones_table = pages_to_table(cf_controller.iter_zone_pages())
+write_pages_parquet(cf_controller.iter_zone_pages(), "zones.parquet")
+```
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+from pathlib import Path
+import types
+import typing as t
+
+from domain.cloudflare.schemas import CloudflareDNSRecordBase, CloudflareZoneBase
+
+from loguru import logger as log
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+## Arrow types for scalar annotations on pydantic schemas
+SCALAR_ARROW_TYPES: dict[type, pa.DataType] = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+}
+
+
+def arrow_type_from_annotation(annotation: t.Any) -> pa.DataType:
+    """Return the Arrow type for a pydantic field annotation.
+
+    Description:
+        Optional annotations (`X | None`) map to the type of `X`, since every column is nullable.
+        Nested pydantic models map to struct columns, & `list[X]` maps to a list column.
+
+    Params:
+        annotation (Any): A resolved type annotation from a pydantic model field.
+
+    Returns:
+        (pyarrow.DataType): The matching Arrow type.
+
+    Raises:
+        TypeError: When the annotation has no Arrow mapping.
+
+    """
+    origin = t.get_origin(annotation)
+
+    if origin in (t.Union, types.UnionType):
+        args = [arg for arg in t.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Unsupported union annotation: {annotation}")
+
+        return arrow_type_from_annotation(args[0])
+
+    if origin in (list, tuple):
+        args = t.get_args(annotation)
+        if not args:
+            raise TypeError(f"List annotation is missing an item type: {annotation}")
+
+        return pa.list_(arrow_type_from_annotation(args[0]))
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return pa.struct(arrow_schema_from_model(annotation))
+
+    if annotation in SCALAR_ARROW_TYPES:
+        return SCALAR_ARROW_TYPES[annotation]
+
+    raise TypeError(f"No Arrow type mapping for annotation: {annotation}")
+
+
+@functools.cache
+def arrow_schema_from_model(model: t.Type[BaseModel]) -> pa.Schema:
+    """Derive a fixed Arrow schema from a pydantic model's fields.
+
+    Params:
+        model (type[BaseModel]): A pydantic model class, i.e. `CloudflareZoneBase`.
+
+    Returns:
+        (pyarrow.Schema): An Arrow schema with one nullable column per model field.
+
+    """
+    schema_fields: list[pa.Field] = [
+        pa.field(name, arrow_type_from_annotation(field.annotation), nullable=True)
+        for name, field in model.model_fields.items()
+    ]
+
+    return pa.schema(schema_fields)
+
+
+## Arrow schema for Cloudflare zone listings
+ZONE_ARROW_SCHEMA: pa.Schema = arrow_schema_from_model(CloudflareZoneBase)
+## Arrow schema for Cloudflare DNS record listings & BIND exports
+DNS_RECORD_ARROW_SCHEMA: pa.Schema = arrow_schema_from_model(CloudflareDNSRecordBase)
+
+
+def flatten_schema(schema: pa.Schema) -> pa.Schema:
+    """Return the schema a batch has after its struct columns are flattened, i.e. `account` -> `account.id`, `account.name`."""
+    return schema.empty_table().flatten().schema
+
+
+def page_to_record_batch(
+    page: list[dict], schema: pa.Schema = ZONE_ARROW_SCHEMA, flatten: bool = False
+) -> pa.RecordBatch:
+    """Convert a single page of API results into an Arrow record batch.
+
+    Params:
+        page (list[dict]): The `result` list from one page of an API response.
+        schema (pyarrow.Schema): (default: `ZONE_ARROW_SCHEMA`) The fixed schema for the batch. Keys not in
+            the schema are dropped, & missing keys become nulls.
+        flatten (bool): (default: False) Flatten struct columns into `parent.child` columns.
+
+    Returns:
+        (pyarrow.RecordBatch): The page as a record batch.
+
+    """
+    batch: pa.RecordBatch = pa.RecordBatch.from_pylist(page, schema=schema)
+
+    if flatten:
+        ## Flattening struct columns re-uses the child arrays, nothing is copied
+        flat_table: pa.Table = pa.Table.from_batches([batch]).flatten()
+        batch = pa.RecordBatch.from_arrays(
+            [column.combine_chunks() for column in flat_table.columns],
+            schema=flat_table.schema,
+        )
+
+    return batch
+
+
+def pages_to_record_batches(
+    pages: t.Iterable[list[dict]],
+    schema: pa.Schema = ZONE_ARROW_SCHEMA,
+    flatten: bool = False,
+) -> t.Generator[pa.RecordBatch, None, None]:
+    """Yield one Arrow record batch per page of API results, as pages arrive.
+
+    Params:
+        pages (Iterable[list[dict]]): An iterable of result pages, i.e. `CloudflareController.iter_zone_pages()`.
+        schema (pyarrow.Schema): (default: `ZONE_ARROW_SCHEMA`) The fixed schema for each batch.
+        flatten (bool): (default: False) Flatten struct columns into `parent.child` columns.
+
+    Returns:
+        (Generator[pyarrow.RecordBatch]): A generator of record batches.
+
+    """
+    for page in pages:
+        if not page:
+            continue
+
+        yield page_to_record_batch(page, schema=schema, flatten=flatten)
+
+
+def pages_to_table(
+    pages: t.Iterable[list[dict]],
+    schema: pa.Schema = ZONE_ARROW_SCHEMA,
+    flatten: bool = False,
+) -> pa.Table:
+    """Build an Arrow table from paginated API results, appending one record batch per page.
+
+    Params:
+        pages (Iterable[list[dict]]): An iterable of result pages.
+        schema (pyarrow.Schema): (default: `ZONE_ARROW_SCHEMA`) The fixed table schema.
+        flatten (bool): (default: False) Flatten struct columns into `parent.child` columns.
+
+    Returns:
+        (pyarrow.Table): A table with one chunk per page.
+
+    """
+    batches: list[pa.RecordBatch] = list(
+        pages_to_record_batches(pages, schema=schema, flatten=flatten)
+    )
+
+    if not batches:
+        table_schema: pa.Schema = flatten_schema(schema) if flatten else schema
+
+        return table_schema.empty_table()
+
+    table: pa.Table = pa.Table.from_batches(batches)
+    log.debug(f"Built Arrow table from [{len(batches)}] page(s): [{table.num_rows}] row(s)")
+
+    return table
+
+
+def write_pages_parquet(
+    pages: t.Iterable[list[dict]],
+    output_file: t.Union[str, Path],
+    schema: pa.Schema = ZONE_ARROW_SCHEMA,
+    flatten: bool = False,
+    compression: str = "zstd",
+) -> int:
+    """Stream paginated API results into a Parquet file, writing one row group per page.
+
+    Params:
+        pages (Iterable[list[dict]]): An iterable of result pages.
+        output_file (str | Path): Path to the Parquet file to write.
+        schema (pyarrow.Schema): (default: `ZONE_ARROW_SCHEMA`) The fixed file schema.
+        flatten (bool): (default: False) Flatten struct columns into `parent.child` columns.
+        compression (str): (default: "zstd") Parquet compression codec.
+
+    Returns:
+        (int): The number of rows written.
+
+    """
+    output_file: Path = Path(str(output_file))
+    if not output_file.parent.exists():
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    file_schema: pa.Schema = flatten_schema(schema) if flatten else schema
+    rows: int = 0
+
+    try:
+        with pq.ParquetWriter(
+            str(output_file), schema=file_schema, compression=compression
+        ) as writer:
+            for batch in pages_to_record_batches(pages, schema=schema, flatten=flatten):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    except Exception as exc:
+        msg = f"({type(exc)}) Error writing Parquet file '{output_file}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    log.info(f"Wrote [{rows}] row(s) to '{output_file}'")
+
+    return rows
+
+
+def write_pages_ndjson(
+    pages: t.Iterable[list[dict]],
+    output_file: t.Union[str, Path],
+) -> int:
+    """Stream paginated API results into a newline-delimited JSON file, one result per line.
+
+    Params:
+        pages (Iterable[list[dict]]): An iterable of result pages.
+        output_file (str | Path): Path to the NDJSON file to write.
+
+    Returns:
+        (int): The number of rows written.
+
+    """
+    output_file: Path = Path(str(output_file))
+    if not output_file.parent.exists():
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    rows: int = 0
+
+    try:
+        with open(output_file, "w", encoding="utf-8") as f:
+            for page in pages:
+                for result in page:
+                    f.write(json.dumps(result, default=str))
+                    f.write("\n")
+
+                rows += len(page)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error writing NDJSON file '{output_file}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    log.info(f"Wrote [{rows}] row(s) to '{output_file}'")
+
+    return rows
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from .snapshot import (
+    CHANGE_KINDS,
+    CHANGESET_OUTPUT_FORMATS,
+    SnapshotDiff,
+    diff_snapshots,
+    diff_values,
+    index_snapshot,
+    iter_snapshot,
+)
@@ -0,0 +1,303 @@
+"""Diff two snapshots of an inventory (zones, filters, DNS records, ...) into a compact change set.
+
+A diff never compares whole snapshots. Each snapshot is read once into a hash index, mapping each record's key
+(i.e. its `id`) to a hash of its canonical content (`core_utils.hash_utils.get_hash_from_record()`). Joining the
+two indexes by key finds added, removed & unchanged records from the hashes alone. Only the records whose hashes
+differ are read again & deep-compared, field by field.
+
+Snapshots can be NDJSON files, Parquet files, directories of either (i.e. an account-partitioned inventory
+written by `cfapi.inventory`), or in-memory lists of dicts.
+
+Change set rows:
+
+| column     | description                                                            |
+| ---------- | ---------------------------------------------------------------------- |
+| `change`   | `added`, `removed` or `changed`                                        |
+| `key`      | The record's key; composite keys are joined with `/`                   |
+| `field`    | Dotted path of a changed field, i.e. `plan.name`. Empty for added/removed |
+| `old`      | JSON of the old value (or whole record, for `removed`)                 |
+| `new`      | JSON of the new value (or whole record, for `added`)                   |
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+import typing as t
+
+from core_utils.hash_utils import canonical_json, get_hash_from_record
+
+from loguru import logger as log
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+## Kinds of change in a change set
+CHANGE_KINDS: tuple[str, ...] = ("added", "removed", "changed")
+## File formats a change set can be written to
+CHANGESET_OUTPUT_FORMATS: list[str] = ["ndjson", "parquet"]
+
+CHANGESET_ARROW_SCHEMA: pa.Schema = pa.schema(
+    [
+        pa.field("change", pa.string()),
+        pa.field("key", pa.string()),
+        pa.field("field", pa.string()),
+        pa.field("old", pa.string()),
+        pa.field("new", pa.string()),
+    ]
+)
+
+## A snapshot: a file or directory path, or an in-memory list of record dicts
+Snapshot = t.Union[str, Path, t.Sequence[dict]]
+
+
+@dataclass
+class SnapshotDiff:
+    """The change set between two snapshots, & counts of records by kind of change."""
+
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    changes: list[dict] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "change_rows": len(self.changes),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def write(self, output_file: t.Union[str, Path], fmt: str | None = None) -> int:
+        """Write the change set to an NDJSON or Parquet file. `fmt` defaults to the file's extension.
+
+        Returns:
+            (int): The number of change rows written.
+
+        """
+        output_file = Path(str(output_file))
+        fmt = fmt or ("parquet" if output_file.suffix.lower() == ".parquet" else "ndjson")
+
+        if fmt not in CHANGESET_OUTPUT_FORMATS:
+            raise ValueError(f"Unknown change set format: '{fmt}'. Must be one of {CHANGESET_OUTPUT_FORMATS}")
+
+        if not output_file.parent.exists():
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            if fmt == "parquet":
+                pq.write_table(
+                    pa.Table.from_pylist(self.changes, schema=CHANGESET_ARROW_SCHEMA),
+                    str(output_file),
+                    compression="zstd",
+                )
+            else:
+                with open(output_file, "w", encoding="utf-8") as f:
+                    for row in self.changes:
+                        f.write(json.dumps(row, ensure_ascii=False))
+                        f.write("\n")
+        except Exception as exc:
+            msg = f"({type(exc)}) Error writing change set to '{output_file}'. Details: {exc}"
+            log.error(msg)
+
+            raise exc
+
+        log.info(f"Wrote [{len(self.changes)}] change row(s) to '{output_file}'")
+
+        return len(self.changes)
+
+
+def _snapshot_files(path: Path) -> list[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in (".ndjson", ".jsonl", ".parquet"))
+
+    return [path]
+
+
+def iter_snapshot(snapshot: Snapshot, batch_size: int = 10_000) -> t.Generator[dict, None, None]:
+    """Yield every record of a snapshot: an NDJSON/Parquet file, a directory of them, or a list of dicts.
+
+    Description:
+        Parquet files are read `batch_size` rows at a time. Hive partition directories (i.e. `account_id=...`)
+        are read back as columns.
+
+    """
+    if not isinstance(snapshot, (str, Path)):
+        yield from snapshot
+
+        return
+
+    path: Path = Path(str(snapshot))
+    if not path.exists():
+        raise FileNotFoundError(f"Snapshot not found: '{path}'")
+
+    for file in _snapshot_files(path):
+        if file.suffix.lower() == ".parquet":
+            dataset = ds.dataset(str(file), format="parquet")
+            ## Hive partition directories (i.e. `account_id=...`) become columns again
+            partition_values: dict = (
+                dict(part.split("=", 1) for part in file.relative_to(path).parent.parts if "=" in part)
+                if path.is_dir()
+                else {}
+            )
+
+            for batch in dataset.to_batches(batch_size=batch_size):
+                for record in batch.to_pylist():
+                    yield {**partition_values, **record} if partition_values else record
+        else:
+            with open(file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def _record_key(record: dict, key: t.Sequence[str]) -> str:
+    try:
+        return "/".join(str(record[name]) for name in key)
+    except KeyError as exc:
+        raise ValueError(f"Snapshot record has no key field {exc}: {canonical_json(record)[:200]}")
+
+
+def index_snapshot(
+    snapshot: Snapshot,
+    key: t.Sequence[str] = ("id",),
+    exclude: t.Iterable[str] | None = None,
+) -> dict[str, str]:
+    """Read a snapshot into a hash index mapping each record's key to the hash of its content.
+
+    Raises:
+        ValueError: When a record has no key field.
+
+    """
+    exclude = tuple(exclude or ())
+    index: dict[str, str] = {}
+    duplicates: int = 0
+
+    for record in iter_snapshot(snapshot):
+        record_key: str = _record_key(record, key)
+        if record_key in index:
+            duplicates += 1
+
+        index[record_key] = get_hash_from_record(record, exclude=exclude)
+
+    if duplicates:
+        log.warning(f"Snapshot has [{duplicates}] duplicate key(s); the last record for each key is used")
+
+    return index
+
+
+def diff_values(old: t.Any, new: t.Any, path: str = "") -> t.Generator[tuple[str, t.Any, t.Any], None, None]:
+    """Yield `(field path, old, new)` for every differing leaf of two values.
+
+    Dicts are compared key by key; lists & scalars are compared whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for name in sorted(set(old) | set(new), key=str):
+            child: str = f"{path}.{name}" if path else str(name)
+
+            if name not in old:
+                yield child, None, new[name]
+            elif name not in new:
+                yield child, old[name], None
+            else:
+                yield from diff_values(old[name], new[name], child)
+
+        return
+
+    if old != new:
+        yield path, old, new
+
+
+def _collect(
+    snapshot: Snapshot, keys: set[str], key: t.Sequence[str]
+) -> dict[str, dict]:
+    """Read a snapshot again, keeping only the records with the given keys."""
+    if not keys:
+        return {}
+
+    return {
+        record_key: record
+        for record in iter_snapshot(snapshot)
+        if (record_key := _record_key(record, key)) in keys
+    }
+
+
+def diff_snapshots(
+    old: Snapshot,
+    new: Snapshot,
+    key: t.Union[str, t.Sequence[str]] = "id",
+    exclude: t.Iterable[str] | None = None,
+) -> SnapshotDiff:
+    """Diff two snapshots into a change set of added, removed & changed records.
+
+    Params:
+        old (Snapshot): The earlier snapshot.
+        new (Snapshot): The later snapshot.
+        key (str | Sequence[str]): (default: "id") The field(s) identifying a record across snapshots, i.e.
+            `("zone_id", "id")` for filters.
+        exclude (Iterable[str] | None): Top-level fields to ignore, i.e. `["modified_on"]`.
+
+    Returns:
+        (SnapshotDiff): Counts by kind of change, & one change row per added/removed record & changed field.
+
+    """
+    key = (key,) if isinstance(key, str) else tuple(key)
+    exclude = tuple(exclude or ())
+    excluded: set[str] = set(exclude)
+    result: SnapshotDiff = SnapshotDiff()
+    start: float = time.perf_counter()
+
+    old_index: dict[str, str] = index_snapshot(old, key=key, exclude=exclude)
+    new_index: dict[str, str] = index_snapshot(new, key=key, exclude=exclude)
+
+    removed: set[str] = old_index.keys() - new_index.keys()
+    added: set[str] = new_index.keys() - old_index.keys()
+    changed: set[str] = {
+        record_key for record_key in old_index.keys() & new_index.keys() if old_index[record_key] != new_index[record_key]
+    }
+
+    result.added, result.removed, result.changed = len(added), len(removed), len(changed)
+    result.unchanged = len(old_index.keys() & new_index.keys()) - len(changed)
+    log.debug(
+        f"Indexed [{len(old_index)}] old & [{len(new_index)}] new record(s): {result.added} added, {result.removed} removed, {result.changed} changed"
+    )
+
+    ## Only the records that were added, removed or changed are read back in full
+    old_records: dict[str, dict] = _collect(old, removed | changed, key)
+    new_records: dict[str, dict] = _collect(new, added | changed, key)
+
+    for record_key in sorted(removed):
+        result.changes.append(
+            {"change": "removed", "key": record_key, "field": None, "old": canonical_json(old_records[record_key]), "new": None}
+        )
+
+    for record_key in sorted(added):
+        result.changes.append(
+            {"change": "added", "key": record_key, "field": None, "old": None, "new": canonical_json(new_records[record_key])}
+        )
+
+    for record_key in sorted(changed):
+        old_record: dict = {k: v for k, v in old_records[record_key].items() if k not in excluded}
+        new_record: dict = {k: v for k, v in new_records[record_key].items() if k not in excluded}
+
+        for field_path, old_value, new_value in diff_values(old_record, new_record):
+            result.changes.append(
+                {
+                    "change": "changed",
+                    "key": record_key,
+                    "field": field_path,
+                    "old": canonical_json(old_value),
+                    "new": canonical_json(new_value),
+                }
+            )
+
+    result.elapsed = time.perf_counter() - start
+    log.info(f"Snapshot diff: {result.summary()}")
+
+    return result
@@ -0,0 +1,4 @@
+from __future__ import annotations
+
+from .bind import parse_bind_lines
+from .sweep import iter_zone_dns_pages, sweep_dns_records, write_zone_dns_records
@@ -0,0 +1,208 @@
+"""Streaming parser for BIND zone files, i.e. the output of Cloudflare's DNS records export endpoint.
+
+Lines are parsed one at a time, so an export can be read straight off an HTTP response stream
+(`httpx.Response.iter_lines()`) without holding the file in memory.
+"""
+
+from __future__ import annotations
+
+import re
+import typing as t
+
+from loguru import logger as log
+
+## Record classes that may appear between the TTL & type columns
+DNS_CLASSES: frozenset[str] = frozenset({"IN", "CH", "HS", "CS"})
+## Cloudflare writes proxy status as a trailing comment, i.e. `; cf_tags=cf-proxied:true`
+CF_PROXIED_RE: re.Pattern = re.compile(r"cf-proxied:(true|false)")
+## Record types whose rdata starts with a priority value
+PRIORITY_TYPES: frozenset[str] = frozenset({"MX", "SRV", "URI"})
+## TTL units BIND accepts after a number, i.e. `1h` or `1h30m`
+TTL_UNITS: dict[str, int] = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+TTL_RE: re.Pattern = re.compile(r"(?:\d+[smhdw])+|\d+", re.IGNORECASE)
+TTL_PART_RE: re.Pattern = re.compile(r"(\d+)([smhdw])", re.IGNORECASE)
+
+
+def split_comment(line: str) -> tuple[str, str]:
+    """Split a zone file line into `(data, comment)`, ignoring `;` characters inside quoted strings."""
+    in_quotes: bool = False
+    escaped: bool = False
+
+    for i, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            in_quotes = not in_quotes
+        elif char == ";" and not in_quotes:
+            return line[:i], line[i + 1 :]
+
+    return line, ""
+
+
+def strip_parens(data: str) -> tuple[str, int, int]:
+    """Replace the grouping parentheses of a zone file line with spaces, ignoring parentheses inside quoted strings.
+
+    Returns:
+        (tuple[str, int, int]): The line without grouping parentheses, & the number of `(` & `)` removed.
+
+    """
+    chars: list[str] = list(data)
+    opened: int = 0
+    closed: int = 0
+    in_quotes: bool = False
+    escaped: bool = False
+
+    for i, char in enumerate(chars):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            in_quotes = not in_quotes
+        elif char in "()" and not in_quotes:
+            chars[i] = " "
+            if char == "(":
+                opened += 1
+            else:
+                closed += 1
+
+    return "".join(chars), opened, closed
+
+
+def tokenize(data: str) -> list[str]:
+    """Split zone file data on whitespace, keeping quoted strings (with their quotes) as single tokens."""
+    return re.findall(r'"(?:[^"\\]|\\.)*"|\S+', data)
+
+
+def parse_ttl(token: str) -> int | None:
+    """Return a TTL in seconds from `3600`, or unit-suffixed forms like `1h` & `1h30m`. `None` if it isn't a TTL."""
+    if not TTL_RE.fullmatch(token):
+        return None
+
+    if token.isdigit():
+        return int(token)
+
+    return sum(int(value) * TTL_UNITS[unit.lower()] for value, unit in TTL_PART_RE.findall(token))
+
+
+def _absolute_name(name: str, origin: str | None) -> str:
+    """Return a fully-qualified record name, without the trailing dot."""
+    if name == "@":
+        return (origin or "").rstrip(".")
+
+    if name.endswith("."):
+        return name.rstrip(".")
+
+    if origin:
+        return f"{name}.{origin.rstrip('.')}"
+
+    return name
+
+
+def parse_bind_lines(
+    lines: t.Iterable[str],
+    origin: str | None = None,
+    default_ttl: int | None = None,
+) -> t.Generator[dict, None, None]:
+    """Parse BIND zone file lines into DNS record dicts, one record at a time.
+
+    Description:
+        Supports `$ORIGIN` & `$TTL` directives, TTLs with units (i.e. `1h30m`), omitted owner names (continuing the previous record's name),
+        relative names, `@`, & records split over several lines with parentheses (i.e. `SOA`).
+        The yielded dicts use the field names of `CloudflareDNSRecordBase`.
+
+    Params:
+        lines (Iterable[str]): Zone file lines, i.e. `http_res.iter_lines()`.
+        origin (str | None): The zone name, used for relative names until a `$ORIGIN` directive is read.
+        default_ttl (int | None): TTL for records that do not set one, until a `$TTL` directive is read.
+
+    Returns:
+        (Generator[dict]): A generator of DNS record dicts.
+
+    """
+    last_name: str | None = None
+    ## Tokens & comments of a record that continues over several lines
+    pending: list[str] = []
+    pending_comment: str = ""
+    pending_blank: bool = False
+    depth: int = 0
+
+    for line_no, line in enumerate(lines, start=1):
+        data, comment = split_comment(line.rstrip("\r\n"))
+        ## Only parentheses outside quoted strings group lines, i.e. not the ones in `TXT "a (b)"`
+        unparenthesized, opened, closed = strip_parens(data)
+
+        if depth > 0 or opened:
+            if depth == 0:
+                pending_blank = data[:1].isspace()
+
+            depth += opened - closed
+            pending.extend(tokenize(unparenthesized))
+            pending_comment += comment
+
+            if depth > 0:
+                continue
+
+            tokens, comment = pending, pending_comment
+            pending, pending_comment, depth = [], "", 0
+            ## A continued record keeps the leading-whitespace check of its first line
+            starts_blank: bool = pending_blank
+        else:
+            if not data.strip():
+                continue
+
+            tokens = tokenize(data)
+            starts_blank = data[:1].isspace()
+
+        if not tokens:
+            continue
+
+        if tokens[0].upper() == "$ORIGIN" and len(tokens) > 1:
+            origin = tokens[1]
+            continue
+        if tokens[0].upper() == "$TTL" and len(tokens) > 1:
+            ttl_value: int | None = parse_ttl(tokens[1])
+            if ttl_value is None:
+                log.warning(f"Skipping invalid $TTL directive on line [{line_no}]: {line!r}")
+            else:
+                default_ttl = ttl_value
+            continue
+        if tokens[0].startswith("$"):
+            log.debug(f"Skipping unsupported zone file directive on line [{line_no}]: {tokens[0]}")
+            continue
+
+        if starts_blank:
+            name = last_name
+        else:
+            name = _absolute_name(tokens.pop(0), origin)
+            last_name = name
+
+        ttl: int | None = default_ttl
+        ## TTL & class may appear in either order before the type
+        while tokens and (parse_ttl(tokens[0]) is not None or tokens[0].upper() in DNS_CLASSES):
+            token = tokens.pop(0)
+            if token.upper() not in DNS_CLASSES:
+                ttl = parse_ttl(token)
+
+        if not tokens or name is None:
+            log.warning(f"Skipping unparseable zone file line [{line_no}]: {line!r}")
+            continue
+
+        record_type: str = tokens.pop(0).upper()
+        priority: int | None = None
+
+        if record_type in PRIORITY_TYPES and tokens and tokens[0].isdigit():
+            priority = int(tokens.pop(0))
+
+        proxied_match = CF_PROXIED_RE.search(comment)
+
+        yield {
+            "name": name,
+            "type": record_type,
+            "content": " ".join(tokens),
+            "ttl": ttl,
+            "priority": priority,
+            "proxied": (proxied_match.group(1) == "true") if proxied_match else None,
+        }
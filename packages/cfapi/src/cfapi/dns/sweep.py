@@ -0,0 +1,179 @@
+"""Write DNS records for one zone, or every zone, to per-zone files.
+
+Each zone's records are streamed page by page (from the paginated API) or batch by batch (from the BIND export)
+into its own Parquet or NDJSON file, so no more than one page per zone is held in memory. A sweep over many zones
+runs a bounded number of zones at once through the controller's shared HTTP client.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import typing as t
+
+from cfapi import concurrency, converters
+
+from loguru import logger as log
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Sources a zone's DNS records can be read from
+DNS_SOURCES: list[str] = ["api", "bind"]
+## File formats DNS records can be written to
+DNS_OUTPUT_FORMATS: list[str] = ["parquet", "ndjson"]
+
+
+def _tag_page(page: list[dict], zone_id: str, zone_name: str | None) -> list[dict]:
+    """Add the zone's ID & name to each record in a page."""
+    return [{**record, "zone_id": zone_id, "zone_name": zone_name} for record in page]
+
+
+def iter_zone_dns_pages(
+    cf_controller: CloudflareController,
+    zone_id: str,
+    zone_name: str | None = None,
+    source: str = "api",
+    per_page: int = 5000,
+    page_workers: int = 2,
+) -> t.Generator[list[dict], None, None]:
+    """Yield pages of DNS record dicts for a zone, tagged with the zone's ID & name.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        zone_id (str): The Cloudflare zone ID.
+        zone_name (str | None): The zone name. Required to resolve relative names in a BIND export.
+        source (str): (default: "api") `"api"` pages through `/dns_records`, `"bind"` streams the BIND export.
+        per_page (int): (default: 5000) Records per API page, or per batch of parsed BIND records.
+        page_workers (int): (default: 2) Maximum number of API pages requested at once for the zone.
+
+    Returns:
+        (Generator[list[dict]]): A generator of DNS record pages.
+
+    """
+    match source:
+        case "api":
+            pages = cf_controller.iter_dns_record_pages(
+                zone_id=zone_id, per_page=per_page, max_workers=page_workers
+            )
+        case "bind":
+            pages = concurrency.chunked(
+                cf_controller.iter_dns_records_bind(zone_id=zone_id, zone_name=zone_name),
+                per_page,
+            )
+        case _:
+            raise ValueError(f"Unknown DNS source: '{source}'. Must be one of {DNS_SOURCES}")
+
+    for page in pages:
+        yield _tag_page(page, zone_id=zone_id, zone_name=zone_name)
+
+
+def write_zone_dns_records(
+    cf_controller: CloudflareController,
+    zone_id: str,
+    zone_name: str | None = None,
+    output_dir: t.Union[str, Path] = ".data/dns_records",
+    source: str = "api",
+    fmt: str = "parquet",
+    per_page: int = 5000,
+    page_workers: int = 2,
+) -> int:
+    """Stream a zone's DNS records into `{output_dir}/{zone_id}.{fmt}`.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        zone_id (str): The Cloudflare zone ID.
+        zone_name (str | None): The zone name.
+        output_dir (str | Path): (default: ".data/dns_records") Directory for the per-zone files.
+        source (str): (default: "api") `"api"` or `"bind"`.
+        fmt (str): (default: "parquet") `"parquet"` or `"ndjson"`.
+        per_page (int): (default: 5000) Records per page/batch, which is also the Parquet row group size.
+        page_workers (int): (default: 2) Maximum number of API pages requested at once for the zone.
+
+    Returns:
+        (int): The number of records written.
+
+    """
+    pages = iter_zone_dns_pages(
+        cf_controller,
+        zone_id=zone_id,
+        zone_name=zone_name,
+        source=source,
+        per_page=per_page,
+        page_workers=page_workers,
+    )
+    output_file: Path = Path(str(output_dir)) / f"{zone_id}.{fmt}"
+
+    match fmt:
+        case "parquet":
+            return converters.write_pages_parquet(
+                pages, output_file=output_file, schema=converters.DNS_RECORD_ARROW_SCHEMA
+            )
+        case "ndjson":
+            return converters.write_pages_ndjson(pages, output_file=output_file)
+        case _:
+            raise ValueError(
+                f"Unknown DNS output format: '{fmt}'. Must be one of {DNS_OUTPUT_FORMATS}"
+            )
+
+
+def sweep_dns_records(
+    cf_controller: CloudflareController,
+    zones: t.Iterable[t.Any],
+    output_dir: t.Union[str, Path] = ".data/dns_records",
+    source: str = "api",
+    fmt: str = "parquet",
+    max_workers: int = 4,
+    per_page: int = 5000,
+    page_workers: int = 1,
+) -> dict[str, int | Exception]:
+    """Write the DNS records of every zone to per-zone files, a bounded number of zones at a time.
+
+    Description:
+        A zone that fails is logged & reported in the returned dict; it does not stop the sweep.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        zones (Iterable): Zone ID strings, zone dicts, or zone records. Consumed lazily.
+        output_dir (str | Path): (default: ".data/dns_records") Directory for the per-zone files.
+        source (str): (default: "api") `"api"` or `"bind"`.
+        fmt (str): (default: "parquet") `"parquet"` or `"ndjson"`.
+        max_workers (int): (default: 4) Maximum number of zones swept at once.
+        per_page (int): (default: 5000) Records per page/batch.
+        page_workers (int): (default: 1) Maximum number of API pages requested at once per zone.
+
+    Returns:
+        (dict[str, int | Exception]): Map of zone ID to the number of records written, or the exception raised.
+
+    """
+
+    def _write_zone(zone: t.Any) -> int:
+        zone_id, zone_name = zone_id_and_name(zone)
+
+        return write_zone_dns_records(
+            cf_controller,
+            zone_id=zone_id,
+            zone_name=zone_name,
+            output_dir=output_dir,
+            source=source,
+            fmt=fmt,
+            per_page=per_page,
+            page_workers=page_workers,
+        )
+
+    results: dict[str, int | Exception] = {}
+
+    with cf_controller._open_client():
+        for zone, result in concurrency.bounded_map(
+            _write_zone, zones, max_workers=max_workers, ordered=False, return_exceptions=True
+        ):
+            zone_id, _ = zone_id_and_name(zone)
+
+            if isinstance(result, Exception):
+                log.error(f"({type(result)}) Error writing DNS records for zone '{zone_id}'. Details: {result}")
+
+            results[zone_id] = result
+
+    total: int = sum(r for r in results.values() if isinstance(r, int))
+    log.info(f"Swept [{total}] DNS record(s) across [{len(results)}] zone(s)")
+
+    return results
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from .sweep import (
+    DEFAULT_ZONE_RESOURCES,
+    INVENTORY_OUTPUT_FORMATS,
+    AccountInventory,
+    InventoryResult,
+    inventory_account,
+    sweep_accounts,
+)
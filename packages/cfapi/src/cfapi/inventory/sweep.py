@@ -0,0 +1,401 @@
+"""Inventory every account a token can see, sharded by account.
+
+An inventory lists each account's zones (`/zones?account.id=...`), then fetches per-zone resources (DNS records,
+WAF filters, rulesets, ...) for every zone. Accounts are swept concurrently, at most `max_accounts` at once. Within an
+account, at most `zone_workers` per-zone fetches run at once. A semaphore shared by every account caps the
+per-zone resource fetches in flight across the whole sweep at `max_requests`, so adding accounts never multiplies
+the load on the API. The semaphore is held per fetch, not per HTTP request: a fetch of a paged resource may request
+up to its resource's `max_workers` pages at once within its slot. With `processes` set, accounts are spread across worker processes, each with its own controller & connection
+pool, & the overall request limit is split between them.
+
+The result is one dataset, partitioned by account:
+
+```
+{output_dir}/{resource}/account_id={account_id}/part-0.{fmt}
+```
+
+Each account's partitions are written by the thread or process that swept it, as soon as the account completes, so
+only the accounts in flight are held in memory & only row counts & file paths are returned. The `account_id=`
+directories are Hive-style partitions, so the dataset can be read back whole with
+`pyarrow.dataset.dataset(f"{output_dir}/zones", partitioning="hive")`. Parquet partitions of a resource share its
+declared result schema; fields it doesn't declare are inferred per account.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import multiprocessing
+from pathlib import Path
+import threading
+import time
+import typing as t
+
+from cfapi import concurrency, converters, resources
+
+from loguru import logger as log
+import pyarrow as pa
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Per-zone resources fetched by default
+DEFAULT_ZONE_RESOURCES: tuple[str, ...] = ("zone_dns_records", "zone_waf_filters", "zone_rulesets")
+## File formats an inventory can be written to
+INVENTORY_OUTPUT_FORMATS: list[str] = ["parquet", "ndjson"]
+
+
+@dataclass
+class AccountInventory:
+    """The partitions written for one account's zones & per-zone resources."""
+
+    account_id: str
+    account_name: str | None = None
+    ## resource name -> rows written to the account's partition
+    counts: dict[str, int] = field(default_factory=dict)
+    ## resource name -> the account's partition file
+    files: dict[str, Path] = field(default_factory=dict)
+    ## (zone ID, resource name, error) for every per-zone fetch that failed
+    errors: list[tuple[str, str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def zones(self) -> int:
+        return self.counts.get("zones", 0)
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "account_id": self.account_id,
+            "account_name": self.account_name,
+            "zones": self.zones,
+            **{name: count for name, count in self.counts.items() if name != "zones"},
+            "errors": len(self.errors),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+@dataclass
+class InventoryResult:
+    """The merged inventory of every swept account."""
+
+    accounts: list[AccountInventory] = field(default_factory=list)
+    ## account ID -> error, for accounts whose zones could not be listed
+    failed: dict[str, str] = field(default_factory=dict)
+    output_dir: Path | None = None
+    elapsed: float = 0.0
+
+    @property
+    def resources(self) -> list[str]:
+        names: dict[str, None] = {}
+        for account in self.accounts:
+            names.update(dict.fromkeys(account.counts))
+
+        return list(names)
+
+    @property
+    def written(self) -> dict[str, int]:
+        """Map of resource name to the number of rows written across every account."""
+        return {name: sum(account.counts.get(name, 0) for account in self.accounts) for name in self.resources}
+
+    def files(self, resource: str) -> list[Path]:
+        """Return every account's partition file for a resource."""
+        return [account.files[resource] for account in self.accounts if resource in account.files]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "accounts": len(self.accounts),
+            "failed_accounts": len(self.failed),
+            "zones": sum(account.zones for account in self.accounts),
+            **{name: count for name, count in self.written.items() if name != "zones"},
+            "errors": sum(len(account.errors) for account in self.accounts),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def _arrow_schema(resource_name: str, rows: list[dict]) -> pa.Schema:
+    """Return the Arrow schema to write a resource's rows with: from its result schema if it has one, else inferred.
+
+    Fields the API returns but the result schema doesn't declare are added with inferred types, so writing rows with
+    the schema never drops a column. `account_id` is left out, because it is the partition key.
+    """
+    resource: resources.Resource | None = resources.RESOURCE_REGISTRY.get(resource_name)
+
+    if resource is not None and resource.schema is not None:
+        schema: pa.Schema = converters.arrow_schema_from_model(resource.schema)
+
+        ## Undeclared fields, in the order rows first have them
+        extra: dict[str, None] = {
+            name: None for row in rows for name in row if schema.get_field_index(name) == -1
+        }
+        if extra:
+            inferred: pa.Schema = pa.Table.from_pylist([{name: row.get(name) for name in extra} for row in rows]).schema
+            for inferred_field in inferred:
+                schema = schema.append(inferred_field)
+    else:
+        schema = pa.Table.from_pylist(rows).schema
+
+    for column in ("zone_id", "zone_name"):
+        if resource_name != "zones" and schema.get_field_index(column) == -1:
+            schema = schema.append(pa.field(column, pa.string()))
+
+    if schema.get_field_index("account_id") != -1:
+        schema = schema.remove(schema.get_field_index("account_id"))
+
+    return schema
+
+
+def _write_partition(
+    resource_name: str, rows: list[dict], output_dir: t.Union[str, Path], account_id: str, fmt: str
+) -> tuple[int, Path]:
+    """Write one account's rows for a resource to its partition file, returning the row count & the file path."""
+    output_file: Path = Path(str(output_dir)) / resource_name / f"account_id={account_id}" / f"part-0.{fmt}"
+
+    if fmt == "parquet":
+        count: int = converters.write_pages_parquet(
+            [rows], output_file=output_file, schema=_arrow_schema(resource_name, rows)
+        )
+    else:
+        count = converters.write_pages_ndjson([rows], output_file=output_file)
+
+    return count, output_file
+
+
+def _account_id_and_name(account: t.Any) -> tuple[str, str | None]:
+    """Return `(id, name)` for an account ID string, account dict, or account schema object."""
+    if isinstance(account, str):
+        return account, None
+
+    if isinstance(account, dict):
+        return account["id"], account.get("name")
+
+    return account.id, getattr(account, "name", None)
+
+
+def _as_rows(result: t.Any) -> list[dict]:
+    if result is None:
+        return []
+
+    return result if isinstance(result, list) else [result]
+
+
+def inventory_account(
+    cf_controller: CloudflareController,
+    account: t.Any,
+    output_dir: t.Union[str, Path] = ".data/inventory",
+    fmt: str = "parquet",
+    zone_resources: t.Sequence[str] = DEFAULT_ZONE_RESOURCES,
+    zone_workers: int = 4,
+    request_slots: threading.Semaphore | None = None,
+) -> AccountInventory:
+    """List an account's zones, fetch the per-zone resources of each zone, & write the account's partitions.
+
+    Description:
+        A per-zone fetch that fails is recorded in `errors`; it does not stop the account's inventory. Rows are
+        tagged with `account_id` (& `zone_id`/`zone_name` for per-zone resources) & released once written.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        account (str | dict): The account ID, or an account dict.
+        output_dir (str | Path): (default: ".data/inventory") Root of the dataset. See the module docs for the layout.
+        fmt (str): (default: "parquet") One of `INVENTORY_OUTPUT_FORMATS`.
+        zone_resources (Sequence[str]): Registered resources with a `{zone_id}` path param to fetch for each zone.
+        zone_workers (int): (default: 4) Maximum per-zone fetches in flight at once for the account.
+        request_slots (Semaphore | None): A semaphore shared between accounts, capping the per-zone resource
+            fetches in flight across all of them. It is held for each whole fetch.
+
+    Returns:
+        (AccountInventory): The account's row counts & partition files.
+
+    Raises:
+        httpx.HTTPStatusError: When the account's zones can't be listed.
+
+    """
+    if fmt not in INVENTORY_OUTPUT_FORMATS:
+        raise ValueError(f"Unknown inventory output format: '{fmt}'. Must be one of {INVENTORY_OUTPUT_FORMATS}")
+
+    account_id, account_name = _account_id_and_name(account)
+    inventory: AccountInventory = AccountInventory(account_id=account_id, account_name=account_name)
+    ## resource name -> the account's rows, until they are written
+    rows: dict[str, list[dict]] = {}
+    start: float = time.perf_counter()
+
+    with cf_controller._open_client():
+        zones: list[dict] = cf_controller.fetch("zones", params={"account.id": account_id})
+        rows["zones"] = [{**zone, "account_id": account_id} for zone in zones]
+        log.debug(f"Account '{account_id}' has [{len(zones)}] zone(s)")
+
+        def _fetch(job: tuple[dict, str]) -> t.Any:
+            zone, resource_name = job
+
+            if request_slots is None:
+                return cf_controller.fetch(resource_name, zone_id=zone["id"])
+
+            with request_slots:
+                return cf_controller.fetch(resource_name, zone_id=zone["id"])
+
+        jobs: t.Generator[tuple[dict, str], None, None] = (
+            (zone, resource_name) for zone in zones for resource_name in zone_resources
+        )
+
+        for (zone, resource_name), result in concurrency.bounded_map(
+            _fetch, jobs, max_workers=zone_workers, ordered=False, return_exceptions=True
+        ):
+            if isinstance(result, Exception):
+                log.error(
+                    f"({type(result)}) Error fetching '{resource_name}' for zone '{zone['id']}' in account '{account_id}'. Details: {result}"
+                )
+                inventory.errors.append((zone["id"], resource_name, f"({type(result)}) {result}"))
+
+                continue
+
+            rows.setdefault(resource_name, []).extend(
+                {**row, "account_id": account_id, "zone_id": zone["id"], "zone_name": zone.get("name")}
+                for row in _as_rows(result)
+            )
+
+    for resource_name in list(rows):
+        resource_rows: list[dict] = rows.pop(resource_name)
+        if resource_rows:
+            inventory.counts[resource_name], inventory.files[resource_name] = _write_partition(
+                resource_name, resource_rows, output_dir, account_id, fmt
+            )
+
+    inventory.elapsed = time.perf_counter() - start
+    log.info(f"Inventoried account '{account_id}': {inventory.summary()}")
+
+    return inventory
+
+
+def _inventory_account_in_process(
+    controller_kwargs: dict,
+    account: t.Any,
+    output_dir: str,
+    fmt: str,
+    zone_resources: t.Sequence[str],
+    zone_workers: int,
+    max_requests: int,
+) -> AccountInventory:
+    """Worker process entrypoint: build a controller, inventory one account & write its partitions."""
+    from cfapi.controllers import CloudflareController
+
+    with CloudflareController(**controller_kwargs) as cf_controller:
+        return inventory_account(
+            cf_controller,
+            account,
+            output_dir=output_dir,
+            fmt=fmt,
+            zone_resources=zone_resources,
+            zone_workers=zone_workers,
+            request_slots=threading.BoundedSemaphore(max_requests),
+        )
+
+
+def sweep_accounts(
+    cf_controller: CloudflareController,
+    accounts: t.Iterable[t.Any] | None = None,
+    output_dir: t.Union[str, Path] = ".data/inventory",
+    fmt: str = "parquet",
+    zone_resources: t.Sequence[str] = DEFAULT_ZONE_RESOURCES,
+    max_accounts: int = 4,
+    zone_workers: int = 4,
+    max_requests: int = 16,
+    processes: int = 0,
+) -> InventoryResult:
+    """Inventory every account visible to the controller's credentials, or the given accounts, into a dataset.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        accounts (Iterable | None): Account IDs or account dicts. Defaults to every account from `get_accounts()`.
+        output_dir (str | Path): (default: ".data/inventory") Root of the account-partitioned dataset.
+        fmt (str): (default: "parquet") One of `INVENTORY_OUTPUT_FORMATS`.
+        zone_resources (Sequence[str]): Registered per-zone resources to fetch for each zone.
+        max_accounts (int): (default: 4) Maximum accounts swept at once on threads. With `processes`, each
+            process sweeps one account at a time.
+        zone_workers (int): (default: 4) Maximum per-zone fetches in flight at once per account.
+        max_requests (int): (default: 16) Maximum per-zone resource fetches in flight at once across all
+            accounts. Each fetch of a paged resource may request several pages at once (see the module docs).
+        processes (int): (default: 0) Spread accounts across this many worker processes. `0` sweeps them on
+            threads in this process.
+
+    Returns:
+        (InventoryResult): Every account's row counts & partition files. Accounts whose zones could not be listed
+            are in `failed`.
+
+    """
+    if fmt not in INVENTORY_OUTPUT_FORMATS:
+        raise ValueError(f"Unknown inventory output format: '{fmt}'. Must be one of {INVENTORY_OUTPUT_FORMATS}")
+
+    for name in zone_resources:
+        if "zone_id" not in resources.get_resource(name).path_params:
+            raise ValueError(f"Resource '{name}' is not a per-zone resource (it has no {{zone_id}} path param)")
+
+    result: InventoryResult = InventoryResult(output_dir=Path(str(output_dir)))
+    start: float = time.perf_counter()
+
+    if accounts is None:
+        accounts = cf_controller.get_accounts()
+
+    accounts = list(accounts)
+    log.info(
+        f"Sweeping [{len(accounts)}] account(s), [{max_accounts}] at a time, using [{processes or 'no'}] worker process(es)"
+    )
+
+    def _collect(account: t.Any, inventory: AccountInventory | Exception) -> None:
+        if isinstance(inventory, Exception):
+            account_id, _ = _account_id_and_name(account)
+            log.error(f"({type(inventory)}) Error inventorying account '{account_id}'. Details: {inventory}")
+            result.failed[account_id] = f"({type(inventory)}) {inventory}"
+        else:
+            result.accounts.append(inventory)
+
+    if processes:
+        ## Each process gets an equal share of the overall request limit
+        process_requests: int = max(1, max_requests // processes)
+        ## Spawn, so workers don't inherit the parent's open sockets & threads
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(
+                    _inventory_account_in_process,
+                    cf_controller.init_kwargs(),
+                    account,
+                    str(output_dir),
+                    fmt,
+                    tuple(zone_resources),
+                    min(zone_workers, process_requests),
+                    process_requests,
+                ): account
+                for account in accounts
+            }
+
+            for future in as_completed(futures):
+                try:
+                    _collect(futures[future], future.result())
+                except Exception as exc:
+                    _collect(futures[future], exc)
+    else:
+        request_slots: threading.BoundedSemaphore = threading.BoundedSemaphore(max_requests)
+
+        with cf_controller._open_client():
+            for account, inventory in concurrency.bounded_map(
+                lambda account: inventory_account(
+                    cf_controller,
+                    account,
+                    output_dir=output_dir,
+                    fmt=fmt,
+                    zone_resources=zone_resources,
+                    zone_workers=zone_workers,
+                    request_slots=request_slots,
+                ),
+                accounts,
+                max_workers=max_accounts,
+                ordered=False,
+                return_exceptions=True,
+            ):
+                _collect(account, inventory)
+
+    ## Keep the merged dataset in a stable order regardless of completion order
+    result.accounts.sort(key=lambda inventory: inventory.account_id)
+    result.elapsed = time.perf_counter() - start
+    log.info(f"Inventory finished, written to '{output_dir}': {result.summary()}")
+
+    return result
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from .namespace import (
+    KV_BULK_GET_MAX_KEYS,
+    KV_BULK_MAX_BYTES,
+    KV_BULK_MAX_KEYS,
+    KV_LIST_MAX_KEYS,
+    KVBatchResult,
+    KVBulkReport,
+    KVNamespace,
+    kv_pair,
+    pack_batches,
+)
@@ -0,0 +1,349 @@
+"""Bulk reads, writes, deletes & key listing for a Workers KV namespace.
+
+Writes & deletes use the namespace's bulk endpoints, which take up to 10,000 keys per call. Arbitrary iterables
+are packed into batches that stay under both the key limit & the request payload limit, & batches are uploaded
+concurrently through the controller's shared HTTP client, each retried on its own when it hits a transient error.
+Keys are listed with cursor pagination, one page of up to 1,000 keys at a time.
+
+Usage:
+
+``` py linenums=1
+with CloudflareController(api_token=token, account_id=account_id) as cf_controller:
+    flags = KVNamespace(cf_controller, namespace_id="0f2ac74b498b48028cb68387c421e279")
+
+    flags.write_many({"beta:checkout": "on", "beta:search": "off"}.items())
+    to_write, to_delete = flags.diff(desired)
+```
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass, field
+import json
+import time
+import typing as t
+
+from cfapi import concurrency
+
+from loguru import logger as log
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Most keys accepted by one bulk write or bulk delete call
+KV_BULK_MAX_KEYS: int = 10_000
+## Largest bulk request body Cloudflare accepts is 100 MB; leave room for the JSON framing
+KV_BULK_MAX_BYTES: int = 95 * 1024 * 1024
+## Most keys returned by one key listing call
+KV_LIST_MAX_KEYS: int = 1_000
+## Most keys accepted by one bulk read call
+KV_BULK_GET_MAX_KEYS: int = 100
+
+
+@dataclass
+class KVBatchResult:
+    """The outcome of one bulk write or delete call."""
+
+    operation: str
+    keys: int
+    bytes: int
+    ok: bool
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class KVBulkReport:
+    """Per-batch results & totals for a bulk write or delete."""
+
+    operation: str
+    results: list[KVBatchResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def keys(self) -> int:
+        return sum(r.keys for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> list[KVBatchResult]:
+        return [r for r in self.results if not r.ok]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "operation": self.operation,
+            "batches": len(self.results),
+            "keys": self.keys,
+            "failed_batches": len(self.failed),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def kv_pair(
+    key: str,
+    value: t.Union[str, bytes],
+    metadata: dict | None = None,
+    expiration_ttl: int | None = None,
+) -> dict:
+    """Build one bulk write entry. `bytes` values are base64 encoded."""
+    pair: dict = {"key": key}
+
+    if isinstance(value, bytes):
+        pair["value"] = base64.b64encode(value).decode("ascii")
+        pair["base64"] = True
+    else:
+        pair["value"] = value
+
+    if metadata is not None:
+        pair["metadata"] = metadata
+    if expiration_ttl is not None:
+        pair["expiration_ttl"] = expiration_ttl
+
+    return pair
+
+
+def pack_batches(
+    entries: t.Iterable[t.Any],
+    max_keys: int = KV_BULK_MAX_KEYS,
+    max_bytes: int = KV_BULK_MAX_BYTES,
+) -> t.Generator[tuple[list[t.Any], int], None, None]:
+    """Pack bulk entries into `(batch, size)` pairs of at most `max_keys` entries & about `max_bytes` of JSON.
+
+    Params:
+        entries (Iterable): Bulk write dicts or key strings. Consumed lazily.
+        max_keys (int): (default: 10,000) Maximum entries per batch.
+        max_bytes (int): (default: 95 MiB) Maximum encoded size per batch.
+
+    Returns:
+        (Generator[tuple[list, int]]): Batches & their approximate encoded size in bytes.
+
+    """
+    batch: list[t.Any] = []
+    ## Opening & closing brackets
+    size: int = 2
+
+    for entry in entries:
+        ## Entry plus its separating comma
+        entry_size: int = len(json.dumps(entry).encode("utf-8")) + 1
+        if entry_size + 2 > max_bytes:
+            raise ValueError(f"KV entry of {entry_size} bytes is larger than the {max_bytes} byte payload limit")
+
+        if batch and (len(batch) >= max_keys or size + entry_size > max_bytes):
+            yield batch, size
+            batch, size = [], 2
+
+        batch.append(entry)
+        size += entry_size
+
+    if batch:
+        yield batch, size
+
+
+class KVNamespace:
+    """A Workers KV namespace, read & written in bulk.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        namespace_id (str): The KV namespace ID.
+        account_id (str | None): The account that owns the namespace. Defaults to the controller's account ID.
+        max_workers (int): (default: 4) Maximum number of bulk calls in flight at once.
+        max_retries (int): (default: 3) Retries for a batch that hits a transient error.
+
+    """
+
+    def __init__(
+        self,
+        cf_controller: CloudflareController,
+        namespace_id: str,
+        account_id: str | None = None,
+        max_workers: int = 4,
+        max_retries: int = 3,
+    ) -> None:
+        self.cf_controller = cf_controller
+        self.namespace_id = namespace_id
+        self.account_id = account_id or cf_controller.account_id
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+
+        if not self.account_id:
+            raise ValueError("An account_id is required for Workers KV requests")
+
+    def __repr__(self) -> str:
+        return f"KVNamespace(account_id={self.account_id}, namespace_id={self.namespace_id})"
+
+    @property
+    def path(self) -> str:
+        return f"/accounts/{self.account_id}/storage/kv/namespaces/{self.namespace_id}"
+
+    def iter_key_pages(
+        self, prefix: str | None = None, limit: int = KV_LIST_MAX_KEYS
+    ) -> t.Generator[list[dict], None, None]:
+        """Yield pages of key dicts (`name`, & `expiration`/`metadata` when set), following the listing cursor.
+
+        Description:
+            The next page is requested as soon as the current page arrives, while the current page is consumed.
+
+        Params:
+            prefix (str | None): Only list keys starting with this prefix.
+            limit (int): (default: 1,000) Keys per page.
+
+        Returns:
+            (Generator[list[dict]]): A generator of key pages.
+
+        """
+        paginator = self.cf_controller.paginate(
+            f"{self.path}/keys",
+            params={"prefix": prefix} if prefix else None,
+            per_page=limit,
+            per_page_param="limit",
+            style="cursor",
+            max_retries=self.max_retries,
+            refresh=True,
+        )
+
+        with self.cf_controller._open_client():
+            yield from paginator.pages()
+
+    def iter_keys(self, prefix: str | None = None) -> t.Generator[str, None, None]:
+        """Yield every key name in the namespace, optionally filtered by prefix."""
+        for page in self.iter_key_pages(prefix=prefix):
+            for key in page:
+                yield key["name"]
+
+    def _send_batch(self, operation: str, batch: list[t.Any], size: int) -> KVBatchResult:
+        result: KVBatchResult = KVBatchResult(operation=operation, keys=len(batch), bytes=size, ok=False)
+        start: float = time.perf_counter()
+
+        match operation:
+            case "write":
+                method, path = "PUT", f"{self.path}/bulk"
+            case "delete":
+                method, path = "POST", f"{self.path}/bulk/delete"
+            case _:
+                raise ValueError(f"Unknown KV bulk operation: '{operation}'")
+
+        try:
+            _res, result.attempts = concurrency.retry(
+                lambda: self.cf_controller.api_request(method, path, json=batch),
+                max_retries=self.max_retries,
+            )
+            result.ok = True
+        except Exception as exc:
+            result.attempts = self.max_retries + 1 if concurrency.is_retryable(exc) else 1
+            result.error = f"({type(exc)}) {exc}"
+            log.error(f"KV bulk {operation} of [{len(batch)}] key(s) failed. Details: {exc}")
+
+        result.elapsed = time.perf_counter() - start
+
+        return result
+
+    def _bulk(self, operation: str, entries: t.Iterable[t.Any]) -> KVBulkReport:
+        report: KVBulkReport = KVBulkReport(operation=operation)
+        start: float = time.perf_counter()
+
+        with self.cf_controller._open_client():
+            for _batch, result in concurrency.bounded_map(
+                lambda packed: self._send_batch(operation, *packed),
+                pack_batches(entries),
+                max_workers=self.max_workers,
+                ordered=False,
+            ):
+                report.results.append(result)
+
+        report.elapsed = time.perf_counter() - start
+        log.info(f"KV bulk {operation} on namespace '{self.namespace_id}': {report.summary()}")
+
+        return report
+
+    def write_many(
+        self,
+        items: t.Iterable[t.Union[tuple[str, t.Union[str, bytes]], dict]],
+        expiration_ttl: int | None = None,
+    ) -> KVBulkReport:
+        """Write key/value pairs in concurrent bulk batches.
+
+        Params:
+            items (Iterable): `(key, value)` tuples, or bulk write dicts (see `kv_pair()`). Consumed lazily.
+            expiration_ttl (int | None): Seconds until every written key expires.
+
+        Returns:
+            (KVBulkReport): Per-batch results & totals.
+
+        """
+
+        def _entries() -> t.Generator[dict, None, None]:
+            for item in items:
+                if isinstance(item, dict):
+                    yield item
+                else:
+                    key, value = item
+                    yield kv_pair(key, value, expiration_ttl=expiration_ttl)
+
+        return self._bulk("write", _entries())
+
+    def delete_many(self, keys: t.Iterable[str]) -> KVBulkReport:
+        """Delete keys in concurrent bulk batches. `keys` is consumed lazily."""
+        return self._bulk("delete", keys)
+
+    def read_many(self, keys: t.Iterable[str]) -> t.Generator[tuple[str, str | None], None, None]:
+        """Yield `(key, value)` for each key, read in concurrent bulk batches of 100 keys. Missing keys yield `None`."""
+
+        def _read(batch: list[str]) -> dict[str, str | None]:
+            res_dict, _attempts = concurrency.retry(
+                lambda: self.cf_controller.api_request(
+                    "POST", f"{self.path}/bulk/get", json={"keys": batch, "type": "text"}
+                ),
+                max_retries=self.max_retries,
+            )
+
+            return (res_dict.get("result") or {}).get("values") or {}
+
+        with self.cf_controller._open_client():
+            for batch, values in concurrency.bounded_map(
+                _read,
+                concurrency.chunked(keys, KV_BULK_GET_MAX_KEYS),
+                max_workers=self.max_workers,
+                ordered=False,
+            ):
+                for key in batch:
+                    yield key, values.get(key)
+
+    def diff(
+        self, desired: t.Mapping[str, str], prefix: str | None = None
+    ) -> tuple[dict[str, str], list[str]]:
+        """Compare the namespace with a desired key/value mapping.
+
+        Params:
+            desired (Mapping[str, str]): The key/value pairs the namespace should hold.
+            prefix (str | None): Only compare keys with this prefix. Keys outside it are never written or deleted.
+
+        Returns:
+            (tuple[dict[str, str], list[str]]): Pairs to write (new or changed), & keys to delete.
+
+        """
+        if prefix:
+            outside: int = sum(1 for key in desired if not key.startswith(prefix))
+            if outside:
+                log.warning(f"Ignoring [{outside}] desired key(s) outside the prefix '{prefix}'")
+                desired = {key: value for key, value in desired.items() if key.startswith(prefix)}
+
+        existing: set[str] = set(self.iter_keys(prefix=prefix))
+        to_delete: list[str] = sorted(existing - set(desired))
+        to_write: dict[str, str] = {key: value for key, value in desired.items() if key not in existing}
+
+        for key, value in self.read_many(sorted(existing & set(desired))):
+            if value != desired[key]:
+                to_write[key] = desired[key]
+
+        log.info(
+            f"KV namespace '{self.namespace_id}' diff: [{len(to_write)}] to write, [{len(to_delete)}] to delete, [{len(existing)}] existing"
+        )
+
+        return to_write, to_delete
+
+    def sync(self, desired: t.Mapping[str, str], prefix: str | None = None) -> tuple[KVBulkReport, KVBulkReport]:
+        """Write changed keys & delete removed keys, so the namespace matches `desired`. See `diff()`."""
+        to_write, to_delete = self.diff(desired, prefix=prefix)
+
+        return self.write_many(to_write.items()), self.delete_many(to_delete)
@@ -0,0 +1,175 @@
+"""In-process memoization of rarely-changing, token-scoped lookups.
+
+The HTTP response cache still costs a cache read, a response decode & (for parsed fetches) pydantic validation on
+every call. Lookups that almost never change for a token, i.e. its accounts or a token verification, are memoized
+one level up instead: `CloudflareController.fetch()` keeps the final result object of any resource with a
+`memo_ttl`, so a repeat lookup within the TTL is a dict lookup.
+
+Entries are keyed by `(token fingerprint, resource name, path params, params, options)`. The fingerprint is a
+hash of the credentials keyed with a random per-process secret, so raw tokens are never kept as keys, a fingerprint
+can't be checked against a guessed token outside the process, & lookups made with different tokens never share an
+entry.
+
+Memoized results are shared between callers; treat them as read-only.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import secrets
+import threading
+import time
+import typing as t
+
+from core_utils.hash_utils import canonical_json
+
+from loguru import logger as log
+
+## A memo key: (token fingerprint, resource name, path params JSON, params JSON, options)
+MemoKey = tuple[str, str, str, str, tuple]
+
+## Keys the credential fingerprints; new for every process, so fingerprints are only comparable within one
+_FINGERPRINT_KEY: bytes = secrets.token_bytes(32)
+
+
+def token_fingerprint(*credentials: str | None) -> str:
+    """Return a short fingerprint for a set of credentials (i.e. an API token, or an email & API key).
+
+    The fingerprint is stable for the life of the process.
+    """
+    digest = hashlib.blake2b(digest_size=16, key=_FINGERPRINT_KEY, person=b"cfapi-memo")
+    for credential in credentials:
+        digest.update((credential or "").encode("utf-8"))
+        digest.update(b"\x00")
+
+    return digest.hexdigest()
+
+
+@dataclass
+class MemoStats:
+    """Hit, miss & invalidation counters for a `MemoCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    invalidated: int = 0
+
+    def summary(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "expired": self.expired, "invalidated": self.invalidated}
+
+
+class MemoCache:
+    """Thread-safe store of memoized results, each with its own expiry.
+
+    Usage:
+
+    ``` py linenums=1
+    memo = MemoCache()
+    key = memo.key(token_fingerprint(token), "accounts")
+
+    accounts = memo.get(key)
+    if accounts is memo.MISSING:
+        accounts = fetch_accounts()
+        memo.set(key, accounts, ttl=3600)
+    ```
+    """
+
+    ## Returned by `get()` on a miss, so `None` results can be memoized too
+    MISSING: t.Final[object] = object()
+
+    def __init__(self) -> None:
+        self.stats: MemoStats = MemoStats()
+
+        self._entries: dict[MemoKey, tuple[float, t.Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"MemoCache(entries={len(self._entries)}, {self.stats.summary()})"
+
+    @staticmethod
+    def key(
+        fingerprint: str,
+        resource: str,
+        path_params: dict | None = None,
+        params: dict | None = None,
+        options: tuple = (),
+    ) -> MemoKey:
+        return (
+            fingerprint,
+            resource,
+            canonical_json(path_params) if path_params else "{}",
+            canonical_json(params) if params else "{}",
+            options,
+        )
+
+    def get(self, key: MemoKey) -> t.Any:
+        """Return a memoized result, or `MemoCache.MISSING` when there is none or it expired."""
+        entry: tuple[float, t.Any] | None = self._entries.get(key)
+
+        if entry is None:
+            self.stats.misses += 1
+
+            return self.MISSING
+
+        expires, value = entry
+        if time.monotonic() >= expires:
+            with self._lock:
+                self._entries.pop(key, None)
+            self.stats.expired += 1
+            self.stats.misses += 1
+
+            return self.MISSING
+
+        self.stats.hits += 1
+
+        return value
+
+    def set(self, key: MemoKey, value: t.Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(
+        self,
+        resource: str | None = None,
+        fingerprint: str | None = None,
+        path_params: dict | None = None,
+    ) -> int:
+        """Drop memoized results. Every filter left as `None` matches everything; no filters clears the cache.
+
+        Params:
+            resource (str | None): Only drop results of this resource.
+            fingerprint (str | None): Only drop results for these credentials (see `token_fingerprint()`).
+            path_params (dict | None): Only drop results whose path params include these, i.e. `{"zone_id": ...}`.
+
+        Returns:
+            (int): The number of results dropped.
+
+        """
+        with self._lock:
+            keys: list[MemoKey] = [
+                key
+                for key in self._entries
+                if (resource is None or key[1] == resource)
+                and (fingerprint is None or key[0] == fingerprint)
+                and (path_params is None or _includes(key[2], path_params))
+            ]
+
+            for key in keys:
+                del self._entries[key]
+
+        self.stats.invalidated += len(keys)
+        if keys:
+            log.debug(f"Invalidated [{len(keys)}] memoized result(s) (resource={resource})")
+
+        return len(keys)
+
+
+def _includes(path_params_json: str, path_params: dict) -> bool:
+    memoized: dict = json.loads(path_params_json)
+
+    return all(str(memoized.get(name)) == str(value) for name, value in path_params.items())
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from .tracker import (
+    DEFAULT_CLOSE_TIMEOUT,
+    DEFAULT_MAX_POLL_ERRORS,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_POLL_BACKOFF,
+    DEFAULT_POLL_INTERVAL,
+    OPERATION_DONE_STATUSES,
+    OperationResult,
+    OperationTracker,
+    TrackerStats,
+)
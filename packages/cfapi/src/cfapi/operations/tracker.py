@@ -0,0 +1,445 @@
+"""Track many long-running Cloudflare bulk operations from one process.
+
+Some bulk calls (i.e. replacing or appending the items of a Rules List) return an operation ID instead of a
+result, & the operation has to be polled until it completes or fails. Polling each job in its own blocking loop
+ties up a thread per job. An `OperationTracker` polls every pending operation from one background thread:
+
+- Each operation is polled on its own adaptive interval. The interval starts short, grows by `backoff` every poll
+  that sees no progress (up to `max_interval`), & drops back to `initial_interval` when the status changes, i.e.
+  from `pending` to `running`.
+- Each polling round groups the operations that are due by account, & runs their status checks on one worker pool
+  kept for the tracker's lifetime. Checks are handed out round-robin across accounts, at most `account_workers` at
+  once per account, so one busy account cannot starve the others. At most `max_workers` accounts are polled at
+  once, all through the controller's shared HTTP client.
+- `track()` returns a `concurrent.futures.Future` resolved with an `OperationResult` when the operation finishes
+  (or times out); `track_async()` returns an awaitable for the same result.
+
+Usage:
+
+``` py linenums=1
+with CloudflareController(api_token=token, account_id=account_id) as cf_controller:
+    with OperationTracker(cf_controller) as tracker:
+        futures = [
+            tracker.track(account_id, cf_controller.replace_list_items(list_id, items))
+            for list_id, items in lists.items()
+        ]
+
+        for result in tracker.as_completed(futures):
+            print(result.operation_id, result.status)
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait as wait_futures
+from dataclasses import dataclass
+import random
+import threading
+import time
+import typing as t
+
+from cfapi import concurrency
+
+from loguru import logger as log
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Statuses after which an operation is no longer polled
+OPERATION_DONE_STATUSES: tuple[str, ...] = ("completed", "failed")
+## Seconds before an operation's first poll, & the interval it returns to whenever its status changes
+DEFAULT_POLL_INTERVAL: float = 0.5
+## Longest interval between two polls of one operation
+DEFAULT_MAX_POLL_INTERVAL: float = 30.0
+## Factor the interval grows by after each poll that sees no progress
+DEFAULT_POLL_BACKOFF: float = 1.5
+## Consecutive failed status checks before an operation's future is failed
+DEFAULT_MAX_POLL_ERRORS: int = 5
+## Seconds `close()` waits for pending operations before cancelling them
+DEFAULT_CLOSE_TIMEOUT: float = 300.0
+
+
+@dataclass
+class OperationResult:
+    """The final state of a tracked operation."""
+
+    account_id: str
+    operation_id: str
+    status: str
+    polls: int = 0
+    elapsed: float = 0.0
+    error: str | None = None
+    result: dict | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed"
+
+
+@dataclass
+class _TrackedOperation:
+    """An operation the tracker is still polling."""
+
+    account_id: str
+    operation_id: str
+    future: Future
+    started: float
+    interval: float
+    next_poll: float
+    status: str = "pending"
+    polls: int = 0
+    errors: int = 0
+
+    def finish(self, status: str, error: str | None = None, result: dict | None = None) -> OperationResult:
+        operation_result: OperationResult = OperationResult(
+            account_id=self.account_id,
+            operation_id=self.operation_id,
+            status=status,
+            polls=self.polls,
+            elapsed=time.monotonic() - self.started,
+            error=error,
+            result=result,
+        )
+
+        if not self.future.done():
+            self.future.set_result(operation_result)
+
+        return operation_result
+
+
+@dataclass
+class TrackerStats:
+    """Counters for an `OperationTracker`."""
+
+    tracked: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    polls: int = 0
+    poll_errors: int = 0
+    rounds: int = 0
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "tracked": self.tracked,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "rounds": self.rounds,
+        }
+
+
+class OperationTracker:
+    """Poll many pending bulk operations together, resolving a future for each one as it finishes.
+
+    Params:
+        cf_controller (CloudflareController): Controller the status checks are sent through.
+        initial_interval (float): (default: 0.5) Seconds before the first poll, & after each status change.
+        max_interval (float): (default: 30.0) Longest interval between two polls of one operation.
+        backoff (float): (default: 1.5) Factor the interval grows by after a poll that sees no progress.
+        jitter (float): (default: 0.1) Random +/- fraction applied to each interval, to spread polls out.
+        timeout (float | None): Seconds after which an unfinished operation resolves with status `"timeout"`.
+        max_workers (int): (default: 8) Maximum accounts polled at once.
+        account_workers (int): (default: 4) Maximum status checks in flight at once for one account.
+        max_poll_errors (int): (default: 5) Consecutive failed status checks before an operation's future fails.
+
+    """
+
+    def __init__(
+        self,
+        cf_controller: "CloudflareController",
+        initial_interval: float = DEFAULT_POLL_INTERVAL,
+        max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        backoff: float = DEFAULT_POLL_BACKOFF,
+        jitter: float = 0.1,
+        timeout: float | None = None,
+        max_workers: int = 8,
+        account_workers: int = 4,
+        max_poll_errors: int = DEFAULT_MAX_POLL_ERRORS,
+    ) -> None:
+        if initial_interval <= 0 or max_interval < initial_interval:
+            raise ValueError(
+                f"Intervals must satisfy 0 < initial_interval <= max_interval. Got: {initial_interval}, {max_interval}"
+            )
+        if backoff < 1:
+            raise ValueError(f"backoff must be >= 1. Got: {backoff}")
+
+        self.cf_controller = cf_controller
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.account_workers = account_workers
+        self.max_poll_errors = max_poll_errors
+
+        self.stats: TrackerStats = TrackerStats()
+
+        self._pending: dict[tuple[str, str], _TrackedOperation] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed: bool = False
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> t.Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback) -> t.Literal[False] | None:
+        ## Leaving the block normally waits for every tracked operation; an error stops polling right away
+        self.close(wait=exc_type is None)
+
+        return False
+
+    def __repr__(self) -> str:
+        return f"OperationTracker(pending={self.pending}, initial_interval={self.initial_interval}, max_interval={self.max_interval}, backoff={self.backoff})"
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def track(self, account_id: str, operation_id: str) -> Future:
+        """Start polling an operation.
+
+        Params:
+            account_id (str): The account the operation runs in.
+            operation_id (str): The operation ID returned by the bulk call.
+
+        Returns:
+            (Future[OperationResult]): Resolved with the operation's final state. Tracking an operation that is
+                already tracked returns its existing future.
+
+        """
+        if self._closed:
+            raise RuntimeError("OperationTracker is closed")
+
+        key: tuple[str, str] = (account_id, operation_id)
+
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key].future
+
+            now: float = time.monotonic()
+            operation: _TrackedOperation = _TrackedOperation(
+                account_id=account_id,
+                operation_id=operation_id,
+                future=Future(),
+                started=now,
+                interval=self.initial_interval,
+                next_poll=now + self.initial_interval,
+            )
+            self._pending[key] = operation
+            self.stats.tracked += 1
+
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers * self.account_workers, thread_name_prefix="cfapi-operation-poll"
+                )
+                self._thread = threading.Thread(target=self._run, name="cfapi-operation-tracker", daemon=True)
+                self._thread.start()
+
+        log.debug(f"Tracking operation '{operation_id}' in account '{account_id}'")
+        self._wakeup.set()
+
+        return operation.future
+
+    def track_async(self, account_id: str, operation_id: str) -> asyncio.Future:
+        """Start polling an operation & return an awaitable for its `OperationResult`. Call from a running event loop."""
+        return asyncio.wrap_future(self.track(account_id, operation_id))
+
+    def as_completed(
+        self, futures: t.Iterable[Future] | None = None, timeout: float | None = None
+    ) -> t.Generator[OperationResult, None, None]:
+        """Yield `OperationResult`s as operations finish. Defaults to every operation tracked so far."""
+        if futures is None:
+            with self._lock:
+                futures = [operation.future for operation in self._pending.values()]
+
+        for future in as_completed(list(futures), timeout=timeout):
+            yield future.result()
+
+    def wait(self, futures: t.Iterable[Future] | None = None, timeout: float | None = None) -> list[OperationResult]:
+        """Block until the operations finish & return their results, in the order given. Defaults to every pending operation."""
+        if futures is None:
+            with self._lock:
+                futures = [operation.future for operation in self._pending.values()]
+
+        futures = list(futures)
+        wait_futures(futures, timeout=timeout)
+
+        return [future.result() for future in futures if future.done()]
+
+    def close(self, wait: bool = True, timeout: float | None = DEFAULT_CLOSE_TIMEOUT) -> None:
+        """Stop the tracker & cancel the futures of operations that are still pending.
+
+        Params:
+            wait (bool): (default: True) First let pending operations finish, for at most `timeout` seconds.
+            timeout (float | None): (default: 300.0) Seconds to wait with `wait=True`. `None` waits until every
+                operation finishes.
+
+        """
+        if wait:
+            self.wait(timeout=timeout)
+
+        self._closed = True
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+        with self._lock:
+            if self._pending:
+                log.warning(f"Cancelling [{len(self._pending)}] operation(s) still pending when the tracker closed")
+
+            for operation in self._pending.values():
+                operation.future.cancel()
+            self._pending.clear()
+
+        log.debug(f"Operation tracker closed: {self.stats.summary()}")
+
+    def _next_interval(self, operation: _TrackedOperation, progressed: bool) -> float:
+        interval: float = (
+            self.initial_interval if progressed else min(operation.interval * self.backoff, self.max_interval)
+        )
+        operation.interval = interval
+
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _poll(self, operation: _TrackedOperation) -> None:
+        """Check one operation's status, then either resolve its future or schedule its next poll."""
+        try:
+            result: dict = self.cf_controller.get_bulk_operation(
+                operation.operation_id, account_id=operation.account_id
+            )
+        except Exception as exc:
+            operation.errors += 1
+            self._count("poll_errors")
+
+            if operation.errors >= self.max_poll_errors or not concurrency.is_retryable(exc):
+                msg = f"({type(exc)}) Error polling operation '{operation.operation_id}'. Details: {exc}"
+                log.error(msg)
+
+                self._remove(operation)
+                ## The future may have been cancelled meanwhile, by its caller or `close()`
+                if not operation.future.done():
+                    operation.future.set_exception(exc)
+            else:
+                operation.next_poll = time.monotonic() + self._next_interval(operation, progressed=False)
+
+            return
+
+        operation.polls += 1
+        operation.errors = 0
+        self._count("polls")
+
+        status: str = result.get("status") or "pending"
+        progressed: bool = status != operation.status
+        operation.status = status
+
+        if status in OPERATION_DONE_STATUSES:
+            self._remove(operation)
+            operation.finish(status, error=result.get("error") or None, result=result)
+
+            if status == "completed":
+                self._count("completed")
+            else:
+                self._count("failed")
+                log.warning(f"Operation '{operation.operation_id}' failed: {result.get('error')}")
+
+            return
+
+        if self.timeout is not None and time.monotonic() - operation.started > self.timeout:
+            self._remove(operation)
+            operation.finish("timeout", error=f"Still '{status}' after {self.timeout}s", result=result)
+            self._count("timed_out")
+
+            return
+
+        operation.next_poll = time.monotonic() + self._next_interval(operation, progressed=progressed)
+
+    def _poll_round(self, by_account: dict[str, list[_TrackedOperation]]) -> None:
+        """Poll the operations that are due on the tracker's pool, within the per-account & account limits."""
+        queues: dict[str, deque[_TrackedOperation]] = {
+            account_id: deque(operations) for account_id, operations in by_account.items()
+        }
+        ## Future -> account ID, & account ID -> checks in flight
+        in_flight: dict[Future, str] = {}
+        account_checks: dict[str, int] = {}
+
+        while queues or in_flight:
+            ## Hand out one check per account per pass, so a busy account is interleaved with the others
+            handed_out: bool = True
+            while queues and handed_out:
+                handed_out = False
+
+                for account_id in list(queues):
+                    checks: int = account_checks.get(account_id, 0)
+                    if checks >= self.account_workers or (not checks and len(account_checks) >= self.max_workers):
+                        continue
+
+                    operation: _TrackedOperation = queues[account_id].popleft()
+                    if not queues[account_id]:
+                        del queues[account_id]
+
+                    in_flight[self._executor.submit(self._poll, operation)] = account_id
+                    account_checks[account_id] = checks + 1
+                    handed_out = True
+
+            done, _ = wait_futures(list(in_flight), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                account_id = in_flight.pop(future)
+                account_checks[account_id] -= 1
+                if not account_checks[account_id]:
+                    del account_checks[account_id]
+
+                if future.exception() is not None:
+                    log.error(f"({type(future.exception())}) Error in operation poll. Details: {future.exception()}")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def _remove(self, operation: _TrackedOperation) -> None:
+        with self._lock:
+            self._pending.pop((operation.account_id, operation.operation_id), None)
+
+    def _run(self) -> None:
+        """Background loop: poll the operations that are due, grouped by account, then sleep until the next is due."""
+        while not self._closed:
+            ## Cleared before scanning, so an operation tracked during the scan still wakes the next sleep
+            self._wakeup.clear()
+            now: float = time.monotonic()
+            by_account: dict[str, list[_TrackedOperation]] = {}
+
+            with self._lock:
+                for operation in self._pending.values():
+                    if operation.next_poll <= now:
+                        by_account.setdefault(operation.account_id, []).append(operation)
+
+                next_poll: float | None = min(
+                    (operation.next_poll for operation in self._pending.values() if operation.next_poll > now),
+                    default=None,
+                )
+
+            if by_account:
+                self._count("rounds")
+
+                with self.cf_controller._open_client():
+                    self._poll_round(by_account)
+
+                continue
+
+            ## Sleep until the next poll is due, or a new operation is tracked
+            self._wakeup.wait(timeout=None if next_poll is None else max(next_poll - now, 0.0))
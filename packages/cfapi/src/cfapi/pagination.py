@@ -0,0 +1,221 @@
+"""One paginator for every paged Cloudflare listing.
+
+Cloudflare listings page in one of two ways, both described by the response's `result_info`:
+
+- page paging: `page` & `per_page` params, with `total_pages` (or at least `page`) in `result_info`.
+- cursor paging: a `cursor` param, with the next cursor in `result_info.cursor` or `result_info.cursors.after`.
+
+`Paginator` requests the first page, detects the style from its `result_info`, then prefetches the rest while
+the caller consumes the current page. When the page count is known, the remaining pages are fetched in
+parallel (at most `max_workers` at once) & yielded in order. When it is not (cursor paging, or page paging
+without `total_pages`), the request for the next page is pipelined: it is sent as soon as the current page
+arrives, & runs while the current page is being consumed.
+
+Usage:
+
+``` py linenums=1
+for zone in cf_controller.paginate("/zones", per_page=50):
+    ...
+
+async for key in cf_controller.paginate(f"/accounts/{account_id}/storage/kv/namespaces/{ns}/keys", per_page=1000, per_page_param="limit"):
+    ...
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import typing as t
+
+from cfapi import concurrency
+
+from loguru import logger as log
+
+## Paging styles a listing can use
+PAGING_STYLES: tuple[str, ...] = ("page", "cursor")
+
+## Sentinel marking an exhausted iterator when stepping it from a worker thread
+_DONE = object()
+
+
+def detect_paging_style(result_info: dict | None) -> str | None:
+    """Return `"cursor"`, `"page"`, or `None` (a single, unpaged result) for a response's `result_info`."""
+    if not result_info:
+        return None
+
+    if "cursor" in result_info or "cursors" in result_info:
+        return "cursor"
+
+    if "total_pages" in result_info or "page" in result_info:
+        return "page"
+
+    return None
+
+
+def next_cursor(result_info: dict | None) -> str | None:
+    """Return the cursor for the next page, or `None` on the last page."""
+    if not result_info:
+        return None
+
+    cursor: str | None = result_info.get("cursor") or (result_info.get("cursors") or {}).get("after")
+
+    return cursor or None
+
+
+class Paginator:
+    """Iterate every page (or item) of a listing, prefetching pages ahead of the consumer.
+
+    Params:
+        fetch (Callable[[dict], dict]): Sends one request with the given params & returns the decoded response
+            envelope, i.e. `lambda params: cf_controller.api_request("GET", "/zones", params=params)`.
+        params (dict | None): Params sent with every request, i.e. filters.
+        per_page (int | None): Page size. Omitted from requests when `None`.
+        per_page_param (str): (default: "per_page") Name of the page size param, i.e. `"limit"` for KV keys.
+        style (str | None): Force a paging style instead of detecting it from the first response.
+        max_workers (int): (default: 4) Maximum pages requested at once when the page count is known.
+
+    """
+
+    def __init__(
+        self,
+        fetch: t.Callable[[dict], dict],
+        params: dict | None = None,
+        per_page: int | None = None,
+        per_page_param: str = "per_page",
+        style: str | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        if style is not None and style not in PAGING_STYLES:
+            raise ValueError(f"Unknown paging style: '{style}'. Must be one of {PAGING_STYLES}")
+
+        self.fetch = fetch
+        self.params = params or {}
+        self.per_page = per_page
+        self.per_page_param = per_page_param
+        self.style = style
+        self.max_workers = max_workers
+
+    def __repr__(self) -> str:
+        return f"Paginator(style={self.style}, per_page={self.per_page}, max_workers={self.max_workers})"
+
+    def _params(self, **extra: t.Any) -> dict:
+        params: dict = {**self.params, **extra}
+        if self.per_page is not None:
+            params[self.per_page_param] = self.per_page
+
+        return params
+
+    def _fetch_page(self, page: int) -> dict:
+        return self.fetch(self._params(page=page))
+
+    def _fetch_cursor(self, cursor: str) -> dict:
+        return self.fetch(self._params(cursor=cursor))
+
+    def pages(self) -> t.Generator[list, None, None]:
+        """Yield the `result` list of every page, in order."""
+        first: dict = self.fetch(self._params(page=1) if self.style != "cursor" else self._params())
+        result_info: dict | None = first.get("result_info")
+        detected: str | None = detect_paging_style(result_info)
+        ## A response without paging info is the whole result, even when a paging style was forced
+        style: str | None = (self.style or detected) if detected else None
+        results: list = first.get("result") or []
+
+        yield results
+
+        if style == "cursor":
+            yield from self._cursor_pages(next_cursor(result_info), results)
+        elif style == "page":
+            total_pages: int | None = (result_info or {}).get("total_pages")
+
+            if total_pages is not None:
+                yield from self._parallel_pages(total_pages)
+            else:
+                yield from self._pipelined_pages(results)
+
+    def _parallel_pages(self, total_pages: int) -> t.Generator[list, None, None]:
+        """Fetch pages 2..`total_pages` in parallel, yielding them in order."""
+        if total_pages <= 1:
+            return
+
+        log.debug(f"Prefetching [{total_pages - 1}] page(s), [{self.max_workers}] at a time")
+
+        for _page, res_dict in concurrency.bounded_map(
+            self._fetch_page, range(2, total_pages + 1), max_workers=self.max_workers
+        ):
+            yield res_dict.get("result") or []
+
+    def _pipelined_pages(self, first_results: list) -> t.Generator[list, None, None]:
+        """Fetch numbered pages one ahead of the consumer until a short or empty page."""
+        if not first_results or (self.per_page and len(first_results) < self.per_page):
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            page: int = 2
+            future: Future = pool.submit(self._fetch_page, page)
+
+            while True:
+                results: list = future.result().get("result") or []
+                if not results:
+                    break
+
+                last: bool = bool(self.per_page and len(results) < self.per_page)
+                if not last:
+                    page += 1
+                    future = pool.submit(self._fetch_page, page)
+
+                yield results
+
+                if last:
+                    break
+
+    def _cursor_pages(self, cursor: str | None, first_results: list) -> t.Generator[list, None, None]:
+        """Follow cursors, requesting the next page as soon as the current one arrives."""
+        if not cursor or not first_results:
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future: Future = pool.submit(self._fetch_cursor, cursor)
+
+            while future is not None:
+                res_dict: dict = future.result()
+                results: list = res_dict.get("result") or []
+                cursor = next_cursor(res_dict.get("result_info"))
+
+                future = pool.submit(self._fetch_cursor, cursor) if cursor and results else None
+
+                if results:
+                    yield results
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        """Yield every item of every page."""
+        for page in self.pages():
+            yield from page
+
+    async def apages(self) -> t.AsyncGenerator[list, None]:
+        """Async version of `pages()`. Requests run in worker threads, so the event loop is never blocked."""
+        pages: t.Generator[list, None, None] = self.pages()
+        step: asyncio.Future | None = None
+
+        try:
+            while True:
+                ## Shielded, so cancelling the consumer does not abandon the step while its thread is still running
+                step = asyncio.ensure_future(asyncio.to_thread(next, pages, _DONE))
+                page = await asyncio.shield(step)
+                if page is _DONE:
+                    break
+
+                yield page
+        finally:
+            if step is not None and not step.done():
+                ## Closing the generator while a worker thread is inside `next(pages)` raises
+                #  `ValueError: generator already executing`
+                await asyncio.wait({step})
+
+            pages.close()
+
+    async def __aiter__(self) -> t.AsyncIterator[t.Any]:
+        """Async version of `__iter__()`."""
+        async for page in self.apages():
+            for item in page:
+                yield item
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from .engine import (
+    DEFAULT_PURGE_BATCH_SIZE,
+    DEFAULT_PURGE_RATE,
+    PURGE_KINDS,
+    PurgeBatch,
+    PurgeBatchResult,
+    PurgePlan,
+    PurgeReport,
+    normalize_purge_item,
+    plan_purge,
+    send_purge_batch,
+    send_purge_batches,
+)
+from .zone_index import ZoneNameIndex
@@ -0,0 +1,324 @@
+"""Plan & send bulk cache purges.
+
+Purge requests are planned in two steps. Items (URLs, cache tags, prefixes or hostnames) are normalized,
+deduplicated, & grouped by the zone that serves them, using a `ZoneNameIndex`. Each zone's items are then packed
+into batches of at most `batch_size` items, the most Cloudflare accepts in one purge call. Batches are sent
+concurrently, paced by a shared `RateLimiter` to stay within the purge rate limit. A `429` response pauses
+every worker for its `Retry-After` delay before the batch is retried. Every batch gets a result with its status
+& timing.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import time
+import typing as t
+from urllib.parse import urlsplit, urlunsplit
+
+from cfapi import concurrency
+
+from .zone_index import ZoneNameIndex
+
+import httpx
+from loguru import logger as log
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Kinds of purge item, named after their field in the purge_cache request body
+PURGE_KINDS: tuple[str, ...] = ("files", "tags", "prefixes", "hosts")
+## Items per purge call allowed on non-Enterprise plans. Enterprise zones allow 100.
+DEFAULT_PURGE_BATCH_SIZE: int = 30
+## Purge calls per second. Cloudflare's purge limits depend on the plan; raise this for Enterprise zones.
+DEFAULT_PURGE_RATE: float = 5.0
+
+_DEFAULT_PORTS: dict[str, int] = {"http": 80, "https": 443}
+
+
+@dataclass(frozen=True)
+class PurgeBatch:
+    """Up to `batch_size` items of one kind, purged from one zone in a single call."""
+
+    zone_id: str
+    zone_name: str | None
+    kind: str
+    items: tuple[str, ...]
+
+    def payload(self) -> dict[str, list[str]]:
+        """Return the purge_cache request body for the batch."""
+        return {self.kind: list(self.items)}
+
+
+@dataclass
+class PurgeBatchResult:
+    """The outcome of sending one purge batch."""
+
+    batch: PurgeBatch
+    ok: bool
+    status_code: int | None = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    waited: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class PurgePlan:
+    """Batches planned from a purge request, plus the items that could not be planned."""
+
+    batches: list[PurgeBatch] = field(default_factory=list)
+    unresolved: list[str] = field(default_factory=list)
+    invalid: list[str] = field(default_factory=list)
+    duplicates: int = 0
+
+    @property
+    def items(self) -> int:
+        return sum(len(batch.items) for batch in self.batches)
+
+
+@dataclass
+class PurgeReport:
+    """Per-batch results & totals for a bulk purge."""
+
+    plan: PurgePlan
+    results: list[PurgeBatchResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def purged(self) -> int:
+        return sum(len(r.batch.items) for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> list[PurgeBatchResult]:
+        return [r for r in self.results if not r.ok]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "batches": len(self.plan.batches),
+            "sent": len(self.results),
+            "items": self.plan.items,
+            "purged": self.purged,
+            "failed_batches": len(self.failed),
+            "duplicates": self.plan.duplicates,
+            "unresolved": len(self.plan.unresolved),
+            "invalid": len(self.plan.invalid),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def normalize_purge_item(item: str, kind: str) -> tuple[str, str | None]:
+    """Normalize a purge item for deduplication, returning `(item, host)`.
+
+    Description:
+        URLs get a lowercase scheme & host, no default port & no fragment; the path & query are kept as-is.
+        Prefixes & hostnames get a lowercase host & no scheme. Cache tags are case-insensitive, so are
+        lowercased, & have no host.
+
+    Params:
+        item (str): The URL, tag, prefix or hostname.
+        kind (str): One of `PURGE_KINDS`.
+
+    Returns:
+        (tuple[str, str | None]): The normalized item & the host used to find its zone.
+
+    Raises:
+        ValueError: When a URL has no http(s) scheme or host, or an item is empty.
+
+    """
+    item = item.strip()
+    if not item:
+        raise ValueError("Empty purge item")
+
+    match kind:
+        case "files":
+            parts = urlsplit(item)
+            if parts.scheme.lower() not in _DEFAULT_PORTS or not parts.hostname:
+                raise ValueError(f"Not an http(s) URL: '{item}'")
+
+            host: str = parts.hostname.lower()
+            netloc: str = host
+            if parts.port and parts.port != _DEFAULT_PORTS[parts.scheme.lower()]:
+                netloc = f"{host}:{parts.port}"
+
+            return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", parts.query, "")), host
+        case "prefixes" | "hosts":
+            if "://" in item:
+                item = item.split("://", 1)[1]
+
+            host, sep, path = item.partition("/")
+            host = host.lower()
+
+            return f"{host}{sep}{path}", host.split(":", 1)[0]
+        case "tags":
+            return item.lower(), None
+        case _:
+            raise ValueError(f"Unknown purge kind: '{kind}'. Must be one of {PURGE_KINDS}")
+
+
+def plan_purge(
+    items: t.Iterable[str],
+    kind: str = "files",
+    zone_index: ZoneNameIndex | None = None,
+    zone_id: str | None = None,
+    batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+) -> PurgePlan:
+    """Normalize, deduplicate & group purge items by zone, packing them into batches.
+
+    Params:
+        items (Iterable[str]): URLs, tags, prefixes or hostnames.
+        kind (str): (default: "files") One of `PURGE_KINDS`.
+        zone_index (ZoneNameIndex | None): Index used to find each item's zone. Required unless `zone_id` is set.
+        zone_id (str | None): Purge every item from this zone, skipping the index. Required for `tags`.
+        batch_size (int): (default: 30) Maximum items per batch.
+
+    Returns:
+        (PurgePlan): The batches, plus unresolved, invalid & duplicate counts.
+
+    """
+    if kind not in PURGE_KINDS:
+        raise ValueError(f"Unknown purge kind: '{kind}'. Must be one of {PURGE_KINDS}")
+    if zone_id is None and (kind == "tags" or zone_index is None):
+        raise ValueError(f"A zone_id is required to purge {kind} without a zone index")
+
+    plan: PurgePlan = PurgePlan()
+    ## zone ID -> (zone name, ordered set of items)
+    by_zone: dict[str, tuple[str | None, dict[str, None]]] = {}
+
+    for item in items:
+        try:
+            normalized, host = normalize_purge_item(item, kind)
+        except ValueError as exc:
+            log.warning(f"Skipping purge item. Details: {exc}")
+            plan.invalid.append(item)
+            continue
+
+        if zone_id is not None:
+            zone: tuple[str, str | None] | None = (zone_id, None)
+        else:
+            zone = zone_index.resolve(host)
+
+        if zone is None:
+            plan.unresolved.append(item)
+            continue
+
+        _zone_name, zone_items = by_zone.setdefault(zone[0], (zone[1], {}))
+        if normalized in zone_items:
+            plan.duplicates += 1
+            continue
+
+        zone_items[normalized] = None
+
+    for _zone_id, (zone_name, zone_items) in by_zone.items():
+        for chunk in concurrency.chunked(zone_items, batch_size):
+            plan.batches.append(
+                PurgeBatch(zone_id=_zone_id, zone_name=zone_name, kind=kind, items=tuple(chunk))
+            )
+
+    log.debug(
+        f"Planned [{len(plan.batches)}] purge batch(es) for [{plan.items}] item(s) across [{len(by_zone)}] zone(s), [{plan.duplicates}] duplicate(s), [{len(plan.unresolved)}] unresolved"
+    )
+
+    return plan
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    """Return the delay a `429` response asks for, or an exponential backoff if it does not say."""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return min(2.0**attempt, 30.0)
+
+
+def send_purge_batch(
+    cf_controller: CloudflareController,
+    batch: PurgeBatch,
+    limiter: concurrency.RateLimiter | None = None,
+    max_retries: int = 3,
+) -> PurgeBatchResult:
+    """Send one purge batch, retrying rate-limited (`429`) responses up to `max_retries` times.
+
+    Returns:
+        (PurgeBatchResult): The batch's status & timing. Errors are reported, not raised.
+
+    """
+    result: PurgeBatchResult = PurgeBatchResult(batch=batch, ok=False)
+    start: float = time.perf_counter()
+
+    while True:
+        result.attempts += 1
+        if limiter:
+            result.waited += limiter.acquire()
+
+        try:
+            cf_controller.purge_cache(zone_id=batch.zone_id, **batch.payload())
+            result.ok, result.status_code, result.error = True, 200, None
+            break
+        except httpx.HTTPStatusError as exc:
+            result.status_code, result.error = exc.response.status_code, str(exc)
+
+            if exc.response.status_code == 429 and result.attempts <= max_retries:
+                delay: float = _retry_after(exc.response, result.attempts)
+                log.warning(
+                    f"Purge rate limited for zone '{batch.zone_id}', retrying in {delay:.1f}s (attempt {result.attempts}/{max_retries + 1})"
+                )
+
+                if limiter:
+                    ## Hold back every worker, not just this one, until the limit resets
+                    limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+                    result.waited += delay
+
+                continue
+
+            break
+        except Exception as exc:
+            result.error = f"({type(exc)}) {exc}"
+            break
+
+    result.elapsed = time.perf_counter() - start
+
+    return result
+
+
+def send_purge_batches(
+    cf_controller: CloudflareController,
+    plan: PurgePlan,
+    max_workers: int = 4,
+    requests_per_second: float = DEFAULT_PURGE_RATE,
+    max_retries: int = 3,
+) -> PurgeReport:
+    """Send a plan's batches concurrently, paced to `requests_per_second` across all workers.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        plan (PurgePlan): Batches from `plan_purge()`.
+        max_workers (int): (default: 4) Maximum number of purge calls in flight at once.
+        requests_per_second (float): (default: 5.0) Purge calls allowed per second.
+        max_retries (int): (default: 3) Retries for a rate-limited batch.
+
+    Returns:
+        (PurgeReport): Per-batch results & totals.
+
+    """
+    limiter: concurrency.RateLimiter = concurrency.RateLimiter(rate=requests_per_second)
+    report: PurgeReport = PurgeReport(plan=plan)
+    start: float = time.perf_counter()
+
+    with cf_controller._open_client():
+        for _batch, result in concurrency.bounded_map(
+            lambda batch: send_purge_batch(cf_controller, batch, limiter=limiter, max_retries=max_retries),
+            plan.batches,
+            max_workers=max_workers,
+        ):
+            if not result.ok:
+                log.error(
+                    f"Purge batch of [{len(result.batch.items)}] {result.batch.kind} for zone '{result.batch.zone_id}' failed after [{result.attempts}] attempt(s). Details: {result.error}"
+                )
+
+            report.results.append(result)
+
+    report.elapsed = time.perf_counter() - start
+    log.info(f"Purge finished: {report.summary()}")
+
+    return report
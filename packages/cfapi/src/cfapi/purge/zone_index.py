@@ -0,0 +1,50 @@
+"""Resolve hostnames to the Cloudflare zone that serves them."""
+
+from __future__ import annotations
+
+import typing as t
+
+
+class ZoneNameIndex:
+    """Map hostnames to zones by longest matching zone-name suffix.
+
+    Description:
+        `www.shop.example.com` resolves to the zone `shop.example.com` if one exists, otherwise to `example.com`.
+        A lookup walks the host's labels from the left, so it costs one dict lookup per label.
+
+    Params:
+        zones (Iterable): Zone dicts or zone records/schemas with `id` & `name`.
+
+    """
+
+    def __init__(self, zones: t.Iterable[t.Any] = ()) -> None:
+        self._zones: dict[str, tuple[str, str]] = {}
+
+        for zone in zones:
+            self.add(zone)
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def __repr__(self) -> str:
+        return f"ZoneNameIndex(zones={len(self)})"
+
+    def add(self, zone: t.Any) -> None:
+        """Add a zone dict, or a zone record/schema with `id` & `name`, to the index."""
+        if isinstance(zone, dict):
+            zone_id, zone_name = zone["id"], zone["name"]
+        else:
+            zone_id, zone_name = zone.id, zone.name
+
+        self._zones[zone_name.lower().rstrip(".")] = (zone_id, zone_name)
+
+    def resolve(self, host: str) -> tuple[str, str] | None:
+        """Return `(zone_id, zone_name)` for the zone serving `host`, or `None` if no zone matches."""
+        labels: list[str] = host.lower().rstrip(".").split(".")
+
+        for i in range(len(labels)):
+            match: tuple[str, str] | None = self._zones.get(".".join(labels[i:]))
+            if match:
+                return match
+
+        return None
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from .engine import (
+    FILTER_FIELDS,
+    FieldChange,
+    ReconcileCallResult,
+    ReconcilePlan,
+    ReconcileReport,
+    ZonePlan,
+    apply_reconcile,
+    desired_zone_states,
+    diff_filters,
+    diff_settings,
+    load_desired_state,
+    plan_reconcile,
+    plan_zone,
+    reconcile,
+)
@@ -0,0 +1,447 @@
+"""Reconcile zone settings & firewall filters with a desired state, sending only what changed.
+
+A reconcile runs in two steps:
+
+- `plan_reconcile()` reads each zone's current state in bulk (every setting from one `/zones/{id}/settings`
+  call, every filter from `/zones/{id}/filters`) & diffs it field by field against the desired state. Nothing is
+  written.
+- `apply_reconcile()` sends the plan's writes: one `PATCH /zones/{id}/settings` with only the changed settings, one
+  bulk `PUT /zones/{id}/filters` with only the changed filters, & one `POST /zones/{id}/filters` for new filters.
+  Zones without changes cost no write calls.
+
+Zones are planned & applied concurrently, & a zone's write calls run in parallel with each other.
+
+Desired state file (YAML or JSON):
+
+``` yaml linenums=1
+defaults:                      # merged under every zone listed in `zones`
+  settings:
+    always_use_https: "on"
+    min_tls_version: "1.2"
+
+zones:
+  example.com:                 # zone name or zone ID
+    settings:
+      ssl: strict
+      minify: {css: "on"}      # object settings are compared & patched key by key
+    filters:
+      - description: block admin   # filters are matched by `id`, or else by `description`
+        expression: http.request.uri.path contains "/wp-admin"
+        paused: false
+```
+
+Filters in the zone that are not in the desired state are left alone.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+import typing as t
+
+from cfapi import concurrency
+
+from loguru import logger as log
+import yaml
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Filter fields compared & written by a reconcile
+FILTER_FIELDS: tuple[str, ...] = ("expression", "paused", "description")
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """One field whose current value differs from its desired value."""
+
+    zone_id: str
+    kind: str
+    key: str
+    field: str
+    current: t.Any
+    desired: t.Any
+
+
+@dataclass
+class ZonePlan:
+    """The writes needed to bring one zone to its desired state."""
+
+    zone_id: str
+    zone_name: str | None = None
+    changes: list[FieldChange] = field(default_factory=list)
+    ## Body items for `PATCH /zones/{id}/settings`
+    settings: list[dict] = field(default_factory=list)
+    ## Body items for `PUT /zones/{id}/filters` & `POST /zones/{id}/filters`
+    filter_updates: list[dict] = field(default_factory=list)
+    filter_creates: list[dict] = field(default_factory=list)
+    ## Desired settings the zone does not have, or that are read-only
+    skipped: list[str] = field(default_factory=list)
+
+    @property
+    def calls(self) -> list[tuple[str, str, t.Any]]:
+        """`(method, path, body)` of every write call the zone needs."""
+        calls: list[tuple[str, str, t.Any]] = []
+
+        if self.settings:
+            calls.append(("PATCH", f"/zones/{self.zone_id}/settings", {"items": self.settings}))
+        if self.filter_updates:
+            calls.append(("PUT", f"/zones/{self.zone_id}/filters", self.filter_updates))
+        if self.filter_creates:
+            calls.append(("POST", f"/zones/{self.zone_id}/filters", self.filter_creates))
+
+        return calls
+
+
+@dataclass
+class ReconcilePlan:
+    """Per-zone plans, plus desired zones that could not be found or read."""
+
+    zones: list[ZonePlan] = field(default_factory=list)
+    unresolved: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> list[ZonePlan]:
+        return [zone for zone in self.zones if zone.calls]
+
+    @property
+    def changes(self) -> list[FieldChange]:
+        return [change for zone in self.zones for change in zone.changes]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "zones": len(self.zones),
+            "zones_changed": len(self.changed),
+            "field_changes": len(self.changes),
+            "calls": sum(len(zone.calls) for zone in self.zones),
+            "skipped": sum(len(zone.skipped) for zone in self.zones),
+            "unresolved": len(self.unresolved),
+            "failed": len(self.failed),
+        }
+
+
+@dataclass
+class ReconcileCallResult:
+    """The outcome of one write call."""
+
+    zone_id: str
+    method: str
+    path: str
+    items: int
+    ok: bool
+    elapsed: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class ReconcileReport:
+    """Per-call results & totals for an applied plan."""
+
+    plan: ReconcilePlan
+    results: list[ReconcileCallResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def failed(self) -> list[ReconcileCallResult]:
+        return [r for r in self.results if not r.ok]
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            **self.plan.summary(),
+            "sent": len(self.results),
+            "failed_calls": len(self.failed),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def load_desired_state(path: t.Union[str, Path]) -> dict:
+    """Load a desired state file. `.yaml`/`.yml` files are read as YAML, anything else as JSON."""
+    path = Path(str(path))
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.suffix.lower() in (".yaml", ".yml"):
+                desired: dict = yaml.safe_load(f) or {}
+            else:
+                desired = json.load(f)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error loading desired state from '{path}'. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    if not isinstance(desired.get("zones"), dict):
+        raise ValueError(f"Desired state in '{path}' has no 'zones' mapping")
+
+    return desired
+
+
+def desired_zone_states(desired: dict) -> dict[str, dict]:
+    """Return each listed zone's desired state (keyed by zone name or ID), with `defaults` merged underneath."""
+    defaults: dict = desired.get("defaults") or {}
+    zones: dict[str, dict] = {}
+
+    for zone_key, zone_state in (desired.get("zones") or {}).items():
+        zone_state = zone_state or {}
+        zones[zone_key] = {
+            "settings": {**(defaults.get("settings") or {}), **(zone_state.get("settings") or {})},
+            "filters": [*(defaults.get("filters") or []), *(zone_state.get("filters") or [])],
+        }
+
+    return zones
+
+
+def diff_settings(
+    zone_id: str, current: t.Iterable[dict], desired: t.Mapping[str, t.Any]
+) -> tuple[list[FieldChange], list[dict], list[str]]:
+    """Diff a zone's current settings (the `/settings` result) against desired setting values.
+
+    Description:
+        Object-valued settings (i.e. `minify`) are compared key by key. Only the desired keys count, & the patched
+        value is the current object with the desired keys applied.
+
+    Returns:
+        (tuple): Field changes, `PATCH` body items, & desired settings that were skipped (missing or read-only).
+
+    """
+    by_id: dict[str, dict] = {setting["id"]: setting for setting in current}
+    changes: list[FieldChange] = []
+    items: list[dict] = []
+    skipped: list[str] = []
+
+    for setting_id, value in desired.items():
+        setting: dict | None = by_id.get(setting_id)
+
+        if setting is None:
+            log.warning(f"Zone '{zone_id}' has no setting '{setting_id}', skipping it")
+            skipped.append(setting_id)
+            continue
+
+        current_value: t.Any = setting.get("value")
+
+        if isinstance(value, dict) and isinstance(current_value, dict):
+            setting_changes: list[FieldChange] = [
+                FieldChange(zone_id, "settings", setting_id, key, current_value.get(key), sub_value)
+                for key, sub_value in value.items()
+                if current_value.get(key) != sub_value
+            ]
+            new_value: t.Any = {**current_value, **value}
+        else:
+            setting_changes = (
+                [FieldChange(zone_id, "settings", setting_id, "value", current_value, value)]
+                if current_value != value
+                else []
+            )
+            new_value = value
+
+        if not setting_changes:
+            continue
+
+        if setting.get("editable") is False:
+            log.warning(f"Setting '{setting_id}' is read-only for zone '{zone_id}', skipping it")
+            skipped.append(setting_id)
+            continue
+
+        changes.extend(setting_changes)
+        items.append({"id": setting_id, "value": new_value})
+
+    return changes, items, skipped
+
+
+def diff_filters(
+    zone_id: str, current: t.Iterable[dict], desired: t.Iterable[dict]
+) -> tuple[list[FieldChange], list[dict], list[dict]]:
+    """Diff a zone's current filters against desired filters, matched by `id`, or else by `description`.
+
+    Returns:
+        (tuple): Field changes, bulk `PUT` items (full filters with changed fields), & filters to create.
+
+    """
+    current = list(current)
+    by_id: dict[str, dict] = {f["id"]: f for f in current}
+    by_description: dict[str, dict] = {f["description"]: f for f in current if f.get("description")}
+    changes: list[FieldChange] = []
+    updates: list[dict] = []
+    creates: list[dict] = []
+
+    for desired_filter in desired:
+        existing: dict | None = by_id.get(desired_filter.get("id")) or by_description.get(
+            desired_filter.get("description")
+        )
+
+        if existing is None:
+            if "expression" not in desired_filter:
+                raise ValueError(f"New filter for zone '{zone_id}' has no expression: {desired_filter}")
+
+            creates.append({name: desired_filter[name] for name in FILTER_FIELDS if name in desired_filter})
+            changes.append(
+                FieldChange(zone_id, "filters", desired_filter.get("description") or "", "*", None, desired_filter)
+            )
+            continue
+
+        filter_changes: list[FieldChange] = [
+            FieldChange(zone_id, "filters", existing["id"], name, existing.get(name), desired_filter[name])
+            for name in FILTER_FIELDS
+            if name in desired_filter and existing.get(name) != desired_filter[name]
+        ]
+
+        if filter_changes:
+            changes.extend(filter_changes)
+            updates.append(
+                {
+                    "id": existing["id"],
+                    **{name: existing.get(name) for name in FILTER_FIELDS},
+                    **{change.field: change.desired for change in filter_changes},
+                }
+            )
+
+    return changes, updates, creates
+
+
+def plan_zone(
+    cf_controller: CloudflareController, zone_id: str, zone_name: str | None, desired_zone: dict
+) -> ZonePlan:
+    """Read one zone's current state & plan its writes."""
+    plan: ZonePlan = ZonePlan(zone_id=zone_id, zone_name=zone_name)
+
+    if desired_zone.get("settings"):
+        current_settings: list[dict] = cf_controller.fetch("zone_settings", refresh=True, zone_id=zone_id)
+        changes, plan.settings, plan.skipped = diff_settings(zone_id, current_settings, desired_zone["settings"])
+        plan.changes.extend(changes)
+
+    if desired_zone.get("filters"):
+        current_filters: list[dict] = cf_controller.fetch("zone_waf_filters", refresh=True, zone_id=zone_id)
+        changes, plan.filter_updates, plan.filter_creates = diff_filters(
+            zone_id, current_filters, desired_zone["filters"]
+        )
+        plan.changes.extend(changes)
+
+    return plan
+
+
+def plan_reconcile(
+    cf_controller: CloudflareController,
+    desired: dict,
+    max_workers: int = 8,
+) -> ReconcilePlan:
+    """Plan the writes that bring every zone in a desired state to that state. Nothing is written.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        desired (dict): A desired state, i.e. from `load_desired_state()`.
+        max_workers (int): (default: 8) Maximum zones read at once.
+
+    Returns:
+        (ReconcilePlan): Per-zone field changes & write calls.
+
+    """
+    desired_zones: dict[str, dict] = desired_zone_states(desired)
+    result: ReconcilePlan = ReconcilePlan()
+
+    with cf_controller._open_client():
+        ## Zones may be listed by name or ID; resolve both from one listing
+        zones: list[dict] = cf_controller.fetch("zones")
+        by_key: dict[str, dict] = {**{z["name"]: z for z in zones}, **{z["id"]: z for z in zones}}
+
+        jobs: list[tuple[str, str | None, dict]] = []
+        for zone_key, desired_zone in desired_zones.items():
+            zone: dict | None = by_key.get(zone_key)
+
+            if zone is None:
+                log.warning(f"Zone '{zone_key}' from the desired state was not found, skipping it")
+                result.unresolved.append(zone_key)
+                continue
+
+            jobs.append((zone["id"], zone.get("name"), desired_zone))
+
+        for (zone_id, zone_name, _desired_zone), zone_plan in concurrency.bounded_map(
+            lambda job: plan_zone(cf_controller, *job),
+            jobs,
+            max_workers=max_workers,
+            return_exceptions=True,
+        ):
+            if isinstance(zone_plan, Exception):
+                log.error(f"({type(zone_plan)}) Error planning zone '{zone_name or zone_id}'. Details: {zone_plan}")
+                result.failed[zone_id] = f"({type(zone_plan)}) {zone_plan}"
+                continue
+
+            result.zones.append(zone_plan)
+
+    log.info(f"Reconcile plan: {result.summary()}")
+
+    return result
+
+
+def _send_call(cf_controller: CloudflareController, zone_id: str, call: tuple[str, str, t.Any]) -> ReconcileCallResult:
+    method, path, body = call
+    items: int = len(body["items"]) if isinstance(body, dict) else len(body)
+    result: ReconcileCallResult = ReconcileCallResult(zone_id=zone_id, method=method, path=path, items=items, ok=False)
+    start: float = time.perf_counter()
+
+    try:
+        cf_controller.api_request(method, path, json=body)
+        result.ok = True
+    except Exception as exc:
+        result.error = f"({type(exc)}) {exc}"
+        log.error(f"{method} {path} for zone '{zone_id}' failed. Details: {exc}")
+
+    result.elapsed = time.perf_counter() - start
+
+    return result
+
+
+def apply_reconcile(
+    cf_controller: CloudflareController,
+    plan: ReconcilePlan,
+    max_workers: int = 8,
+) -> ReconcileReport:
+    """Send a plan's write calls, for every zone at once, `max_workers` calls at a time.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        plan (ReconcilePlan): A plan from `plan_reconcile()`.
+        max_workers (int): (default: 8) Maximum write calls in flight at once, across all zones.
+
+    Returns:
+        (ReconcileReport): Per-call results & totals. Errors are reported, not raised.
+
+    """
+    report: ReconcileReport = ReconcileReport(plan=plan)
+    start: float = time.perf_counter()
+
+    ## A zone's calls touch different endpoints, so they run in parallel with each other as well as with other zones
+    calls: list[tuple[str, tuple[str, str, t.Any]]] = [
+        (zone.zone_id, call) for zone in plan.zones for call in zone.calls
+    ]
+
+    with cf_controller._open_client():
+        for _call, result in concurrency.bounded_map(
+            lambda job: _send_call(cf_controller, *job), calls, max_workers=max_workers, ordered=False
+        ):
+            report.results.append(result)
+
+    report.elapsed = time.perf_counter() - start
+    log.info(f"Reconcile applied: {report.summary()}")
+
+    return report
+
+
+def reconcile(
+    cf_controller: CloudflareController,
+    desired: t.Union[dict, str, Path],
+    apply: bool = False,
+    max_workers: int = 8,
+) -> ReconcileReport:
+    """Plan, & with `apply=True` send, the writes for a desired state (a dict, or a YAML/JSON file path)."""
+    if not isinstance(desired, dict):
+        desired = load_desired_state(desired)
+
+    plan: ReconcilePlan = plan_reconcile(cf_controller, desired, max_workers=max_workers)
+
+    if not apply:
+        return ReconcileReport(plan=plan)
+
+    return apply_reconcile(cf_controller, plan, max_workers=max_workers)
@@ -0,0 +1,283 @@
+"""Declarative catalog of Cloudflare API resources.
+
+Every endpoint the controller reads is declared once, as a `Resource`:
+
+- `path`: a path template below the API base URL, i.e. `"/zones/{zone_id}/filters"`.
+- `paging`: `"page"`, `"cursor"`, or `None` for a single, unpaged result.
+- `cache_ttl`: the oldest cached response (in seconds) the resource accepts. `0` never serves a cached response,
+  `None` defers to the controller's cache settings.
+- `concurrency`: a concurrency class (see `CONCURRENCY_CLASSES`), setting how many requests for the resource
+  run at once, both for page prefetching & for fetches fanned out across many path params (i.e. zones).
+- `schema`: an optional pydantic model the results are validated into when a fetch asks for parsed results.
+- `memo_ttl`: seconds the controller keeps a fetched result in memory (see `cfapi.memo`), for lookups that
+  rarely change, i.e. a token's accounts. `None` never memoizes.
+
+`CloudflareController.fetch()` & `CloudflareController.fetch_many()` execute any registered resource through the
+same path: one shared connection pool, the response cache, per-request retries & pagination.
+
+Usage:
+
+``` py linenums=1
+with CloudflareController(api_token=token) as cf_controller:
+    zones = cf_controller.fetch("zones")
+    filters = dict(cf_controller.fetch_many("zone_waf_filters", [{"zone_id": z["id"]} for z in zones]))
+
+register_resource(Resource(name="zone_page_rules", path="/zones/{zone_id}/pagerules", cache_ttl=300))
+```
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from string import Formatter
+import typing as t
+
+from cfapi.pagination import PAGING_STYLES
+from domain import cloudflare as cf_domain
+
+from pydantic import BaseModel
+
+## Concurrency class -> maximum requests in flight at once for a resource
+CONCURRENCY_CLASSES: dict[str, int] = {
+    ## Endpoints with strict rate limits, or that must be called one at a time
+    "serial": 1,
+    ## Large or slow responses, i.e. full rulesets
+    "heavy": 2,
+    "default": 4,
+    ## Small, cheap listings, i.e. accounts & zones
+    "light": 8,
+}
+
+
+@dataclass(frozen=True)
+class Resource:
+    """One Cloudflare API endpoint, & how to fetch it.
+
+    Params:
+        name (str): The name the resource is registered & fetched by.
+        path (str): Path template below the API base URL, with `{placeholders}` for path params.
+        paging (str | None): `"page"`, `"cursor"`, or `None` for an unpaged result.
+        per_page (int | None): Page size for paged resources. `None` uses the API's default.
+        per_page_param (str): (default: "per_page") Name of the page size param, i.e. `"limit"`.
+        cache_ttl (int | None): Oldest cached response accepted, in seconds. `0` always requests fresh data.
+        concurrency (str): (default: "default") One of `CONCURRENCY_CLASSES`.
+        schema (type[BaseModel] | None): A pydantic model results are validated into when parsed.
+        description (str): A short description of the resource.
+        memo_ttl (float | None): Seconds a fetched result is memoized in memory. `None` never memoizes.
+
+    """
+
+    name: str
+    path: str
+    paging: str | None = None
+    per_page: int | None = None
+    per_page_param: str = "per_page"
+    cache_ttl: int | None = None
+    concurrency: str = "default"
+    schema: type[BaseModel] | None = None
+    description: str = ""
+    memo_ttl: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.memo_ttl is not None and self.memo_ttl <= 0:
+            raise ValueError(f"memo_ttl for resource '{self.name}' must be positive or None. Got: {self.memo_ttl}")
+        if self.paging is not None and self.paging not in PAGING_STYLES:
+            raise ValueError(f"Unknown paging style for resource '{self.name}': '{self.paging}'. Must be one of {PAGING_STYLES}")
+        if self.concurrency not in CONCURRENCY_CLASSES:
+            raise ValueError(
+                f"Unknown concurrency class for resource '{self.name}': '{self.concurrency}'. Must be one of {tuple(CONCURRENCY_CLASSES)}"
+            )
+
+    @property
+    def max_workers(self) -> int:
+        return CONCURRENCY_CLASSES[self.concurrency]
+
+    @property
+    def refresh(self) -> bool:
+        """`True` when cached responses must never be served for the resource."""
+        return self.cache_ttl == 0
+
+    @property
+    def path_params(self) -> tuple[str, ...]:
+        """Names of the placeholders in the path template, in order."""
+        return tuple(field for _, field, _, _ in Formatter().parse(self.path) if field)
+
+    def format_path(self, **path_params: t.Any) -> str:
+        """Fill the path template's placeholders. Extra path params are ignored.
+
+        Raises:
+            ValueError: When a placeholder has no value.
+
+        """
+        missing: list[str] = [name for name in self.path_params if path_params.get(name) in (None, "")]
+        if missing:
+            raise ValueError(f"Resource '{self.name}' requires path param(s): {missing}")
+
+        return self.path.format(**path_params)
+
+    def parse(self, result: t.Any) -> t.Any:
+        """Validate a result (a list of dicts, or a dict) into the resource's schema. Without a schema, return it as-is."""
+        if self.schema is None or result is None:
+            return result
+
+        if isinstance(result, list):
+            return [self.schema.model_validate(item) for item in result]
+
+        return self.schema.model_validate(result)
+
+
+## Registered resources, by name
+RESOURCE_REGISTRY: dict[str, Resource] = {}
+
+
+def register_resource(resource: Resource, replace: bool = False) -> Resource:
+    """Add a resource to the registry, so it can be fetched by name.
+
+    Raises:
+        ValueError: When a resource with the same name is registered & `replace` is `False`.
+
+    """
+    if resource.name in RESOURCE_REGISTRY and not replace:
+        raise ValueError(f"Resource '{resource.name}' is already registered")
+
+    RESOURCE_REGISTRY[resource.name] = resource
+
+    return resource
+
+
+def get_resource(resource: t.Union[str, Resource]) -> Resource:
+    """Return a registered resource by name. A `Resource` is returned as-is."""
+    if isinstance(resource, Resource):
+        return resource
+
+    try:
+        return RESOURCE_REGISTRY[resource]
+    except KeyError:
+        raise ValueError(f"Unknown Cloudflare API resource: '{resource}'. Registered: {sorted(RESOURCE_REGISTRY)}")
+
+
+for _resource in (
+    Resource(
+        name="accounts",
+        path="/accounts",
+        paging="page",
+        per_page=50,
+        cache_ttl=3600,
+        concurrency="light",
+        schema=cf_domain.CloudflareAccountIn,
+        description="Accounts the credentials can access",
+        memo_ttl=3600,
+    ),
+    Resource(
+        name="token_verify",
+        path="/user/tokens/verify",
+        cache_ttl=0,
+        concurrency="light",
+        description="The status & expiry of the API token in use",
+        memo_ttl=300,
+    ),
+    Resource(
+        name="zones",
+        path="/zones",
+        paging="page",
+        per_page=50,
+        cache_ttl=900,
+        concurrency="light",
+        schema=cf_domain.CloudflareZoneIn,
+        description="Zones the credentials can access",
+    ),
+    Resource(
+        name="zone",
+        path="/zones/{zone_id}",
+        cache_ttl=900,
+        concurrency="light",
+        schema=cf_domain.CloudflareZoneIn,
+        description="One zone's details",
+        memo_ttl=900,
+    ),
+    Resource(
+        name="zone_dns_records",
+        path="/zones/{zone_id}/dns_records",
+        paging="page",
+        per_page=5000,
+        cache_ttl=300,
+        schema=cf_domain.CloudflareDNSRecordIn,
+        description="A zone's DNS records",
+    ),
+    Resource(
+        name="zone_waf_filters",
+        path="/zones/{zone_id}/filters",
+        paging="page",
+        per_page=100,
+        cache_ttl=900,
+        schema=cf_domain.CloudflareWAFFilterIn,
+        description="A zone's (legacy) firewall filters",
+    ),
+    Resource(
+        name="zone_settings",
+        path="/zones/{zone_id}/settings",
+        cache_ttl=60,
+        description="All of a zone's settings, in one call",
+    ),
+    Resource(
+        name="zone_waf_packages",
+        path="/zones/{zone_id}/firewall/waf/packages",
+        paging="page",
+        per_page=100,
+        cache_ttl=3600,
+        description="A zone's legacy WAF packages",
+    ),
+    Resource(
+        name="zone_rulesets",
+        path="/zones/{zone_id}/rulesets",
+        cache_ttl=300,
+        description="A zone's rulesets, without their rules",
+    ),
+    Resource(
+        name="zone_ruleset",
+        path="/zones/{zone_id}/rulesets/{ruleset_id}",
+        cache_ttl=300,
+        concurrency="heavy",
+        description="One of a zone's rulesets, with its rules",
+    ),
+    Resource(
+        name="zone_phase_entrypoint",
+        path="/zones/{zone_id}/rulesets/phases/{phase}/entrypoint",
+        cache_ttl=300,
+        concurrency="heavy",
+        description="A zone's entrypoint ruleset for a phase, with its rules",
+    ),
+    Resource(
+        name="kv_namespaces",
+        path="/accounts/{account_id}/storage/kv/namespaces",
+        paging="page",
+        per_page=100,
+        cache_ttl=300,
+        concurrency="light",
+        description="An account's Workers KV namespaces",
+    ),
+    Resource(
+        name="kv_keys",
+        path="/accounts/{account_id}/storage/kv/namespaces/{namespace_id}/keys",
+        paging="cursor",
+        per_page=1000,
+        per_page_param="limit",
+        cache_ttl=0,
+        description="Keys in a Workers KV namespace",
+    ),
+    Resource(
+        name="rules_lists",
+        path="/accounts/{account_id}/rules/lists",
+        cache_ttl=300,
+        concurrency="light",
+        description="An account's Rules Lists (IP, hostname, ASN & redirect lists)",
+    ),
+    Resource(
+        name="list_bulk_operation",
+        path="/accounts/{account_id}/rules/lists/bulk_operations/{operation_id}",
+        cache_ttl=0,
+        concurrency="light",
+        description="The status of an asynchronous Rules List bulk operation",
+    ),
+):
+    register_resource(_resource)
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from .crawler import (
+    DEFAULT_RULESET_KINDS,
+    RulesetCrawlResult,
+    ZoneRulesetsResult,
+    crawl_rulesets,
+    crawl_zone_rulesets,
+    iter_stored_rules,
+    load_index,
+    ruleset_rule_rows,
+    save_index,
+)
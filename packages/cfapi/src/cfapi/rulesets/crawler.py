@@ -0,0 +1,305 @@
+"""Crawl the rulesets (WAF posture) of every zone into local storage, re-fetching only what changed.
+
+Each zone's ruleset listing carries the `version` of every ruleset. A ruleset's rules are only fetched when its
+version differs from the version recorded in the storage index by the previous crawl, so a re-crawl of a large
+account costs one listing request per zone plus one request per changed ruleset.
+
+Storage layout:
+
+```
+{output_dir}/index.json                             {zone_id: {ruleset_id: {version, phase, kind, name}}}
+{output_dir}/zones/{zone_id}/{ruleset_id}.ndjson    one rule per line, tagged with its zone & ruleset
+{output_dir}/zones/{zone_id}/waf_packages.ndjson    legacy WAF packages, when requested
+```
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+import typing as t
+
+from cfapi import concurrency
+from cfapi.zones import zone_id_and_name
+
+from loguru import logger as log
+
+if t.TYPE_CHECKING:
+    from cfapi.controllers import CloudflareController
+
+## Ruleset kinds crawled by default. `zone` rulesets are the phase entrypoints a zone's own rules live in.
+DEFAULT_RULESET_KINDS: tuple[str, ...] = ("zone",)
+
+
+@dataclass
+class ZoneRulesetsResult:
+    """The outcome of crawling one zone."""
+
+    zone_id: str
+    index: dict[str, dict] = field(default_factory=dict)
+    fetched: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    rules_written: int = 0
+
+
+@dataclass
+class RulesetCrawlResult:
+    """Totals for a crawl over many zones."""
+
+    zones: int = 0
+    fetched: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    rules_written: int = 0
+    failed: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def add(self, zone_result: ZoneRulesetsResult) -> None:
+        self.zones += 1
+        self.fetched += zone_result.fetched
+        self.unchanged += zone_result.unchanged
+        self.removed += zone_result.removed
+        self.rules_written += zone_result.rules_written
+
+
+def load_index(output_dir: t.Union[str, Path]) -> dict[str, dict[str, dict]]:
+    """Load the ruleset version index written by the previous crawl, or an empty index."""
+    index_file: Path = Path(str(output_dir)) / "index.json"
+    if not index_file.exists():
+        return {}
+
+    return json.loads(index_file.read_text(encoding="utf-8"))
+
+
+def save_index(output_dir: t.Union[str, Path], index: dict[str, dict[str, dict]]) -> None:
+    """Write the ruleset version index, replacing the previous one atomically."""
+    output_dir: Path = Path(str(output_dir))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_file: Path = output_dir / "index.json.tmp"
+    tmp_file.write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_file.replace(output_dir / "index.json")
+
+
+def _write_ndjson(output_file: Path, rows: t.Iterable[dict]) -> int:
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    count: int = 0
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str))
+            f.write("\n")
+            count += 1
+
+    return count
+
+
+def ruleset_rule_rows(ruleset: dict, zone_id: str, zone_name: str | None = None) -> t.Generator[dict, None, None]:
+    """Yield one row per rule in a ruleset, tagged with the zone & ruleset it belongs to."""
+    context: dict = {
+        "zone_id": zone_id,
+        "zone_name": zone_name,
+        "ruleset_id": ruleset.get("id"),
+        "ruleset_name": ruleset.get("name"),
+        "ruleset_kind": ruleset.get("kind"),
+        "phase": ruleset.get("phase"),
+        "ruleset_version": ruleset.get("version"),
+    }
+
+    for rule in ruleset.get("rules") or []:
+        yield {
+            **context,
+            "rule_id": rule.get("id"),
+            "rule_version": rule.get("version"),
+            **{k: v for k, v in rule.items() if k not in ("id", "version")},
+        }
+
+
+def crawl_zone_rulesets(
+    cf_controller: CloudflareController,
+    zone_id: str,
+    zone_name: str | None = None,
+    known: dict[str, dict] | None = None,
+    output_dir: t.Union[str, Path] = ".data/rulesets",
+    kinds: t.Iterable[str] = DEFAULT_RULESET_KINDS,
+    include_waf_packages: bool = False,
+) -> ZoneRulesetsResult:
+    """Crawl one zone's rulesets, fetching & writing only rulesets whose version changed.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        zone_id (str): The Cloudflare zone ID.
+        zone_name (str | None): The zone name, added to each rule row.
+        known (dict | None): The zone's entry in the storage index from the previous crawl.
+        output_dir (str | Path): (default: ".data/rulesets") The storage directory.
+        kinds (Iterable[str]): (default: `("zone",)`) Ruleset kinds to crawl, i.e. `"zone"`, `"managed"`, `"custom"`.
+        include_waf_packages (bool): (default: False) Also write the zone's legacy WAF packages.
+
+    Returns:
+        (ZoneRulesetsResult): The zone's new index entry & counts.
+
+    """
+    known = known or {}
+    kinds = set(kinds)
+    zone_dir: Path = Path(str(output_dir)) / "zones" / zone_id
+    result: ZoneRulesetsResult = ZoneRulesetsResult(zone_id=zone_id)
+
+    listed: list[dict] | None = cf_controller.list_zone_rulesets(zone_id=zone_id, refresh=True)
+    if listed is None:
+        ## Without a listing, stored rulesets can't be told apart from deleted ones
+        raise RuntimeError(f"Could not list rulesets for zone '{zone_id}'")
+
+    for listed_ruleset in listed:
+        if listed_ruleset.get("kind") not in kinds:
+            continue
+
+        ruleset_id: str = listed_ruleset["id"]
+        version: str | None = listed_ruleset.get("version")
+        ruleset_file: Path = zone_dir / f"{ruleset_id}.ndjson"
+
+        if (
+            ruleset_id in known
+            and known[ruleset_id].get("version") == version
+            and ruleset_file.exists()
+        ):
+            result.index[ruleset_id] = known[ruleset_id]
+            result.unchanged += 1
+            continue
+
+        ## Zone entrypoints are fetched by phase, other rulesets by ID
+        if listed_ruleset.get("kind") == "zone" and listed_ruleset.get("phase"):
+            ruleset: dict | None = cf_controller.get_zone_ruleset(
+                zone_id=zone_id, phase=listed_ruleset["phase"], refresh=True
+            )
+        else:
+            ruleset: dict | None = cf_controller.get_zone_ruleset(
+                zone_id=zone_id, ruleset_id=ruleset_id, refresh=True
+            )
+
+        if ruleset is None:
+            ## Listed but not returned: keep what is stored (it is re-fetched next crawl, its version still differing),
+            #  so an empty response never counts as a removal below
+            log.warning(f"Ruleset '{ruleset_id}' of zone '{zone_id}' was listed but could not be fetched")
+            if ruleset_id in known:
+                result.index[ruleset_id] = known[ruleset_id]
+            continue
+
+        result.rules_written += _write_ndjson(
+            ruleset_file, ruleset_rule_rows(ruleset, zone_id=zone_id, zone_name=zone_name)
+        )
+        result.index[ruleset_id] = {
+            "version": ruleset.get("version", version),
+            "phase": ruleset.get("phase"),
+            "kind": ruleset.get("kind"),
+            "name": ruleset.get("name"),
+        }
+        result.fetched += 1
+
+    ## Drop files of rulesets that no longer exist. Only kinds crawled this time can be told apart from deleted
+    #  ones; stored rulesets of other kinds (& their index entries) are kept as they are
+    for ruleset_id, entry in known.items():
+        if ruleset_id in result.index:
+            continue
+
+        if entry.get("kind") not in kinds:
+            result.index[ruleset_id] = entry
+            continue
+
+        (zone_dir / f"{ruleset_id}.ndjson").unlink(missing_ok=True)
+        result.removed += 1
+
+    if include_waf_packages:
+        waf_packages: list[dict] = cf_controller.get_zone_waf_packages(zone_id=zone_id) or []
+        _write_ndjson(
+            zone_dir / "waf_packages.ndjson",
+            ({"zone_id": zone_id, "zone_name": zone_name, **pkg} for pkg in waf_packages),
+        )
+
+    return result
+
+
+def crawl_rulesets(
+    cf_controller: CloudflareController,
+    zones: t.Iterable[t.Any],
+    output_dir: t.Union[str, Path] = ".data/rulesets",
+    kinds: t.Iterable[str] = DEFAULT_RULESET_KINDS,
+    include_waf_packages: bool = False,
+    max_workers: int = 8,
+) -> RulesetCrawlResult:
+    """Crawl the rulesets of every zone, a bounded number of zones at a time.
+
+    Description:
+        Zones are crawled concurrently through the controller's shared HTTP client. Each zone's rulesets are
+        written as soon as they are fetched. The storage index is saved once the crawl ends (including when
+        it is interrupted), keeping entries for zones that failed or were not part of this crawl.
+
+    Params:
+        cf_controller (CloudflareController): An initialized Cloudflare controller.
+        zones (Iterable): Zone ID strings, zone dicts, or zone records. Consumed lazily.
+        output_dir (str | Path): (default: ".data/rulesets") The storage directory.
+        kinds (Iterable[str]): (default: `("zone",)`) Ruleset kinds to crawl.
+        include_waf_packages (bool): (default: False) Also write each zone's legacy WAF packages.
+        max_workers (int): (default: 8) Maximum number of zones crawled at once.
+
+    Returns:
+        (RulesetCrawlResult): Crawl totals & the zones that failed.
+
+    """
+    index: dict[str, dict[str, dict]] = load_index(output_dir)
+    kinds = tuple(kinds)
+    result: RulesetCrawlResult = RulesetCrawlResult()
+    start: float = time.perf_counter()
+
+    def _crawl_zone(zone: t.Any) -> ZoneRulesetsResult:
+        zone_id, zone_name = zone_id_and_name(zone)
+
+        return crawl_zone_rulesets(
+            cf_controller,
+            zone_id=zone_id,
+            zone_name=zone_name,
+            known=index.get(zone_id),
+            output_dir=output_dir,
+            kinds=kinds,
+            include_waf_packages=include_waf_packages,
+        )
+
+    try:
+        with cf_controller._open_client():
+            for zone, zone_result in concurrency.bounded_map(
+                _crawl_zone, zones, max_workers=max_workers, ordered=False, return_exceptions=True
+            ):
+                zone_id, _ = zone_id_and_name(zone)
+
+                if isinstance(zone_result, Exception):
+                    log.error(
+                        f"({type(zone_result)}) Error crawling rulesets for zone '{zone_id}'. Details: {zone_result}"
+                    )
+                    result.failed[zone_id] = zone_result
+                    continue
+
+                index[zone_id] = zone_result.index
+                result.add(zone_result)
+    finally:
+        save_index(output_dir, index)
+        result.elapsed = time.perf_counter() - start
+
+    log.info(
+        f"Crawled rulesets for [{result.zones}] zone(s) in {result.elapsed:.2f}s: [{result.fetched}] fetched, [{result.unchanged}] unchanged, [{result.removed}] removed, [{result.rules_written}] rule(s) written, [{len(result.failed)}] zone(s) failed"
+    )
+
+    return result
+
+
+def iter_stored_rules(output_dir: t.Union[str, Path] = ".data/rulesets") -> t.Generator[dict, None, None]:
+    """Yield every stored rule row across all zones, i.e. to load the WAF posture of an account."""
+    for ruleset_file in sorted((Path(str(output_dir)) / "zones").glob("*/*.ndjson")):
+        if ruleset_file.name == "waf_packages.ndjson":
+            continue
+
+        with open(ruleset_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
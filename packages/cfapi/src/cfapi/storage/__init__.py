@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from .loader import LoadResult, load_waf_filters, load_zone_pages, load_zones, zone_rows
+from .models import (
+    INVENTORY_MODELS,
+    CloudflareAccountModel,
+    CloudflareWAFFilterModel,
+    CloudflareZoneModel,
+    CloudflareZoneOwnerModel,
+    CloudflareZonePlanModel,
+    create_inventory_tables,
+)
@@ -0,0 +1,324 @@
+"""Load pages of Cloudflare API results into the inventory tables.
+
+A page of zones is split into rows for each table: the accounts, plans & owners nested in the zones are collected &
+deduplicated by ID, & each zone becomes one flat row referencing them. Every table is then written with one
+`BaseRepository.bulk_upsert()` per chunk, dimensions first, & the page is committed once, so a page is stored
+all-or-nothing & re-loading a snapshot updates rows in place.
+
+Usage:
+
+``` py linenums=1
+with session_pool() as session:
+    result = load_zone_pages(session, cf_controller.iter_zone_pages())
+```
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import time
+import typing as t
+
+from db_lib import BaseRepository
+
+from .models import (
+    CloudflareAccountModel,
+    CloudflareWAFFilterModel,
+    CloudflareZoneModel,
+    CloudflareZoneOwnerModel,
+    CloudflareZonePlanModel,
+)
+
+from loguru import logger as log
+import sqlalchemy.orm as so
+
+## Zone fields copied to `cloudflare_zones` as they are
+_ZONE_FIELDS: tuple[str, ...] = (
+    "id",
+    "name",
+    "status",
+    "type",
+    "paused",
+    "development_mode",
+    "name_servers",
+    "original_name_servers",
+    "original_registrar",
+    "original_dnshost",
+    "permissions",
+    "meta",
+    "activated_on",
+    "created_on",
+    "modified_on",
+)
+_ACCOUNT_FIELDS: tuple[str, ...] = ("id", "name", "type")
+_PLAN_FIELDS: tuple[str, ...] = (
+    "id",
+    "name",
+    "price",
+    "currency",
+    "frequency",
+    "is_subscribed",
+    "can_subscribe",
+    "externally_managed",
+    "legacy_discount",
+)
+_OWNER_FIELDS: tuple[str, ...] = ("id", "type", "email")
+_WAF_FILTER_FIELDS: tuple[str, ...] = ("id", "zone_id", "expression", "description", "ref", "paused")
+
+
+@dataclass
+class LoadResult:
+    """Rows upserted per table by a load."""
+
+    accounts: int = 0
+    plans: int = 0
+    owners: int = 0
+    zones: int = 0
+    waf_filters: int = 0
+    ## Input objects without an ID, which can't be stored
+    skipped: int = 0
+    pages: int = 0
+    elapsed: float = 0.0
+
+    def add(self, other: LoadResult) -> LoadResult:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+        return self
+
+    def summary(self) -> dict[str, t.Any]:
+        return {
+            "accounts": self.accounts,
+            "plans": self.plans,
+            "owners": self.owners,
+            "zones": self.zones,
+            "waf_filters": self.waf_filters,
+            "skipped": self.skipped,
+            "pages": self.pages,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def _as_dict(obj: t.Any) -> dict:
+    """Return an API object as a dict: dicts as-is, records via `to_dict()`, pydantic models via `model_dump()`."""
+    if isinstance(obj, dict):
+        return obj
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+
+    raise TypeError(f"Can't load object of type {type(obj)}. Expected a dict, record or pydantic model.")
+
+
+def _pick(obj: dict, names: t.Sequence[str]) -> dict:
+    """Return the given fields of an object.
+
+    Absent fields are left out, so an upsert never overwrites the stored value of a field the API didn't send
+    (see `BaseRepository.bulk_upsert()`'s `update_cols`).
+    """
+    return {name: obj[name] for name in names if name in obj}
+
+
+def zone_rows(zones: t.Iterable[t.Any]) -> tuple[dict[type, list[dict]], int]:
+    """Split zones into rows for each inventory table, deduplicating accounts, plans & owners by ID.
+
+    Params:
+        zones (Iterable[dict | record | pydantic model]): Zone objects, as returned by the `/zones` endpoint.
+
+    Returns:
+        (tuple[dict[type, list[dict]], int]): Model -> rows, & the number of zones skipped for having no ID.
+
+    """
+    accounts: dict[str, dict] = {}
+    plans: dict[str, dict] = {}
+    owners: dict[str, dict] = {}
+    zone_rows: dict[str, dict] = {}
+    skipped: int = 0
+
+    for obj in zones:
+        zone: dict = _as_dict(obj)
+        if not zone.get("id"):
+            skipped += 1
+            continue
+
+        row: dict = _pick(zone, _ZONE_FIELDS)
+
+        account: dict = zone.get("account") or {}
+        plan: dict = zone.get("plan") or {}
+        owner: dict = zone.get("owner") or {}
+        tenant: dict = zone.get("tenant") or {}
+        tenant_unit: dict = zone.get("tenant_unit") or {}
+
+        ## Inventory rows carry the account ID at the top level (see `cfapi.inventory`)
+        account_id: str | None = account.get("id") or zone.get("account_id")
+        if account_id:
+            row["account_id"] = account_id
+        ## References are only set when the zone carries the nested object, so a partial zone keeps stored ones
+        if "plan" in zone:
+            row["plan_id"] = plan.get("id")
+        if "owner" in zone:
+            row["owner_id"] = owner.get("id")
+        if "tenant" in zone:
+            row["tenant_id"] = tenant.get("id")
+            row["tenant_name"] = tenant.get("name")
+        if "tenant_unit" in zone:
+            row["tenant_unit_id"] = tenant_unit.get("id")
+
+        if account.get("id"):
+            accounts[account["id"]] = {**accounts.get(account["id"], {}), **_pick(account, _ACCOUNT_FIELDS)}
+        elif account_id and account_id not in accounts:
+            accounts[account_id] = {"id": account_id}
+        if plan.get("id"):
+            plans[plan["id"]] = _pick(plan, _PLAN_FIELDS)
+        if owner.get("id"):
+            owners[owner["id"]] = _pick(owner, _OWNER_FIELDS)
+
+        zone_rows[row["id"]] = row
+
+    rows: dict[type, list[dict]] = {
+        CloudflareAccountModel: list(accounts.values()),
+        CloudflareZonePlanModel: list(plans.values()),
+        CloudflareZoneOwnerModel: list(owners.values()),
+        CloudflareZoneModel: list(zone_rows.values()),
+    }
+
+    return rows, skipped
+
+
+def _upsert_tables(session: so.Session, rows: dict[type, list[dict]], chunk_size: int, commit: bool) -> None:
+    """Upsert each model's rows in order, in the session's current transaction, then commit it once."""
+    for model, model_rows in rows.items():
+        if not model_rows:
+            continue
+
+        if model is CloudflareAccountModel:
+            ## Rows with only an ID (zones listed by account) must not blank out a stored account's name & type
+            named: list[dict] = [row for row in model_rows if len(row) > 1]
+            bare: list[dict] = [row for row in model_rows if len(row) == 1]
+
+            repo: BaseRepository = BaseRepository(session, model)
+            repo.bulk_upsert(named, chunk_size=chunk_size, returning=False, commit=False)
+            repo.bulk_upsert(bare, update_cols=[], chunk_size=chunk_size, returning=False, commit=False)
+
+            continue
+
+        BaseRepository(session, model).bulk_upsert(model_rows, chunk_size=chunk_size, returning=False, commit=False)
+
+    if commit:
+        session.commit()
+
+
+def load_zones(
+    session: so.Session,
+    zones: t.Iterable[t.Any],
+    chunk_size: int = 1000,
+    commit: bool = True,
+) -> LoadResult:
+    """Upsert a page of zones & the accounts, plans & owners they reference, in one transaction.
+
+    Params:
+        session (so.Session): A database session.
+        zones (Iterable[dict | record | pydantic model]): Zone objects, i.e. one page from `iter_zone_pages()`.
+        chunk_size (int): (default: 1000) Rows per executemany batch.
+        commit (bool): (default: True) Commit once every table is written. With `False`, the caller owns the
+            transaction.
+
+    Returns:
+        (LoadResult): Rows upserted per table.
+
+    """
+    start: float = time.perf_counter()
+    rows, skipped = zone_rows(zones)
+
+    try:
+        _upsert_tables(session, rows, chunk_size=chunk_size, commit=commit)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error loading [{len(rows[CloudflareZoneModel])}] zone(s). Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    result: LoadResult = LoadResult(
+        accounts=len(rows[CloudflareAccountModel]),
+        plans=len(rows[CloudflareZonePlanModel]),
+        owners=len(rows[CloudflareZoneOwnerModel]),
+        zones=len(rows[CloudflareZoneModel]),
+        skipped=skipped,
+        pages=1,
+        elapsed=time.perf_counter() - start,
+    )
+    if skipped:
+        log.warning(f"Skipped [{skipped}] zone(s) without an ID")
+
+    return result
+
+
+def load_zone_pages(
+    session: so.Session,
+    pages: t.Iterable[t.Iterable[t.Any]],
+    chunk_size: int = 1000,
+) -> LoadResult:
+    """Load pages of zones, committing each page on its own. See `load_zones()`.
+
+    Returns:
+        (LoadResult): Rows upserted per table, summed over every page.
+
+    """
+    start: float = time.perf_counter()
+    result: LoadResult = LoadResult()
+
+    for page in pages:
+        result.add(load_zones(session, page, chunk_size=chunk_size))
+
+    result.elapsed = time.perf_counter() - start
+    log.info(f"Loaded zone inventory: {result.summary()}")
+
+    return result
+
+
+def load_waf_filters(
+    session: so.Session,
+    filters: t.Iterable[t.Any],
+    zone_id: str | None = None,
+    chunk_size: int = 1000,
+    commit: bool = True,
+) -> LoadResult:
+    """Upsert WAF filters in one transaction. Their zones must already be loaded.
+
+    Params:
+        session (so.Session): A database session.
+        filters (Iterable[dict | record | pydantic model]): WAF filter objects.
+        zone_id (str | None): The zone the filters belong to. Defaults to each filter's own `zone_id`, as set on
+            inventory rows (see `cfapi.inventory`).
+        chunk_size (int): (default: 1000) Rows per executemany batch.
+        commit (bool): (default: True) Commit once the filters are written.
+
+    Returns:
+        (LoadResult): Rows upserted.
+
+    """
+    start: float = time.perf_counter()
+    rows: list[dict] = []
+    skipped: int = 0
+
+    for obj in filters:
+        waf_filter: dict = _as_dict(obj)
+        row: dict = _pick(waf_filter, _WAF_FILTER_FIELDS)
+        row["zone_id"] = zone_id or row.get("zone_id")
+
+        if not row.get("id") or not row["zone_id"]:
+            skipped += 1
+            continue
+
+        rows.append(row)
+
+    try:
+        _upsert_tables(session, {CloudflareWAFFilterModel: rows}, chunk_size=chunk_size, commit=commit)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error loading [{len(rows)}] WAF filter(s). Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    return LoadResult(waf_filters=len(rows), skipped=skipped, pages=1, elapsed=time.perf_counter() - start)
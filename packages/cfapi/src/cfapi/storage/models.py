@@ -0,0 +1,117 @@
+"""SQLAlchemy models for a Cloudflare inventory, on `db_lib.Base`.
+
+The API nests each zone's account, plan & owner in the zone object, so thousands of zones repeat the same few
+accounts & plans. The models normalize them into dimension tables (`cloudflare_accounts`, `cloudflare_plans`,
+`cloudflare_owners`), each row stored once & keyed by its Cloudflare ID, & fact tables (`cloudflare_zones`,
+`cloudflare_waf_filters`) that reference them by ID.
+
+Cloudflare IDs are the primary keys, so a loader can upsert every table in one pass without reading generated
+keys back. Timestamps from the API (`created_on`, ...) are kept as the ISO 8601 strings the API returns, which sort
+& compare correctly as text.
+"""
+
+from __future__ import annotations
+
+import typing as t
+
+from db_lib import Base, TimestampMixin
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+## Cloudflare object IDs are 32 hex characters
+CF_ID = t.Annotated[str, so.mapped_column(sa.String(32), primary_key=True)]
+
+
+class CloudflareAccountModel(Base, TimestampMixin):
+    __tablename__ = "cloudflare_accounts"
+
+    id: so.Mapped[CF_ID]
+    name: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    type: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+
+
+class CloudflareZonePlanModel(Base, TimestampMixin):
+    __tablename__ = "cloudflare_plans"
+
+    id: so.Mapped[CF_ID]
+    name: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    price: so.Mapped[float | None]
+    currency: so.Mapped[str | None] = so.mapped_column(sa.String(8))
+    frequency: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    is_subscribed: so.Mapped[bool | None]
+    can_subscribe: so.Mapped[bool | None]
+    externally_managed: so.Mapped[bool | None]
+    legacy_discount: so.Mapped[bool | None]
+
+
+class CloudflareZoneOwnerModel(Base, TimestampMixin):
+    __tablename__ = "cloudflare_owners"
+
+    id: so.Mapped[CF_ID]
+    type: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    email: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+
+
+class CloudflareZoneModel(Base, TimestampMixin):
+    __tablename__ = "cloudflare_zones"
+    __table_args__ = (
+        ## "Zones of an account with this status", the usual inventory filter
+        sa.Index("ix_cloudflare_zones_account_id_status", "account_id", "status"),
+    )
+
+    id: so.Mapped[CF_ID]
+    name: so.Mapped[str | None] = so.mapped_column(sa.String(255), index=True)
+    status: so.Mapped[str | None] = so.mapped_column(sa.String(32), index=True)
+    type: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    paused: so.Mapped[bool | None]
+    development_mode: so.Mapped[int | None]
+
+    account_id: so.Mapped[str | None] = so.mapped_column(sa.ForeignKey("cloudflare_accounts.id"))
+    plan_id: so.Mapped[str | None] = so.mapped_column(sa.ForeignKey("cloudflare_plans.id"), index=True)
+    owner_id: so.Mapped[str | None] = so.mapped_column(sa.ForeignKey("cloudflare_owners.id"), index=True)
+    tenant_id: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    tenant_name: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    tenant_unit_id: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+
+    name_servers: so.Mapped[list | None] = so.mapped_column(sa.JSON)
+    original_name_servers: so.Mapped[list | None] = so.mapped_column(sa.JSON)
+    original_registrar: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    original_dnshost: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    permissions: so.Mapped[list | None] = so.mapped_column(sa.JSON)
+    meta: so.Mapped[dict | None] = so.mapped_column(sa.JSON)
+
+    activated_on: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    created_on: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    modified_on: so.Mapped[str | None] = so.mapped_column(sa.String(32), index=True)
+
+    ## Many-to-one lookups of small dimension tables; joined, so reading zones never runs a query per zone
+    account: so.Mapped[CloudflareAccountModel | None] = so.relationship(lazy="joined")
+    plan: so.Mapped[CloudflareZonePlanModel | None] = so.relationship(lazy="joined")
+    owner: so.Mapped[CloudflareZoneOwnerModel | None] = so.relationship(lazy="joined")
+
+
+class CloudflareWAFFilterModel(Base, TimestampMixin):
+    __tablename__ = "cloudflare_waf_filters"
+
+    id: so.Mapped[CF_ID]
+    zone_id: so.Mapped[str] = so.mapped_column(sa.ForeignKey("cloudflare_zones.id"), index=True)
+    expression: so.Mapped[str | None] = so.mapped_column(sa.Text)
+    description: so.Mapped[str | None] = so.mapped_column(sa.Text)
+    ref: so.Mapped[str | None] = so.mapped_column(sa.String(255))
+    paused: so.Mapped[bool | None] = so.mapped_column(index=True)
+
+
+## Every inventory model, dimensions before the facts that reference them
+INVENTORY_MODELS: tuple[type[Base], ...] = (
+    CloudflareAccountModel,
+    CloudflareZonePlanModel,
+    CloudflareZoneOwnerModel,
+    CloudflareZoneModel,
+    CloudflareWAFFilterModel,
+)
+
+
+def create_inventory_tables(engine: sa.Engine) -> None:
+    """Create the inventory tables (& their indexes) that don't exist yet."""
+    Base.metadata.create_all(bind=engine, tables=[model.__table__ for model in INVENTORY_MODELS])
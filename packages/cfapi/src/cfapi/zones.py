@@ -0,0 +1,16 @@
+"""Helpers for the zone references cfapi functions accept: zone ID strings, zone dicts, or zone records/schemas."""
+
+from __future__ import annotations
+
+import typing as t
+
+
+def zone_id_and_name(zone: t.Any) -> tuple[str, str | None]:
+    """Return `(id, name)` for a zone ID string, zone dict, or zone record/schema object."""
+    if isinstance(zone, str):
+        return zone, None
+
+    if isinstance(zone, dict):
+        return zone["id"], zone.get("name")
+
+    return zone.id, getattr(zone, "name", None)
@@ -0,0 +1,87 @@
+"""Fixtures serving the mock Cloudflare API (`sandbox/mock_cloudflare/server.py`) on a free local port."""
+
+from __future__ import annotations
+
+from http.server import ThreadingHTTPServer
+import importlib.util
+from pathlib import Path
+import sys
+import threading
+import typing as t
+
+from cfapi.controllers import CloudflareController
+
+import pytest
+
+MOCK_SERVER_FILE: Path = Path(__file__).parents[3] / "sandbox" / "mock_cloudflare" / "server.py"
+
+
+def _load_mock_server() -> t.Any:
+    spec = importlib.util.spec_from_file_location("mock_cloudflare_server", MOCK_SERVER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    ## Dataclasses look their module up in `sys.modules`
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+mock_server = _load_mock_server()
+
+
+@pytest.fixture
+def mock_state() -> t.Any:
+    """The mock API's data. Tests may change it before making requests, i.e. to set `purge_rate`."""
+    return mock_server.MockState.build(zones=120, dns_records_per_zone=30)
+
+
+@pytest.fixture
+def mock_api(mock_state: t.Any) -> t.Generator[str, None, None]:
+    """Serve `mock_state` & yield the API base URL."""
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), mock_server.make_handler(mock_state))
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}{mock_server.API_PREFIX}"
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cf_controller(mock_api: str) -> t.Generator[CloudflareController, None, None]:
+    """An open controller for the mock API, without the response cache."""
+    with CloudflareController(
+        api_base_url=mock_api,
+        api_token="mock",
+        account_id=mock_server.ACCOUNT_ID,
+        use_cache=False,
+        use_memo=False,
+    ) as controller:
+        yield controller
+
+
+@pytest.fixture
+def replace_route(monkeypatch) -> t.Callable:
+    """Replace a mock API route's handler for one test.
+
+    Returns a function taking the route's method, its path pattern (i.e. `r"/graphql"`) & a handler. The handler
+    is called as `handler(original, state, match, query, body)`, `original` being the replaced handler.
+    """
+
+    def _replace(method: str, pattern: str, handler: t.Callable) -> None:
+        index: int = next(
+            i
+            for i, (route_method, route_pattern, _) in enumerate(mock_server.ROUTES)
+            if route_method == method and route_pattern.pattern == pattern
+        )
+        route_method, route_pattern, original = mock_server.ROUTES[index]
+
+        def _handler(*args: t.Any) -> tuple[int, t.Any]:
+            return handler(original, *args)
+
+        routes: list[tuple] = list(mock_server.ROUTES)
+        routes[index] = (route_method, route_pattern, _handler)
+        monkeypatch.setattr(mock_server, "ROUTES", routes)
+
+    return _replace
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import datetime as dt
+import threading
+
+from cfapi.analytics.client import AnalyticsClient, split_time_range
+from cfapi.controllers import CloudflareController
+
+import pytest
+
+SINCE: dt.datetime = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def graphql_requests(replace_route) -> list[dict]:
+    """Record the variables of every GraphQL request the mock API answers."""
+    requests: list[dict] = []
+    lock: threading.Lock = threading.Lock()
+
+    def _post_graphql(original, state, match, query, body):
+        with lock:
+            requests.append((body or {}).get("variables") or {})
+
+        return original(state, match, query, body)
+
+    replace_route("POST", r"/graphql", _post_graphql)
+
+    return requests
+
+
+def test_split_time_range_caps_each_window():
+    windows = split_time_range(SINCE, SINCE + dt.timedelta(hours=60), dt.timedelta(days=1))
+
+    assert [(end - start).total_seconds() / 3600 for start, end in windows] == [24, 24, 12]
+    assert windows[0][0] == SINCE and windows[-1][1] == SINCE + dt.timedelta(hours=60)
+    assert all(prev[1] == cur[0] for prev, cur in zip(windows, windows[1:]))
+
+
+def test_iter_pages_batches_zones_per_window(cf_controller: CloudflareController, mock_state, graphql_requests):
+    zone_ids: list[str] = [zone["id"] for zone in mock_state.zones[:25]]
+    client: AnalyticsClient = AnalyticsClient(cf_controller, zones_per_query=10, max_workers=3)
+
+    table = client.to_table("http_requests", zone_ids, SINCE, SINCE + dt.timedelta(days=3))
+
+    ## 3 zone batches (10, 10, 5) x 3 one-day windows
+    assert len(graphql_requests) == 9
+    assert sorted(len(variables["zoneTags"]) for variables in graphql_requests) == [5] * 3 + [10] * 6
+    assert {variables["since"] for variables in graphql_requests} == {
+        "2025-01-01T00:00:00Z",
+        "2025-01-02T00:00:00Z",
+        "2025-01-03T00:00:00Z",
+    }
+    ## Every zone gets the fixture's 3 groups once per window
+    assert table.num_rows == 25 * 3 * 3
+    assert set(table.column("zone_tag").to_pylist()) == set(zone_ids)
+
+
+def test_graphql_query_is_not_cached(mock_api: str, mock_state, graphql_requests, tmp_path):
+    query: str = "{ viewer { zones { httpRequestsAdaptiveGroups(limit: 1) { count } } } }"
+
+    with CloudflareController(
+        api_base_url=mock_api,
+        api_token="mock",
+        account_id=mock_state.accounts[0]["id"],
+        cache_db_file=str(tmp_path / "hishel.sqlite3"),
+        cache_file_dir=str(tmp_path / "hishel"),
+        use_memo=False,
+    ) as controller:
+        for _ in range(2):
+            controller.graphql_query(query, variables={"zoneTags": [mock_state.zones[0]["id"]]})
+
+    assert len(graphql_requests) == 2
+
+
+def test_graphql_query_retries_rate_limited_queries(cf_controller: CloudflareController, mock_state, replace_route):
+    attempts: list[int] = []
+
+    def _post_graphql(original, state, match, query, body):
+        attempts.append(1)
+        if len(attempts) == 1:
+            return 429, {"result": None, "success": False, "errors": [{"code": 10000, "message": "rate limited"}]}
+
+        return original(state, match, query, body)
+
+    replace_route("POST", r"/graphql", _post_graphql)
+    zone_id: str = mock_state.zones[0]["id"]
+
+    data: dict = cf_controller.graphql_query(
+        "{ viewer { zones { httpRequestsAdaptiveGroups(limit: 1) { count } } } }", variables={"zoneTags": [zone_id]}
+    )
+
+    assert len(attempts) == 2
+    assert data["viewer"]["zones"][0]["zoneTag"] == zone_id
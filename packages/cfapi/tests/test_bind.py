@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from cfapi.dns.bind import parse_bind_lines, parse_ttl
+
+import pytest
+
+
+def _records(zone_file: str, **kwargs) -> list[tuple[str, str, str, int | None]]:
+    return [
+        (record["name"], record["type"], record["content"], record["ttl"])
+        for record in parse_bind_lines(zone_file.splitlines(), **kwargs)
+    ]
+
+
+@pytest.mark.parametrize(
+    "token, seconds",
+    [("3600", 3600), ("1h", 3600), ("1h30m", 5400), ("2D", 172800), ("1w", 604800), ("IN", None), ("1x", None)],
+)
+def test_parse_ttl(token: str, seconds: int | None):
+    assert parse_ttl(token) == seconds
+
+
+def test_parse_directives_relative_names_and_multiline_records():
+    zone_file = """$ORIGIN example.com.
+$TTL 1h
+@ IN SOA ns1 admin (
+    1 ; serial
+    2h 15m 1w 1d )
+www 5m IN A 192.0.2.1 ; cf_tags=cf-proxied:true
+    IN AAAA 2001:db8::1
+mail IN MX 10 mx.example.net.
+"""
+
+    records: list[dict] = list(parse_bind_lines(zone_file.splitlines()))
+
+    assert [(r["name"], r["type"], r["content"], r["ttl"]) for r in records] == [
+        ("example.com", "SOA", "ns1 admin 1 2h 15m 1w 1d", 3600),
+        ("www.example.com", "A", "192.0.2.1", 300),
+        ("www.example.com", "AAAA", "2001:db8::1", 3600),
+        ("mail.example.com", "MX", "mx.example.net.", 3600),
+    ]
+    assert records[1]["proxied"] is True
+    assert records[3]["priority"] == 10
+
+
+def test_parentheses_inside_quotes_are_kept():
+    zone_file = """@ IN TXT "hello (world)"
+grouped IN TXT ( "a (b" "c)" )
+"""
+
+    assert _records(zone_file, origin="example.com", default_ttl=60) == [
+        ("example.com", "TXT", '"hello (world)"', 60),
+        ("grouped.example.com", "TXT", '"a (b" "c)"', 60),
+    ]
+
+
+def test_unbalanced_paren_inside_quotes_does_not_swallow_records():
+    zone_file = """@ IN TXT "unbalanced ( paren"
+www IN A 192.0.2.1
+mail IN MX 10 mx.example.net.
+"""
+
+    assert [name for name, *_ in _records(zone_file, origin="example.com")] == [
+        "example.com",
+        "www.example.com",
+        "mail.example.com",
+    ]
+
+
+def test_invalid_ttl_directive_is_skipped():
+    zone_file = """$TTL 300
+$TTL bogus
+www IN A 192.0.2.1
+"""
+
+    assert _records(zone_file, origin="example.com") == [("www.example.com", "A", "192.0.2.1", 300)]
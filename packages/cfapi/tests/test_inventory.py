@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from cfapi.controllers import CloudflareController
+from cfapi.inventory import InventoryResult, sweep_accounts
+
+import pyarrow.dataset as ds
+import pytest
+
+
+@pytest.fixture
+def mock_state(mock_state):
+    ## Zones are dealt out to the accounts round-robin
+    return type(mock_state).build(zones=9, dns_records_per_zone=5, accounts=3)
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_sweep_writes_each_account_partition(
+    cf_controller: CloudflareController, mock_state, tmp_path: Path, processes: int
+):
+    result: InventoryResult = sweep_accounts(
+        cf_controller,
+        accounts=mock_state.accounts,
+        output_dir=tmp_path,
+        zone_resources=("zone_dns_records",),
+        processes=processes,
+    )
+
+    assert not result.failed
+    assert result.written == {"zones": 9, "zone_dns_records": 45}
+    assert [account.counts for account in result.accounts] == [{"zones": 3, "zone_dns_records": 15}] * 3
+    assert sorted(result.files("zones")) == sorted(
+        tmp_path / "zones" / f"account_id={account['id']}" / "part-0.parquet" for account in mock_state.accounts
+    )
+
+    records = ds.dataset(tmp_path / "zone_dns_records", partitioning="hive").to_table()
+
+    assert records.num_rows == 45
+    assert set(records.column("account_id").to_pylist()) == {account["id"] for account in mock_state.accounts}
+
+
+def test_sweep_writes_ndjson(cf_controller: CloudflareController, mock_state, tmp_path: Path):
+    result: InventoryResult = sweep_accounts(
+        cf_controller, accounts=mock_state.accounts[:1], output_dir=tmp_path, fmt="ndjson", zone_resources=()
+    )
+
+    (zones_file,) = result.files("zones")
+
+    assert len(zones_file.read_text().splitlines()) == 3
+
+    with pytest.raises(ValueError):
+        sweep_accounts(cf_controller, output_dir=tmp_path, fmt="csv")
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+from cfapi.controllers import CloudflareController
+from cfapi.kv import KVNamespace, kv_pair, pack_batches
+
+import pytest
+
+NAMESPACE_ID: str = "0f2ac74b498b48028cb68387c421e279"
+
+
+@pytest.fixture
+def namespace(cf_controller: CloudflareController) -> KVNamespace:
+    return KVNamespace(cf_controller, namespace_id=NAMESPACE_ID, max_workers=3)
+
+
+def test_pack_batches_caps_keys_and_bytes():
+    entries: list[dict] = [kv_pair(f"key-{i}", "x" * 100) for i in range(50)]
+    entry_size: int = len(json.dumps(entries[0])) + 1
+
+    assert [len(batch) for batch, _size in pack_batches(entries, max_keys=20)] == [20, 20, 10]
+    assert all(size <= entry_size * 8 + 2 for _batch, size in pack_batches(entries, max_bytes=entry_size * 8 + 2))
+
+    with pytest.raises(ValueError):
+        list(pack_batches(entries, max_bytes=entry_size))
+
+
+def test_kv_pair_encodes_bytes():
+    assert kv_pair("k", b"\x00\x01", expiration_ttl=60) == {"key": "k", "value": "AAE=", "base64": True, "expiration_ttl": 60}
+
+
+def test_write_list_read_and_delete_many(namespace: KVNamespace, mock_state):
+    items: list[tuple[str, str]] = [(f"flag:{i:05d}", str(i)) for i in range(12_000)]
+
+    report = namespace.write_many(iter(items))
+
+    ## 12,000 keys take two bulk writes of at most 10,000
+    assert sorted(result.keys for result in report.results) == [2_000, 10_000]
+    assert report.keys == len(mock_state.kv[NAMESPACE_ID]) == 12_000
+    ## Listed across cursor pages of 1,000 keys, in order
+    assert list(namespace.iter_keys()) == [key for key, _value in items]
+    assert dict(namespace.read_many(["flag:00007", "missing"])) == {"flag:00007": "7", "missing": None}
+
+    report = namespace.delete_many(f"flag:{i:05d}" for i in range(0, 12_000, 2))
+
+    assert report.keys == 6_000
+    assert len(mock_state.kv[NAMESPACE_ID]) == 6_000
+
+
+def test_diff_and_sync_within_a_prefix(namespace: KVNamespace, mock_state):
+    mock_state.kv[NAMESPACE_ID].update({"beta:a": "on", "beta:b": "off", "beta:c": "on", "other:x": "1"})
+    desired: dict[str, str] = {"beta:a": "on", "beta:b": "on", "beta:d": "off", "other:y": "2"}
+
+    to_write, to_delete = namespace.diff(desired, prefix="beta:")
+
+    ## Keys outside the prefix are neither written nor deleted
+    assert to_write == {"beta:b": "on", "beta:d": "off"}
+    assert to_delete == ["beta:c"]
+
+    namespace.sync(desired, prefix="beta:")
+
+    assert mock_state.kv[NAMESPACE_ID] == {"beta:a": "on", "beta:b": "on", "beta:d": "off", "other:x": "1"}
+    assert namespace.diff(desired, prefix="beta:") == ({}, [])
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from cfapi.controllers import CloudflareController
+from cfapi.operations import OperationTracker
+
+ITEMS: list[dict] = [{"ip": "192.0.2.1"}, {"ip": "192.0.2.2"}]
+
+
+def test_tracker_resolves_every_operation(cf_controller: CloudflareController, mock_state):
+    mock_state.operation_seconds = (0.2, 0.6)
+    list_id: str = next(iter(mock_state.lists))
+
+    with OperationTracker(cf_controller, initial_interval=0.05, max_interval=0.2, account_workers=2) as tracker:
+        futures = [tracker.track(cf_controller.account_id, cf_controller.append_list_items(list_id, ITEMS)) for _ in range(6)]
+        threads_before: int = threading.active_count()
+
+        results = tracker.wait(futures, timeout=10)
+
+        ## Rounds reuse the tracker's pool instead of starting threads of their own
+        assert threading.active_count() <= threads_before + tracker.max_workers * tracker.account_workers
+
+    assert [result.status for result in results] == ["completed"] * 6
+    assert len(mock_state.lists[list_id]) == 12
+    assert tracker.stats.rounds > 1
+
+
+def test_close_cancels_operations_still_pending_after_the_timeout(cf_controller: CloudflareController, mock_state):
+    mock_state.operation_seconds = (30.0, 30.0)
+    list_id: str = next(iter(mock_state.lists))
+    tracker: OperationTracker = OperationTracker(cf_controller, initial_interval=0.05, max_interval=0.1)
+    future = tracker.track(cf_controller.account_id, cf_controller.append_list_items(list_id, ITEMS))
+
+    start: float = time.monotonic()
+    tracker.close(timeout=0.3)
+
+    assert time.monotonic() - start < 5
+    assert future.cancelled()
+    assert tracker.pending == 0
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from cfapi.controllers import CloudflareController
+from cfapi.pagination import Paginator, detect_paging_style, next_cursor
+
+import pytest
+
+ITEMS: list[int] = list(range(23))
+
+
+def _page_fetch(total_pages: bool = True, calls: list[dict] | None = None):
+    """A fetch serving `ITEMS` with page paging, with or without `total_pages`."""
+
+    def _fetch(params: dict) -> dict:
+        if calls is not None:
+            calls.append(params)
+
+        page, per_page = params["page"], params["per_page"]
+        result_info: dict = {"page": page, "per_page": per_page}
+        if total_pages:
+            result_info["total_pages"] = -(-len(ITEMS) // per_page)
+
+        return {"result": ITEMS[(page - 1) * per_page : page * per_page], "result_info": result_info}
+
+    return _fetch
+
+
+def _cursor_fetch(params: dict) -> dict:
+    start: int = int(params.get("cursor") or 0)
+    end: int = start + params["limit"]
+
+    return {"result": ITEMS[start:end], "result_info": {"cursor": str(end) if end < len(ITEMS) else ""}}
+
+
+@pytest.mark.parametrize(
+    "result_info, style",
+    [(None, None), ({}, None), ({"page": 1, "total_pages": 2}, "page"), ({"cursors": {"after": "x"}}, "cursor")],
+)
+def test_detect_paging_style(result_info: dict | None, style: str | None):
+    assert detect_paging_style(result_info) == style
+
+
+def test_next_cursor():
+    assert next_cursor({"cursor": "a"}) == "a"
+    assert next_cursor({"cursors": {"after": "b"}}) == "b"
+    assert next_cursor({"cursor": ""}) is None
+
+
+@pytest.mark.parametrize("total_pages", [True, False])
+def test_page_paging_yields_every_item_in_order(total_pages: bool):
+    calls: list[dict] = []
+
+    assert list(Paginator(_page_fetch(total_pages, calls), per_page=5, max_workers=3)) == ITEMS
+    assert sorted(call["page"] for call in calls) == [1, 2, 3, 4, 5]
+
+
+def test_cursor_paging_yields_every_item_in_order():
+    paginator: Paginator = Paginator(_cursor_fetch, per_page=5, per_page_param="limit", style="cursor")
+
+    assert [len(page) for page in paginator.pages()] == [5, 5, 5, 5, 3]
+    assert list(paginator) == ITEMS
+
+
+def test_unpaged_result_is_one_page():
+    paginator: Paginator = Paginator(lambda params: {"result": [1, 2, 3]}, style="page")
+
+    assert list(paginator.pages()) == [[1, 2, 3]]
+
+
+def test_apages_yields_the_same_pages():
+    paginator: Paginator = Paginator(_page_fetch(), per_page=10)
+
+    async def _collect() -> list[list]:
+        return [page async for page in paginator.apages()]
+
+    assert asyncio.run(_collect()) == list(paginator.pages())
+
+
+def test_cancelled_apages_waits_for_the_inflight_page():
+    fetching, release = threading.Event(), threading.Event()
+    fetch = _page_fetch()
+
+    def _blocking_fetch(params: dict) -> dict:
+        if params["page"] > 1:
+            fetching.set()
+            release.wait(5)
+
+        return fetch(params)
+
+    async def _consume() -> None:
+        pages = Paginator(_blocking_fetch, per_page=10, max_workers=1).apages()
+        await anext(pages)
+
+        step = asyncio.ensure_future(anext(pages))
+        await asyncio.to_thread(fetching.wait, 5)
+        step.cancel()
+        ## Let the worker thread finish only after the consumer was cancelled
+        threading.Timer(0.2, release.set).start()
+
+        with pytest.raises(asyncio.CancelledError):
+            await step
+
+    asyncio.run(_consume())
+
+
+def test_controller_paginates_the_mock_api(cf_controller: CloudflareController, mock_state):
+    zones: list[dict] = list(cf_controller.paginate("/zones", per_page=25, max_workers=3))
+
+    assert [zone["id"] for zone in zones] == [zone["id"] for zone in mock_state.zones]
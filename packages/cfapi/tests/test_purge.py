@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from cfapi.controllers import CloudflareController
+from cfapi.purge import PurgePlan, ZoneNameIndex, plan_purge, send_purge_batches
+
+import pytest
+
+
+@pytest.fixture
+def zone_index(mock_state) -> ZoneNameIndex:
+    return ZoneNameIndex(mock_state.zones[:3])
+
+
+def _urls(zone_number: int, count: int) -> list[str]:
+    return [f"https://www.zone-{zone_number}.example.com/asset-{i}.js" for i in range(count)]
+
+
+def test_plan_purge_dedupes_normalized_urls(zone_index: ZoneNameIndex, mock_state):
+    items: list[str] = [
+        "https://www.zone-0.example.com/a.js",
+        "HTTPS://WWW.Zone-0.example.com:443/a.js#top",
+        "https://www.zone-0.example.com/a.js?v=2",
+        "https://www.zone-1.example.com/a.js",
+        "https://unknown.example.org/a.js",
+        "ftp://www.zone-0.example.com/a.js",
+    ]
+
+    plan: PurgePlan = plan_purge(items, zone_index=zone_index)
+
+    assert plan.duplicates == 1
+    assert plan.unresolved == ["https://unknown.example.org/a.js"]
+    assert plan.invalid == ["ftp://www.zone-0.example.com/a.js"]
+    assert {batch.zone_id: batch.items for batch in plan.batches} == {
+        mock_state.zones[0]["id"]: ("https://www.zone-0.example.com/a.js", "https://www.zone-0.example.com/a.js?v=2"),
+        mock_state.zones[1]["id"]: ("https://www.zone-1.example.com/a.js",),
+    }
+
+
+def test_plan_purge_packs_each_zone_into_batches(zone_index: ZoneNameIndex, mock_state):
+    plan: PurgePlan = plan_purge(_urls(0, 65) + _urls(1, 10), zone_index=zone_index, batch_size=30)
+
+    assert [len(batch.items) for batch in plan.batches] == [30, 30, 5, 10]
+    assert [batch.zone_id for batch in plan.batches] == [mock_state.zones[0]["id"]] * 3 + [mock_state.zones[1]["id"]]
+    assert plan.items == 75
+
+
+def test_plan_purge_requires_a_zone_for_tags():
+    with pytest.raises(ValueError):
+        plan_purge(["tag-a"], kind="tags")
+
+    plan: PurgePlan = plan_purge(["Tag-A", "tag-a", "tag-b"], kind="tags", zone_id="zone")
+
+    assert plan.duplicates == 1
+    assert plan.batches[0].items == ("tag-a", "tag-b")
+
+
+def test_send_purge_batches_purges_every_item(cf_controller: CloudflareController, zone_index, mock_state):
+    plan: PurgePlan = plan_purge(_urls(0, 70) + _urls(2, 40) + _urls(0, 20), zone_index=zone_index)
+
+    report = send_purge_batches(cf_controller, plan, max_workers=4, requests_per_second=100)
+
+    assert report.summary()["failed_batches"] == 0
+    assert report.purged == mock_state.purged == 110
+    assert report.plan.duplicates == 20
+
+
+def test_send_purge_batches_retries_rate_limited_batches(cf_controller: CloudflareController, zone_index, mock_state):
+    ## Send faster than the mock allows, so some batches get a 429 & wait for its Retry-After
+    mock_state.purge_rate = 3
+    plan: PurgePlan = plan_purge(_urls(0, 30 * 8), zone_index=zone_index)
+
+    report = send_purge_batches(cf_controller, plan, max_workers=4, requests_per_second=50, max_retries=5)
+
+    assert not report.failed
+    assert mock_state.purged == 240
+    assert any(result.attempts > 1 for result in report.results)
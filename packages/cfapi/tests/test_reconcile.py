@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from cfapi.controllers import CloudflareController
+from cfapi.reconcile import ReconcilePlan, apply_reconcile, diff_settings, plan_reconcile
+
+import pytest
+
+
+@pytest.fixture
+def desired(mock_state) -> dict:
+    return {
+        "defaults": {"settings": {"always_use_https": "on", "min_tls_version": "1.2"}},
+        "zones": {
+            "zone-0.example.com": {
+                "settings": {"ssl": "strict", "minify": {"css": "on"}, "advanced_ddos": "off"},
+                "filters": [
+                    {"description": "filter 3", "paused": True},
+                    {"id": f"{mock_state.zones[0]['id'][:24]}{39:08x}", "expression": 'http.host eq "a"'},
+                    {"description": "block admin", "expression": 'http.request.uri.path contains "/wp-admin"'},
+                ],
+            },
+            ## Listed by ID; only the defaults change it
+            mock_state.zones[1]["id"]: {"settings": {"brotli": "on"}},
+            "missing.example.com": {"settings": {"ssl": "full"}},
+        },
+    }
+
+
+def test_diff_settings_patches_object_settings_key_by_key():
+    current: list[dict] = [{"id": "minify", "value": {"css": "off", "js": "off"}, "editable": True}]
+
+    changes, items, skipped = diff_settings("zone", current, {"minify": {"css": "on", "js": "off"}, "waf": "on"})
+
+    assert [(change.key, change.field) for change in changes] == [("minify", "css")]
+    assert items == [{"id": "minify", "value": {"css": "on", "js": "off"}}]
+    assert skipped == ["waf"]
+
+
+def test_plan_apply_replan_is_idempotent(cf_controller: CloudflareController, mock_state, desired: dict):
+    plan: ReconcilePlan = plan_reconcile(cf_controller, desired, max_workers=4)
+
+    assert plan.unresolved == ["missing.example.com"]
+    assert plan.summary()["zones_changed"] == 2
+    zone_plan = next(zone for zone in plan.zones if zone.zone_id == mock_state.zones[0]["id"])
+    assert {item["id"] for item in zone_plan.settings} == {"always_use_https", "min_tls_version", "ssl", "minify"}
+    assert zone_plan.skipped == ["advanced_ddos"]
+    assert [f["description"] for f in zone_plan.filter_updates] == ["filter 3", "filter 39"]
+    assert [f["description"] for f in zone_plan.filter_creates] == ["block admin"]
+
+    report = apply_reconcile(cf_controller, plan, max_workers=4)
+
+    assert not report.failed
+    ## One PATCH per changed zone, plus one bulk PUT & one POST for the zone with filter changes
+    assert sorted((method, items) for method, _path, items in mock_state.writes) == [
+        ("PATCH", 2),
+        ("PATCH", 4),
+        ("POST", 1),
+        ("PUT", 2),
+    ]
+    assert mock_state.settings[mock_state.zones[0]["id"]]["minify"]["value"] == {"css": "on", "html": "off", "js": "off"}
+
+    replan: ReconcilePlan = plan_reconcile(cf_controller, desired, max_workers=4)
+
+    assert replan.changes == []
+    assert replan.summary()["calls"] == 0
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from cfapi.controllers import CloudflareController
+from cfapi.rulesets import RulesetCrawlResult, crawl_rulesets, iter_stored_rules, load_index
+
+import pytest
+
+MANAGED_RULESET_ID: str = "efb7b8c949ac4650a09736fc376e9aee"
+
+
+@pytest.fixture
+def mock_state(mock_state):
+    return type(mock_state).build(zones=3, dns_records_per_zone=1)
+
+
+def test_recrawl_skips_unchanged_rulesets(cf_controller: CloudflareController, mock_state, tmp_path: Path):
+    result: RulesetCrawlResult = crawl_rulesets(cf_controller, mock_state.zones, output_dir=tmp_path, max_workers=2)
+
+    assert not result.failed
+    assert (result.zones, result.fetched, result.rules_written) == (3, 9, 12)
+    assert len(list(iter_stored_rules(tmp_path))) == 12
+
+    result = crawl_rulesets(cf_controller, mock_state.zones, output_dir=tmp_path, max_workers=2)
+
+    assert (result.fetched, result.unchanged, result.removed) == (0, 9, 0)
+
+
+def test_narrower_kinds_keep_other_stored_rulesets(cf_controller: CloudflareController, mock_state, tmp_path: Path):
+    zone_id: str = mock_state.zones[0]["id"]
+
+    crawl_rulesets(cf_controller, [zone_id], output_dir=tmp_path, kinds=("zone", "managed"))
+
+    assert load_index(tmp_path)[zone_id][MANAGED_RULESET_ID]["kind"] == "managed"
+
+    result: RulesetCrawlResult = crawl_rulesets(cf_controller, [zone_id], output_dir=tmp_path, kinds=("zone",))
+
+    ## Managed rulesets were not listed this time, so they can't have been deleted
+    assert (result.unchanged, result.removed) == (3, 0)
+    assert MANAGED_RULESET_ID in load_index(tmp_path)[zone_id]
+    assert (tmp_path / "zones" / zone_id / f"{MANAGED_RULESET_ID}.ndjson").exists()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from cfapi.controllers import CloudflareController
+
+
+def test_get_zone_records_reads_every_page(cf_controller: CloudflareController, mock_state):
+    records = cf_controller.get_zone_records()
+
+    assert len(records) == len(mock_state.zones) == 120
+    assert [record.id for record in records] == [zone["id"] for zone in mock_state.zones]
+    ## Interned across pages: zones of one account share one account value
+    assert records[0].account is records[-1].account
+
+
+def test_get_zone_records_filters_by_account(cf_controller: CloudflareController, mock_state):
+    account_id: str = mock_state.accounts[0]["id"]
+
+    records = cf_controller.get_zone_records(params={"account.id": account_id}, intern=False)
+
+    assert records and all(record.account.id == account_id for record in records)
@@ -23,6 +23,16 @@ from .schemas import (
     CloudflareZonePlanOut,
 )
 
+from .schemas import (
+    CloudflareDNSRecordIn,
+    CloudflareDNSRecordOut,
+)
+
+from .schemas import (
+    CloudflareWAFFilterIn,
+    CloudflareWAFFilterOut,
+)
+
 from .schemas import (
     CloudflareZoneTenantIn,
     CloudflareZoneTenantOut,
@@ -31,3 +41,19 @@ from .schemas import (
 )
 
 from .dtos import CloudflareZones
+
+from .records import (
+    CloudflareAccountRecord,
+    CloudflareWAFFilterRecord,
+    CloudflareZoneMetaRecord,
+    CloudflareZoneOwnerRecord,
+    CloudflareZonePlanRecord,
+    CloudflareZoneRecord,
+    CloudflareZoneTenantRecord,
+    CloudflareZoneTenantUnitRecord,
+    RecordMixin,
+    decode_waf_filter_records,
+    decode_zone_records,
+)
+
+from .interning import RecordInterner, intern_zone_records
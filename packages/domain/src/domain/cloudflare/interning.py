@@ -0,0 +1,153 @@
+"""Canonicalize repeated nested values in zone records.
+
+Every zone in a `/zones` response carries its own copy of the same `account`, `plan`, `owner` & `tenant`
+objects, & usually the same `name_servers`/`permissions` lists. Records are frozen & hashable, so identical
+values can be replaced by one shared instance, keyed by their content hash. After interning, the duplicates
+decoded for each zone are released & a large inventory holds a single copy of each distinct sub-object.
+
+Usage:
+
+``` py linenums=1
+interner = RecordInterner()
+zones = interner.intern_zones(decode_zone_records(http_res.content))
+```
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+import typing as t
+
+from .records import CloudflareZoneRecord, RecordMixin
+
+from loguru import logger as log
+
+## Generic type for interned values
+T = t.TypeVar("T")
+
+
+class RecordInterner:
+    """Pool of canonical, immutable values shared between records.
+
+    Description:
+        Re-use a single interner across pages of a listing so values are shared across the whole inventory,
+        not just within one response. Records are keyed by their own hash (a hash of their field values), so
+        two sub-objects with the same ID but different content are kept apart.
+
+    Params:
+        intern_strings (bool): (default: True) Also intern the strings inside tuple fields with `sys.intern()`.
+    """
+
+    def __init__(self, intern_strings: bool = True) -> None:
+        self.intern_strings: bool = intern_strings
+
+        ## Canonical values, keyed by themselves
+        self._pool: dict[t.Hashable, t.Hashable] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def __repr__(self) -> str:
+        return f"RecordInterner(size={len(self)}, hits={self.hits}, misses={self.misses})"
+
+    def clear(self) -> None:
+        """Drop all canonical values from the pool."""
+        self._pool.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def intern(self, value: T) -> T:
+        """Return the canonical instance equal to `value`, adding `value` to the pool if it is new."""
+        if value is None:
+            return value
+
+        canonical = self._pool.get(value)
+        if canonical is not None:
+            self.hits += 1
+
+            return canonical
+
+        self.misses += 1
+        self._pool[value] = value
+
+        return value
+
+    def intern_tuple(self, value: tuple[str, ...] | None) -> tuple[str, ...] | None:
+        """Return a canonical tuple of strings, optionally interning each string."""
+        if value is None:
+            return value
+
+        canonical = self._pool.get(value)
+        if canonical is not None:
+            self.hits += 1
+
+            return canonical
+
+        if self.intern_strings:
+            value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+
+        self.misses += 1
+        self._pool[value] = value
+
+        return value
+
+    def intern_record(self, record: RecordMixin) -> RecordMixin:
+        """Intern a record's nested records & tuple fields, returning a new record if anything was replaced."""
+        changes: dict = {}
+
+        for name in record._nested:
+            value = getattr(record, name)
+            canonical = self.intern(value)
+            if canonical is not value:
+                changes[name] = canonical
+
+        for name in record._sequences:
+            value = getattr(record, name)
+            canonical = self.intern_tuple(value)
+            if canonical is not value:
+                changes[name] = canonical
+
+        if not changes:
+            return record
+
+        return dataclasses.replace(record, **changes)
+
+    def intern_zones(
+        self, zones: t.Iterable[CloudflareZoneRecord]
+    ) -> list[CloudflareZoneRecord]:
+        """Intern the nested values of a list of zone records.
+
+        Params:
+            zones (Iterable[CloudflareZoneRecord]): Zone records to intern.
+
+        Returns:
+            (list[CloudflareZoneRecord]): The zone records, sharing canonical nested values.
+
+        """
+        interned: list[CloudflareZoneRecord] = [self.intern_record(zone) for zone in zones]
+        log.debug(f"Interned [{len(interned)}] zone(s): {self}")
+
+        return interned
+
+
+def intern_zone_records(
+    zones: t.Iterable[CloudflareZoneRecord], interner: RecordInterner | None = None
+) -> list[CloudflareZoneRecord]:
+    """Intern the nested values of zone records, using a new `RecordInterner` if one is not passed.
+
+    Params:
+        zones (Iterable[CloudflareZoneRecord]): Zone records to intern.
+        interner (RecordInterner | None): An existing interner to share canonical values with.
+
+    Returns:
+        (list[CloudflareZoneRecord]): The zone records, sharing canonical nested values.
+
+    """
+    if interner is None:
+        interner = RecordInterner()
+
+    return interner.intern_zones(zones)
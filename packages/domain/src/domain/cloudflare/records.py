@@ -0,0 +1,312 @@
+"""Compact record types for large Cloudflare inventories.
+
+The pydantic schemas in `schemas.py` are the validation boundary for API data, but each model instance carries
+a `__dict__`, field-set tracking & nested model instances. Holding a full account inventory as pydantic objects
+costs several KB per zone & creates a lot of work for the garbage collector.
+
+The records in this module are frozen, slotted dataclasses with the same fields as the matching `*Base` schema.
+List fields are stored as tuples so records are immutable & hashable. Records are decoded straight from a
+Cloudflare JSON response by pydantic-core, & can be converted to/from the pydantic schemas when needed.
+
+Usage:
+
+``` py linenums=1
+records = decode_zone_records(http_res.content)
+zone_schema = records[0].to_schema()
+```
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import typing as t
+
+from .schemas import (
+    CloudflareAccountIn,
+    CloudflareWAFFilterIn,
+    CloudflareZoneIn,
+    CloudflareZoneMetaIn,
+    CloudflareZoneOwnerIn,
+    CloudflareZonePlanIn,
+    CloudflareZoneTenantIn,
+    CloudflareZoneTenantUnitIn,
+)
+
+from loguru import logger as log
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+## Cache of field names for each record class, filled on first decode
+_RECORD_FIELDS: dict[type, tuple[str, ...]] = {}
+
+
+class RecordMixin:
+    """Shared decode/convert methods for slotted record classes.
+
+    Subclasses set `_schema` to the pydantic model the record converts to, `_nested` to a map of
+    field names to nested record classes, & `_sequences` to the names of list fields (stored as tuples).
+    """
+
+    __slots__ = ()
+
+    _schema: t.ClassVar[t.Type[BaseModel]]
+    _nested: t.ClassVar[dict[str, t.Type[RecordMixin]]] = {}
+    _sequences: t.ClassVar[frozenset[str]] = frozenset()
+
+    @classmethod
+    def _field_names(cls) -> tuple[str, ...]:
+        names: tuple[str, ...] | None = _RECORD_FIELDS.get(cls)
+        if names is None:
+            names = tuple(f.name for f in fields(cls))
+            _RECORD_FIELDS[cls] = names
+
+        return names
+
+    @classmethod
+    def from_dict(cls, data: dict) -> t.Self:
+        """Build a record from a decoded JSON dict. Keys not defined on the record are ignored.
+
+        Params:
+            data (dict): A dict decoded from a Cloudflare API response.
+
+        Returns:
+            (RecordMixin): An initialized record object.
+
+        """
+        kwargs: dict = {name: data[name] for name in cls._field_names() if name in data}
+
+        for name, record_cls in cls._nested.items():
+            value = kwargs.get(name)
+            if value is not None:
+                kwargs[name] = record_cls.from_dict(value)
+
+        for name in cls._sequences:
+            value = kwargs.get(name)
+            if value is not None:
+                kwargs[name] = tuple(value)
+
+        return cls(**kwargs)
+
+    def to_dict(self) -> dict:
+        """Return a dict representation of the record, with nested records & tuples converted back to dicts & lists."""
+        data: dict = {}
+
+        for name in self._field_names():
+            value = getattr(self, name)
+
+            if isinstance(value, RecordMixin):
+                value = value.to_dict()
+            elif isinstance(value, tuple):
+                value = list(value)
+
+            data[name] = value
+
+        return data
+
+    @classmethod
+    def from_schema(cls, schema: BaseModel) -> t.Self:
+        """Build a record from an initialized pydantic schema object."""
+        return cls.from_dict(schema.model_dump())
+
+    def to_schema(self) -> BaseModel:
+        """Validate the record into its matching pydantic `*In` schema."""
+        return self._schema.model_validate(self.to_dict())
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareAccountRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareAccountIn
+
+    id: str
+    name: str
+    type: str | None = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZoneMetaRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZoneMetaIn
+
+    custom_certificate_quota: int
+    page_rule_quota: int
+    phishing_detected: bool
+    step: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZoneOwnerRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZoneOwnerIn
+
+    email: str | None = None
+    id: str | None = None
+    type: str | None = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZonePlanRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZonePlanIn
+
+    can_subscribe: bool
+    currency: str
+    externally_managed: bool
+    frequency: str | None = None
+    id: str
+    is_subscribed: bool
+    legacy_discount: bool
+    name: str
+    price: float
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZoneTenantRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZoneTenantIn
+
+    id: str | None = None
+    name: str | None = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZoneTenantUnitRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZoneTenantUnitIn
+
+    id: str | None = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareZoneRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareZoneIn
+    _nested: t.ClassVar[dict[str, t.Type[RecordMixin]]] = {
+        "account": CloudflareAccountRecord,
+        "meta": CloudflareZoneMetaRecord,
+        "owner": CloudflareZoneOwnerRecord,
+        "plan": CloudflareZonePlanRecord,
+        "tenant": CloudflareZoneTenantRecord,
+        "tenant_unit": CloudflareZoneTenantUnitRecord,
+    }
+    _sequences: t.ClassVar[frozenset[str]] = frozenset(
+        {"name_servers", "original_name_servers", "permissions"}
+    )
+
+    account: CloudflareAccountRecord
+    activated_on: str
+    created_on: str
+    development_mode: int
+    id: str
+    meta: CloudflareZoneMetaRecord
+    modified_on: str
+    name: str | None = None
+    name_servers: tuple[str, ...] | None = ()
+    original_dnshost: str | None = None
+    original_name_servers: tuple[str, ...] | None = ()
+    original_registrar: str | None = None
+    owner: CloudflareZoneOwnerRecord
+    paused: bool
+    permissions: tuple[str, ...] | None = ()
+    plan: CloudflareZonePlanRecord
+    status: str
+    tenant: CloudflareZoneTenantRecord
+    tenant_unit: CloudflareZoneTenantUnitRecord
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CloudflareWAFFilterRecord(RecordMixin):
+    _schema: t.ClassVar[t.Type[BaseModel]] = CloudflareWAFFilterIn
+
+    id: str
+    expression: str | None = None
+    paused: bool
+
+
+class _ZoneRecordsEnvelope(TypedDict):
+    result: list[CloudflareZoneRecord]
+
+
+class _WAFFilterRecordsEnvelope(TypedDict):
+    result: list[CloudflareWAFFilterRecord]
+
+
+## Adapters are built once at import. pydantic-core parses JSON bytes straight into the record classes,
+#  without building intermediate dicts or pydantic model instances.
+_ZONE_RECORDS_ADAPTER: TypeAdapter = TypeAdapter(list[CloudflareZoneRecord])
+_ZONE_ENVELOPE_ADAPTER: TypeAdapter = TypeAdapter(_ZoneRecordsEnvelope)
+_WAF_FILTER_RECORDS_ADAPTER: TypeAdapter = TypeAdapter(list[CloudflareWAFFilterRecord])
+_WAF_FILTER_ENVELOPE_ADAPTER: TypeAdapter = TypeAdapter(_WAFFilterRecordsEnvelope)
+
+
+def _decode_records(
+    content: t.Union[bytes, str, dict, list],
+    records_adapter: TypeAdapter,
+    envelope_adapter: TypeAdapter,
+) -> list:
+    """Decode a response body, response envelope dict, or list of results with the given adapters."""
+    if isinstance(content, (bytes, str)):
+        ## A Cloudflare response body is an envelope object, a bare list of results is also accepted
+        if content.lstrip()[:1] in (b"{", "{"):
+            return envelope_adapter.validate_json(content)["result"]
+
+        return records_adapter.validate_json(content)
+
+    if isinstance(content, dict):
+        return envelope_adapter.validate_python(content)["result"]
+
+    if isinstance(content, list):
+        return records_adapter.validate_python(content)
+
+    raise TypeError(
+        f"content must be bytes, str, dict, or list. Got type: ({type(content)})"
+    )
+
+
+def decode_zone_records(
+    content: t.Union[bytes, str, dict, list],
+) -> list[CloudflareZoneRecord]:
+    """Decode a Cloudflare `/zones` response directly into zone records.
+
+    Description:
+        Raw bytes/str are parsed & validated in a single pass by pydantic-core, without creating the
+        intermediate dicts that `json.loads()` would, or the pydantic `CloudflareZoneIn` models.
+
+    Params:
+        content (bytes | str | dict | list): A raw response body, a decoded response dict with a `result` key,
+            or a list of zone dicts.
+
+    Returns:
+        (list[CloudflareZoneRecord]): A list of decoded zone records.
+
+    """
+    try:
+        records: list[CloudflareZoneRecord] = _decode_records(
+            content, _ZONE_RECORDS_ADAPTER, _ZONE_ENVELOPE_ADAPTER
+        )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error decoding zone records. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    return records
+
+
+def decode_waf_filter_records(
+    content: t.Union[bytes, str, dict, list],
+) -> list[CloudflareWAFFilterRecord]:
+    """Decode a Cloudflare `/zones/{zone_id}/filters` response directly into WAF filter records.
+
+    Params:
+        content (bytes | str | dict | list): A raw response body, a decoded response dict with a `result` key,
+            or a list of filter dicts.
+
+    Returns:
+        (list[CloudflareWAFFilterRecord]): A list of decoded WAF filter records.
+
+    """
+    try:
+        records: list[CloudflareWAFFilterRecord] = _decode_records(
+            content, _WAF_FILTER_RECORDS_ADAPTER, _WAF_FILTER_ENVELOPE_ADAPTER
+        )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error decoding WAF filter records. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    return records
@@ -112,6 +112,7 @@ class CloudflareZoneBase(BaseModel):
     id: str
     meta: CloudflareZoneMetaIn
     modified_on: str
+    name: str | None = Field(default=None)
     name_servers: list[str] | None = Field(default_factory=[])
     original_dnshost: str | None = Field(default=None)
     original_name_servers: list[str] | None = Field(default_factory=[])
@@ -133,6 +134,31 @@ class CloudflareZoneOut(CloudflareZoneBase):
     zone_id: int
 
 
+class CloudflareDNSRecordBase(BaseModel):
+    id: str | None = Field(default=None)
+    zone_id: str | None = Field(default=None)
+    zone_name: str | None = Field(default=None)
+    name: str
+    type: str
+    content: str | None = Field(default=None)
+    ttl: int | None = Field(default=None)
+    priority: int | None = Field(default=None)
+    proxiable: bool | None = Field(default=None)
+    proxied: bool | None = Field(default=None)
+    comment: str | None = Field(default=None)
+    tags: list[str] | None = Field(default_factory=list)
+    created_on: str | None = Field(default=None)
+    modified_on: str | None = Field(default=None)
+
+
+class CloudflareDNSRecordIn(CloudflareDNSRecordBase):
+    pass
+
+
+class CloudflareDNSRecordOut(CloudflareDNSRecordBase):
+    dns_record_id: int
+
+
 class CloudflareWAFFilterBase(BaseModel):
     id: str
     expression: str | None = Field(default=None)
@@ -145,14 +171,6 @@ class CloudflareWAFFilterIn(CloudflareWAFFilterBase):
 
 class CloudflareWAFFilterOut(CloudflareWAFFilterBase):
     waf_filter_id: int
-    
-    
-class CloudflareWAFFilterIn(BaseModel):
-    pass
-
-
-class CloudflareWAFFilterOut(BaseModel):
-    waf_filter_id: int
 
 
 ## DTOs
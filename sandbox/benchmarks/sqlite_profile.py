@@ -0,0 +1,127 @@
+"""Compare bulk insert throughput of the SQLite connection profiles in `db_lib.sqlite`.
+
+Each profile gets a fresh database file & runs the same two workloads:
+
+- `chunked`: `BaseRepository.bulk_upsert()` of `--rows` zone rows, committing every `--chunk-size` rows.
+- `single`: `--single-rows` inserts, each committed on its own (where `synchronous=FULL` pays one fsync per commit).
+
+A reader thread counts rows in a loop during the chunked load; with a rollback journal, its reads fail or wait
+whenever the writer holds the lock.
+
+Usage:
+    uv run sandbox/benchmarks/sqlite_profile.py --rows 50000 --chunk-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import threading
+import time
+import typing as t
+
+from db_lib import get_engine
+from db_lib.base import Base, BaseRepository
+from db_lib.sqlite import SQLITE_PROFILES
+
+from loguru import logger as log
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+
+class BenchmarkZone(Base):
+    __tablename__ = "benchmark_zones"
+
+    pk: so.Mapped[int] = so.mapped_column(primary_key=True, autoincrement=True)
+    id: so.Mapped[str] = so.mapped_column(sa.String(32), unique=True)
+    name: so.Mapped[str] = so.mapped_column(sa.String)
+    status: so.Mapped[str] = so.mapped_column(sa.String)
+    account_id: so.Mapped[str] = so.mapped_column(sa.String(32), index=True)
+
+
+def make_row(i: int) -> dict:
+    return {
+        "id": f"{i:032x}",
+        "name": f"zone-{i}.example.com",
+        "status": "active",
+        "account_id": "023e105f4ecef8ad9ca31a8372d0c353",
+    }
+
+
+def read_loop(engine: sa.Engine, stop: threading.Event) -> dict[str, int]:
+    """Count rows until stopped, tallying reads that succeeded & reads that failed on a lock."""
+    stats: dict[str, int] = {"reads": 0, "locked": 0}
+
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(sa.text("SELECT COUNT(*) FROM benchmark_zones")).scalar()
+            stats["reads"] += 1
+        except sa.exc.OperationalError:
+            stats["locked"] += 1
+
+    return stats
+
+
+def run_profile(profile: str, db_file: Path, rows: int, chunk_size: int, single_rows: int) -> dict[str, t.Any]:
+    engine: sa.Engine = get_engine(url=sa.make_url(f"sqlite+pysqlite:///{db_file}"), echo=False, sqlite_profile=profile)
+    Base.metadata.create_all(bind=engine)
+
+    stop: threading.Event = threading.Event()
+    reader_stats: dict[str, int] = {}
+    reader = threading.Thread(target=lambda: reader_stats.update(read_loop(engine, stop)))
+    reader.start()
+
+    with so.Session(engine) as session:
+        repo: BaseRepository[BenchmarkZone] = BaseRepository(session, BenchmarkZone)
+
+        start: float = time.perf_counter()
+        for offset in range(0, rows, chunk_size):
+            repo.bulk_upsert(
+                [make_row(i) for i in range(offset, min(offset + chunk_size, rows))],
+                conflict_cols=["id"],
+                returning=False,
+            )
+        chunked: float = time.perf_counter() - start
+
+        stop.set()
+        reader.join()
+
+        start = time.perf_counter()
+        for i in range(rows, rows + single_rows):
+            session.execute(sa.insert(BenchmarkZone), [make_row(i)])
+            session.commit()
+        single: float = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        journal_mode: str = conn.execute(sa.text("PRAGMA journal_mode")).scalar()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "journal_mode": journal_mode,
+        "chunked_rows_per_s": round(rows / chunked),
+        "single_commits_per_s": round(single_rows / single),
+        "reader_reads": reader_stats.get("reads", 0),
+        "reader_locked": reader_stats.get("locked", 0),
+    }
+
+
+def main(rows: int = 50_000, chunk_size: int = 500, single_rows: int = 2_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in SQLITE_PROFILES:
+            result: dict[str, t.Any] = run_profile(
+                profile, Path(tmp_dir) / f"{profile}.sqlite3", rows=rows, chunk_size=chunk_size, single_rows=single_rows
+            )
+            log.info(f"{result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--single-rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    main(rows=args.rows, chunk_size=args.chunk_size, single_rows=args.single_rows)
@@ -0,0 +1,94 @@
+"""Compare decode time & memory of pydantic zone schemas against the compact zone records.
+
+Usage:
+    uv run sandbox/benchmarks/zone_records.py --zones 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import typing as t
+
+from domain import cloudflare as cf_domain
+
+from loguru import logger as log
+
+
+def make_zone(i: int) -> dict:
+    """Build a synthetic zone dict shaped like a `/zones` result."""
+    return {
+        "account": {"id": "023e105f4ecef8ad9ca31a8372d0c353", "name": "Example Account", "type": "standard"},
+        "activated_on": "2014-01-02T00:01:00.12345Z",
+        "created_on": "2014-01-01T05:20:00.12345Z",
+        "development_mode": 0,
+        "id": f"{i:032x}",
+        "meta": {"custom_certificate_quota": 1, "page_rule_quota": 100, "phishing_detected": False, "step": 2},
+        "modified_on": "2014-01-01T05:20:00.12345Z",
+        "name": f"zone-{i}.example.com",
+        "name_servers": ["bob.ns.cloudflare.com", "lola.ns.cloudflare.com"],
+        "original_dnshost": "NameCheap",
+        "original_name_servers": ["ns1.originaldnshost.com", "ns2.originaldnshost.com"],
+        "original_registrar": "GoDaddy",
+        "owner": {"email": None, "id": "023e105f4ecef8ad9ca31a8372d0c353", "type": "user"},
+        "paused": False,
+        "permissions": ["#worker:read", "#zone:read", "#dns_records:read"],
+        "plan": {
+            "can_subscribe": False,
+            "currency": "USD",
+            "externally_managed": False,
+            "frequency": "",
+            "id": "0feeeeeeeeeeeeeeeeeeeeeeeeeeeeee",
+            "is_subscribed": True,
+            "legacy_discount": False,
+            "name": "Free Website",
+            "price": 0,
+        },
+        "status": "active",
+        "tenant": {"id": None, "name": None},
+        "tenant_unit": {"id": None},
+        "type": "full",
+    }
+
+
+def measure(label: str, fn: t.Callable[[], t.Any]) -> t.Any:
+    """Run `fn`, logging elapsed time & the memory still allocated by its result."""
+    gc.collect()
+    tracemalloc.start()
+
+    start: float = time.perf_counter()
+    result = fn()
+    elapsed: float = time.perf_counter() - start
+
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    log.info(f"[{label}] decode: {elapsed:.3f}s | retained: {current / 1024 / 1024:.2f} MiB")
+
+    return result
+
+
+def main(zones: int = 10_000) -> None:
+    body: bytes = json.dumps({"result": [make_zone(i) for i in range(zones)]}).encode("utf-8")
+    log.info(f"Benchmarking [{zones}] zone(s), response body: {len(body) / 1024 / 1024:.2f} MiB")
+
+    measure(
+        "pydantic CloudflareZoneIn",
+        lambda: [cf_domain.CloudflareZoneIn.model_validate(z) for z in json.loads(body)["result"]],
+    )
+    measure("CloudflareZoneRecord", lambda: cf_domain.decode_zone_records(body))
+    measure(
+        "CloudflareZoneRecord (interned)",
+        lambda: cf_domain.intern_zone_records(cf_domain.decode_zone_records(body)),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--zones", type=int, default=10_000)
+    args = parser.parse_args()
+
+    main(zones=args.zones)
@@ -0,0 +1,688 @@
+"""Local mock of the Cloudflare API, for exercising cfapi without a real account.
+
+Serves synthetic accounts, zones, DNS records, rulesets & WAF packages under `/client/v4`, accepts cache purges
+(rejecting oversized batches, & rate limiting with `--purge-rate`), keeps editable zone settings & firewall
+filters (every write is listed at `/client/v4/_mock/writes`), keeps an in-memory Workers KV namespace,
+runs Rules List item writes as asynchronous bulk operations (pending, then running, then done), &
+serves canned GraphQL Analytics responses from `fixtures/graphql/{node}.json`. Each zone in a GraphQL query's
+`zoneTags` variable gets the fixture's groups for every dataset node named in the query.
+
+Usage:
+    uv run sandbox/mock_cloudflare/server.py --port 8787 --zones 120
+
+    CloudflareController(api_base_url="http://127.0.0.1:8787/client/v4", api_token="mock", use_cache=False)
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+from pathlib import Path
+import re
+import threading
+import time
+import typing as t
+from urllib.parse import parse_qs, urlparse
+import uuid
+
+from loguru import logger as log
+
+FIXTURES_DIR: Path = Path(__file__).parent / "fixtures"
+API_PREFIX: str = "/client/v4"
+ACCOUNT_ID: str = "023e105f4ecef8ad9ca31a8372d0c353"
+KV_NAMESPACE_ID: str = "0f2ac74b498b48028cb68387c421e279"
+RULES_LIST_ID: str = "2c0fc9fa937b11eaa1b71c4d701ab86e"
+## Most keys accepted by one KV bulk write or delete
+KV_BULK_MAX_KEYS: int = 10_000
+
+
+@dataclass
+class MockState:
+    """Data served by the mock API."""
+
+    accounts: list[dict] = field(default_factory=list)
+    zones: list[dict] = field(default_factory=list)
+    dns_records_per_zone: int = 250
+    filters_per_zone: int = 40
+    ## zone ID -> setting ID -> setting, & zone ID -> filters; created on first access
+    settings: dict[str, dict[str, dict]] = field(default_factory=dict)
+    filters: dict[str, list[dict]] = field(default_factory=dict)
+    ## (method, path, items) of every settings/filters write, for checking what a client sent
+    writes: list[tuple[str, str, int]] = field(default_factory=list)
+    ## Most items accepted in one purge_cache call
+    purge_max_items: int = 30
+    ## purge_cache calls allowed per second before responding 429. `None` disables the limit.
+    purge_rate: float | None = None
+    purged: int = 0
+    purge_calls: deque = field(default_factory=deque)
+    ## Workers KV namespaces: namespace ID -> {key: value}
+    kv: dict[str, dict[str, str]] = field(default_factory=lambda: {KV_NAMESPACE_ID: {}})
+    kv_sorted_keys: dict[str, list[str]] = field(default_factory=dict)
+    ## Rules Lists: list ID -> items, & asynchronous bulk operations on them: operation ID -> operation
+    lists: dict[str, list[dict]] = field(default_factory=lambda: {RULES_LIST_ID: []})
+    operations: dict[str, dict] = field(default_factory=dict)
+    ## Seconds a bulk operation spends pending, then running, before it completes
+    operation_seconds: tuple[float, float] = (0.5, 2.0)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def build(
+        cls,
+        zones: int = 120,
+        dns_records_per_zone: int = 250,
+        purge_rate: float | None = None,
+        accounts: int = 1,
+    ) -> "MockState":
+        template: dict = json.loads((FIXTURES_DIR / "zone.json").read_text())
+        ## The first account keeps the fixture's ID; zones are dealt out to accounts round-robin
+        account_list: list[dict] = [
+            {"id": ACCOUNT_ID if i == 0 else f"{i:08x}{ACCOUNT_ID[8:]}", "name": f"Example Account {i}", "type": "standard"}
+            for i in range(max(accounts, 1))
+        ]
+        zone_list: list[dict] = [
+            {
+                **template,
+                "id": f"{i:032x}",
+                "name": f"zone-{i}.example.com",
+                "account": account_list[i % len(account_list)],
+            }
+            for i in range(zones)
+        ]
+
+        return cls(
+            accounts=account_list,
+            zones=zone_list,
+            dns_records_per_zone=dns_records_per_zone,
+            purge_rate=purge_rate,
+        )
+
+    def zone(self, zone_id: str) -> dict | None:
+        return next((z for z in self.zones if z["id"] == zone_id), None)
+
+
+def _envelope(result: t.Any, result_info: dict | None = None) -> dict:
+    """Wrap a result in the Cloudflare v4 response envelope."""
+    body: dict = {"result": result, "success": True, "errors": [], "messages": []}
+    if result_info is not None:
+        body["result_info"] = result_info
+
+    return body
+
+
+def _paginate(items: list, query: dict, default_per_page: int = 20) -> dict:
+    """Return one page of `items` in an envelope with `result_info`, using `page` & `per_page` params."""
+    page: int = int(query.get("page", ["1"])[0])
+    per_page: int = int(query.get("per_page", [str(default_per_page)])[0])
+    results: list = items[(page - 1) * per_page : page * per_page]
+
+    return _envelope(
+        results,
+        result_info={
+            "page": page,
+            "per_page": per_page,
+            "count": len(results),
+            "total_count": len(items),
+            "total_pages": max(1, -(-len(items) // per_page)),
+        },
+    )
+
+
+def _dns_records(state: MockState, zone_id: str) -> list[dict]:
+    zone: dict = state.zone(zone_id) or {"name": "example.com"}
+
+    return [
+        {
+            "id": f"{zone_id[:24]}{i:08x}",
+            "name": f"r{i}.{zone['name']}",
+            "type": "A",
+            "content": f"10.0.{i // 250 % 250}.{i % 250}",
+            "ttl": 1,
+            "proxiable": True,
+            "proxied": i % 2 == 0,
+            "tags": [],
+        }
+        for i in range(state.dns_records_per_zone)
+    ]
+
+
+## Route handlers take (state, path match, query params, JSON body) & return (status, body).
+##   A dict body is sent as JSON, a str body as text/plain.
+def get_accounts(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return 200, _paginate(state.accounts, query)
+
+
+def get_zones(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    zones: list[dict] = state.zones
+    if query.get("account.id"):
+        zones = [zone for zone in zones if zone["account"]["id"] == query["account.id"][0]]
+
+    return 200, _paginate(zones, query)
+
+
+def get_zone(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    zone: dict | None = state.zone(match["zone_id"])
+    if zone is None:
+        return 404, {"result": None, "success": False, "errors": [{"code": 1001, "message": "Invalid zone identifier"}]}
+
+    return 200, _envelope(zone)
+
+
+def get_token_verify(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return 200, _envelope({"id": "ed17574386854bf78a67040be0a770b0", "status": "active", "expires_on": None})
+
+
+def get_dns_records(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return 200, _paginate(_dns_records(state, match["zone_id"]), query, default_per_page=100)
+
+
+def get_dns_records_export(
+    state: MockState, match: re.Match, query: dict, body: t.Any
+) -> tuple[int, t.Any]:
+    lines: list[str] = [
+        f"{r['name']}.\t{r['ttl']}\tIN\t{r['type']}\t{r['content']} ; cf_tags=cf-proxied:{str(r['proxied']).lower()}"
+        for r in _dns_records(state, match["zone_id"])
+    ]
+
+    return 200, "\n".join(lines) + "\n"
+
+
+def _rulesets() -> list[dict]:
+    return json.loads((FIXTURES_DIR / "rulesets.json").read_text())
+
+
+def get_rulesets(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    ## Listings don't include rules
+    return 200, _envelope([{k: v for k, v in r.items() if k != "rules"} for r in _rulesets()])
+
+
+def get_ruleset(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    ruleset: dict | None = next((r for r in _rulesets() if r["id"] == match["ruleset_id"]), None)
+    if ruleset is None:
+        return 404, {"result": None, "success": False, "errors": [{"code": 10000, "message": "not found"}]}
+
+    return 200, _envelope(ruleset)
+
+
+def get_phase_entrypoint(
+    state: MockState, match: re.Match, query: dict, body: t.Any
+) -> tuple[int, t.Any]:
+    ruleset: dict | None = next(
+        (r for r in _rulesets() if r["kind"] == "zone" and r["phase"] == match["phase"]), None
+    )
+    if ruleset is None:
+        return 404, {"result": None, "success": False, "errors": [{"code": 10000, "message": "not found"}]}
+
+    return 200, _envelope(ruleset)
+
+
+def get_waf_packages(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    packages: list[dict] = json.loads((FIXTURES_DIR / "waf_packages.json").read_text())
+
+    return 200, _paginate(
+        [{**pkg, "zone_id": match["zone_id"]} for pkg in packages], query, default_per_page=50
+    )
+
+
+## Zone settings every mock zone starts with: setting ID -> (value, editable)
+DEFAULT_ZONE_SETTINGS: dict[str, tuple[t.Any, bool]] = {
+    "always_use_https": ("off", True),
+    "automatic_https_rewrites": ("off", True),
+    "brotli": ("on", True),
+    "browser_cache_ttl": (14400, True),
+    "min_tls_version": ("1.0", True),
+    "minify": ({"css": "off", "html": "off", "js": "off"}, True),
+    "security_level": ("medium", True),
+    "ssl": ("flexible", True),
+    "tls_1_3": ("on", True),
+    "advanced_ddos": ("on", False),
+}
+
+
+def _zone_settings(state: MockState, zone_id: str) -> dict[str, dict]:
+    with state.lock:
+        if zone_id not in state.settings:
+            state.settings[zone_id] = {
+                setting_id: {"id": setting_id, "value": value, "editable": editable, "modified_on": None}
+                for setting_id, (value, editable) in DEFAULT_ZONE_SETTINGS.items()
+            }
+
+        return state.settings[zone_id]
+
+
+def _zone_filters(state: MockState, zone_id: str) -> list[dict]:
+    with state.lock:
+        if zone_id not in state.filters:
+            state.filters[zone_id] = [
+                {
+                    "id": f"{zone_id[:24]}{i:08x}",
+                    "expression": f'http.request.uri.path eq "/blocked/{i}"',
+                    "paused": i % 5 == 0,
+                    "description": f"filter {i}",
+                }
+                for i in range(state.filters_per_zone)
+            ]
+
+        return state.filters[zone_id]
+
+
+def get_zone_settings(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return 200, _envelope(list(_zone_settings(state, match["zone_id"]).values()))
+
+
+def patch_zone_settings(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    settings: dict[str, dict] = _zone_settings(state, match["zone_id"])
+    items: list[dict] = (body or {}).get("items") or []
+
+    for item in items:
+        if item.get("id") not in settings or not settings[item["id"]]["editable"]:
+            return 400, {
+                "result": None,
+                "success": False,
+                "errors": [{"code": 1007, "message": f"Invalid or read-only setting: {item.get('id')}"}],
+            }
+
+    with state.lock:
+        state.writes.append(("PATCH", f"/zones/{match['zone_id']}/settings", len(items)))
+        for item in items:
+            settings[item["id"]]["value"] = item["value"]
+            settings[item["id"]]["modified_on"] = "2026-01-01T00:00:00Z"
+
+    return 200, _envelope([settings[item["id"]] for item in items])
+
+
+def get_filters(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return 200, _paginate(_zone_filters(state, match["zone_id"]), query, default_per_page=25)
+
+
+def put_filters(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    filters: dict[str, dict] = {f["id"]: f for f in _zone_filters(state, match["zone_id"])}
+    updates: list[dict] = body or []
+
+    missing: list[str] = [update.get("id") for update in updates if update.get("id") not in filters]
+    if missing:
+        return 404, {"result": None, "success": False, "errors": [{"code": 10001, "message": f"Unknown filter(s): {missing}"}]}
+
+    with state.lock:
+        state.writes.append(("PUT", f"/zones/{match['zone_id']}/filters", len(updates)))
+        for update in updates:
+            filters[update["id"]].update(update)
+
+    return 200, _envelope([filters[update["id"]] for update in updates])
+
+
+def post_filters(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    filters: list[dict] = _zone_filters(state, match["zone_id"])
+    created: list[dict] = []
+
+    with state.lock:
+        state.writes.append(("POST", f"/zones/{match['zone_id']}/filters", len(body or [])))
+        for new_filter in body or []:
+            created.append({"paused": False, **new_filter, "id": uuid.uuid4().hex})
+        filters.extend(created)
+
+    return 200, _envelope(created)
+
+
+def get_writes(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    """Mock-only: list the write calls (method, path, items) received so far."""
+    with state.lock:
+        return 200, _envelope([list(write) for write in state.writes])
+
+
+def post_purge_cache(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    items: list[str] = [
+        item for key in ("files", "tags", "prefixes", "hosts") for item in (body or {}).get(key) or []
+    ]
+    if not items or len(items) > state.purge_max_items:
+        return 400, {
+            "result": None,
+            "success": False,
+            "errors": [{"code": 1015, "message": f"Purge requests take 1-{state.purge_max_items} items"}],
+        }
+
+    with state.lock:
+        if state.purge_rate:
+            now: float = time.monotonic()
+            while state.purge_calls and now - state.purge_calls[0] > 1.0:
+                state.purge_calls.popleft()
+
+            if len(state.purge_calls) >= state.purge_rate:
+                return 429, {
+                    "result": None,
+                    "success": False,
+                    "errors": [{"code": 971, "message": "Please wait and consider throttling your request speed"}],
+                }
+
+            state.purge_calls.append(now)
+
+        state.purged += len(items)
+
+    return 200, _envelope({"id": match["zone_id"]})
+
+
+def _kv_error(status: int, message: str) -> tuple[int, dict]:
+    return status, {"result": None, "success": False, "errors": [{"code": 10000, "message": message}]}
+
+
+def get_kv_namespaces(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    namespaces: list[dict] = [{"id": ns_id, "title": f"mock-{ns_id[:8]}"} for ns_id in state.kv]
+
+    return 200, _paginate(namespaces, query)
+
+
+def get_kv_keys(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    namespace_id: str = match["namespace_id"]
+    if namespace_id not in state.kv:
+        return _kv_error(404, "namespace not found")
+
+    limit: int = int(query.get("limit", ["1000"])[0])
+    prefix: str = query.get("prefix", [""])[0]
+    cursor: str = query.get("cursor", [""])[0]
+
+    with state.lock:
+        if namespace_id not in state.kv_sorted_keys:
+            state.kv_sorted_keys[namespace_id] = sorted(state.kv[namespace_id])
+        keys: list[str] = state.kv_sorted_keys[namespace_id]
+
+    ## The cursor is the last key of the previous page
+    start: int = bisect.bisect_right(keys, cursor) if cursor else bisect.bisect_left(keys, prefix)
+    page: list[str] = []
+    for key in keys[start:]:
+        if not key.startswith(prefix) or len(page) >= limit:
+            break
+        page.append(key)
+
+    has_more: bool = start + len(page) < len(keys) and keys[start + len(page)].startswith(prefix)
+
+    return 200, _envelope(
+        [{"name": key} for key in page],
+        result_info={"count": len(page), "cursor": page[-1] if page and has_more else ""},
+    )
+
+
+def put_kv_bulk(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    namespace_id: str = match["namespace_id"]
+    if namespace_id not in state.kv:
+        return _kv_error(404, "namespace not found")
+    if not isinstance(body, list) or len(body) > KV_BULK_MAX_KEYS:
+        return _kv_error(400, f"Bulk writes take a list of at most {KV_BULK_MAX_KEYS} pairs")
+
+    with state.lock:
+        state.kv[namespace_id].update({pair["key"]: pair["value"] for pair in body})
+        state.kv_sorted_keys.pop(namespace_id, None)
+
+    return 200, _envelope({"successful_key_count": len(body), "unsuccessful_keys": []})
+
+
+def post_kv_bulk_delete(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    namespace_id: str = match["namespace_id"]
+    if namespace_id not in state.kv:
+        return _kv_error(404, "namespace not found")
+    if not isinstance(body, list) or len(body) > KV_BULK_MAX_KEYS:
+        return _kv_error(400, f"Bulk deletes take a list of at most {KV_BULK_MAX_KEYS} keys")
+
+    with state.lock:
+        for key in body:
+            state.kv[namespace_id].pop(key, None)
+        state.kv_sorted_keys.pop(namespace_id, None)
+
+    return 200, _envelope({"successful_key_count": len(body), "unsuccessful_keys": []})
+
+
+def post_kv_bulk_get(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    namespace_id: str = match["namespace_id"]
+    if namespace_id not in state.kv:
+        return _kv_error(404, "namespace not found")
+
+    keys: list[str] = (body or {}).get("keys") or []
+    if len(keys) > 100:
+        return _kv_error(400, "Bulk reads take at most 100 keys")
+
+    values: dict[str, str] = state.kv[namespace_id]
+
+    return 200, _envelope({"values": {key: values.get(key) for key in keys}})
+
+
+def get_rules_lists(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    with state.lock:
+        lists: list[dict] = [
+            {"id": list_id, "name": f"mock_list_{list_id[:8]}", "kind": "ip", "num_items": len(items)}
+            for list_id, items in state.lists.items()
+        ]
+
+    return 200, _envelope(lists)
+
+
+def _write_list_items(state: MockState, match: re.Match, body: t.Any, replace: bool) -> tuple[int, t.Any]:
+    """Start an asynchronous bulk operation writing a Rules List's items. Items without an `ip` fail the operation."""
+    list_id: str = match["list_id"]
+    operation_id: str = uuid.uuid4().hex
+    duration: float = random.uniform(*state.operation_seconds)
+    invalid: int = sum(1 for item in body or [] if not item.get("ip"))
+
+    with state.lock:
+        state.lists.setdefault(list_id, [])
+        state.operations[operation_id] = {
+            "id": operation_id,
+            "list_id": list_id,
+            "items": list(body or []),
+            "replace": replace,
+            "error": f"{invalid} item(s) have no 'ip'" if invalid else None,
+            "created": time.monotonic(),
+            "duration": duration,
+            "polls": 0,
+        }
+
+    return 200, _envelope({"operation_id": operation_id})
+
+
+def put_list_items(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return _write_list_items(state, match, body, replace=True)
+
+
+def post_list_items(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    return _write_list_items(state, match, body, replace=False)
+
+
+def get_bulk_operation(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    """An operation is `pending` for its first third, `running` until its duration passes, then done."""
+    with state.lock:
+        operation: dict | None = state.operations.get(match["operation_id"])
+        if operation is None:
+            return 404, {"result": None, "success": False, "errors": [{"code": 10001, "message": "Operation not found"}]}
+
+        operation["polls"] += 1
+        age: float = time.monotonic() - operation["created"]
+        result: dict = {"id": operation["id"]}
+
+        if age < operation["duration"] / 3:
+            result["status"] = "pending"
+        elif age < operation["duration"]:
+            result["status"] = "running"
+        elif operation["error"]:
+            result.update(status="failed", error=operation["error"], completed=True)
+        else:
+            if not operation.get("applied"):
+                items: list[dict] = state.lists[operation["list_id"]]
+                if operation["replace"]:
+                    items.clear()
+                items.extend(operation["items"])
+                operation["applied"] = True
+
+            result.update(status="completed", completed=True)
+
+    return 200, _envelope(result)
+
+
+def post_graphql(state: MockState, match: re.Match, query: dict, body: t.Any) -> tuple[int, t.Any]:
+    document: str = (body or {}).get("query", "")
+    variables: dict = (body or {}).get("variables") or {}
+
+    nodes: dict[str, list[dict]] = {}
+    for fixture in (FIXTURES_DIR / "graphql").glob("*.json"):
+        if re.search(rf"\b{fixture.stem}\s*\(", document):
+            nodes[fixture.stem] = json.loads(fixture.read_text())
+
+    if not nodes:
+        return 200, {"data": None, "errors": [{"message": "mock: no canned response for query"}]}
+
+    zones: list[dict] = [
+        {"zoneTag": zone_tag, **nodes} for zone_tag in variables.get("zoneTags") or []
+    ]
+
+    return 200, {"data": {"viewer": {"zones": zones}}, "errors": None}
+
+
+## (method, path regex, handler)
+ROUTES: list[tuple[str, re.Pattern, t.Callable]] = [
+    ("GET", re.compile(r"/accounts"), get_accounts),
+    ("GET", re.compile(r"/zones"), get_zones),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)"), get_zone),
+    ("GET", re.compile(r"/user/tokens/verify"), get_token_verify),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/dns_records"), get_dns_records),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/dns_records/export"), get_dns_records_export),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/rulesets"), get_rulesets),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/rulesets/(?P<ruleset_id>\w+)"), get_ruleset),
+    (
+        "GET",
+        re.compile(r"/zones/(?P<zone_id>\w+)/rulesets/phases/(?P<phase>\w+)/entrypoint"),
+        get_phase_entrypoint,
+    ),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/firewall/waf/packages"), get_waf_packages),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/filters"), get_filters),
+    ("PUT", re.compile(r"/zones/(?P<zone_id>\w+)/filters"), put_filters),
+    ("POST", re.compile(r"/zones/(?P<zone_id>\w+)/filters"), post_filters),
+    ("GET", re.compile(r"/zones/(?P<zone_id>\w+)/settings"), get_zone_settings),
+    ("PATCH", re.compile(r"/zones/(?P<zone_id>\w+)/settings"), patch_zone_settings),
+    ("GET", re.compile(r"/_mock/writes"), get_writes),
+    ("POST", re.compile(r"/zones/(?P<zone_id>\w+)/purge_cache"), post_purge_cache),
+    ("GET", re.compile(r"/accounts/(?P<account_id>\w+)/storage/kv/namespaces"), get_kv_namespaces),
+    (
+        "GET",
+        re.compile(r"/accounts/(?P<account_id>\w+)/storage/kv/namespaces/(?P<namespace_id>\w+)/keys"),
+        get_kv_keys,
+    ),
+    (
+        "PUT",
+        re.compile(r"/accounts/(?P<account_id>\w+)/storage/kv/namespaces/(?P<namespace_id>\w+)/bulk"),
+        put_kv_bulk,
+    ),
+    (
+        "POST",
+        re.compile(r"/accounts/(?P<account_id>\w+)/storage/kv/namespaces/(?P<namespace_id>\w+)/bulk/delete"),
+        post_kv_bulk_delete,
+    ),
+    (
+        "POST",
+        re.compile(r"/accounts/(?P<account_id>\w+)/storage/kv/namespaces/(?P<namespace_id>\w+)/bulk/get"),
+        post_kv_bulk_get,
+    ),
+    ("GET", re.compile(r"/accounts/(?P<account_id>\w+)/rules/lists"), get_rules_lists),
+    ("PUT", re.compile(r"/accounts/(?P<account_id>\w+)/rules/lists/(?P<list_id>\w+)/items"), put_list_items),
+    ("POST", re.compile(r"/accounts/(?P<account_id>\w+)/rules/lists/(?P<list_id>\w+)/items"), post_list_items),
+    (
+        "GET",
+        re.compile(r"/accounts/(?P<account_id>\w+)/rules/lists/bulk_operations/(?P<operation_id>\w+)"),
+        get_bulk_operation,
+    ),
+    ("POST", re.compile(r"/graphql"), post_graphql),
+]
+
+
+def make_handler(state: MockState) -> t.Type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to the mock state."""
+
+    class MockCloudflareHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: t.Any) -> None:
+            log.debug(f"{self.address_string()} {format % args}")
+
+        def _dispatch(self, method: str) -> None:
+            url = urlparse(self.path)
+            path: str = url.path.removeprefix(API_PREFIX)
+            query: dict = parse_qs(url.query)
+
+            length: int = int(self.headers.get("Content-Length") or 0)
+            raw_body: bytes = self.rfile.read(length) if length else b""
+            body: t.Any = json.loads(raw_body) if raw_body else None
+
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.fullmatch(path)
+                if route_method == method and match:
+                    status, payload = handler(state, match, query, body)
+                    break
+            else:
+                status, payload = 404, {
+                    "result": None,
+                    "success": False,
+                    "errors": [{"code": 7003, "message": f"No route for {method} {path}"}],
+                }
+
+            if isinstance(payload, str):
+                content, content_type = payload.encode("utf-8"), "text/plain"
+            else:
+                content, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self) -> None:
+            self._dispatch("GET")
+
+        def do_POST(self) -> None:
+            self._dispatch("POST")
+
+        def do_PATCH(self) -> None:
+            self._dispatch("PATCH")
+
+        def do_PUT(self) -> None:
+            self._dispatch("PUT")
+
+        def do_DELETE(self) -> None:
+            self._dispatch("DELETE")
+
+    return MockCloudflareHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8787, state: MockState | None = None) -> None:
+    state = state or MockState.build()
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+
+    log.info(f"Mock Cloudflare API listening on http://{host}:{port}{API_PREFIX} ([{len(state.zones)}] zone(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Stopping mock Cloudflare API")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--zones", type=int, default=120)
+    parser.add_argument("--dns-records", type=int, default=250, help="DNS records per zone")
+    parser.add_argument("--accounts", type=int, default=1, help="accounts the zones are spread across")
+    parser.add_argument("--purge-rate", type=float, default=None, help="purge_cache calls per second before 429s")
+    args = parser.parse_args()
+
+    serve(
+        host=args.host,
+        port=args.port,
+        state=MockState.build(
+            zones=args.zones,
+            dns_records_per_zone=args.dns_records,
+            purge_rate=args.purge_rate,
+            accounts=args.accounts,
+        ),
+    )